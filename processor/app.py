@@ -1,17 +1,37 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import tempfile
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import subprocess
 import base64
 import json
-import uuid
 import shutil
 import mimetypes
+import io
+import time
+import threading
 from PIL import Image
 from pymongo import MongoClient
 import gridfs
 from bson.objectid import ObjectId
+from stego.scheduler import run_tools, lane_metrics, cancelled
+from stego.hashing import compute_digests, format_digests, new_hashers
+from stego.workspace import Workspace, UploadTooLarge, borrow_workspace, scratch_path
+from stego.audio import decoded_audio_path, is_pcm_wav, PCM_TARGET, WAV_TARGET
+from stego.stegseek import run_stegseek, STEGSEEK_TIMEOUT
+from stego.wordlists import available_wordlists, get_wordlist
+from stego.jwtcrack import crack_events
+from stego.steghide import crack_parallel, iter_candidates, STEGHIDE_WORDLIST
+from stego.batch import BATCH_MAX_FILES, ContentIndex, run_batch
+from stego.registry import (Tool, TOOLS, register, get_tool, select_tools, plan, HEADER_BYTES,
+                            IMAGE_FORMATS, LOSSLESS_IMAGE_FORMATS, AUDIO_FORMATS, ZSTEG_FORMATS,
+                            STEGHIDE_FORMATS, file_formats)
+from stego.decoders import DECODER_VERSION, DECODE_MAX_TEXT, find_candidates
+from stego.artifacts import get_artifact_store, save_artifact, save_directory, compact_result, touch_references
+from stego.triage import HEAVY_TOOLS, TRIAGE_THRESHOLD, score_evidence, skip_message
+from stego.jobs import JobStore, JobWorkers, JOB_POLL_INTERVAL, FINISHED_STATES
+from stego.cache import (ResultCache, binary_fingerprint, cache_key, tool_cache_key, is_cacheable, relocate,
+                         WORKSPACE_TOKEN)
 
 app = Flask(__name__)
 CORS(app)
@@ -32,14 +52,109 @@ if MONGO_URI:
         print(f"[ERROR] Could not connect to MongoDB: {e}")
 
 
+# Largest GridFS upload /process will fetch
+GRIDFS_MAX_BYTES = int(os.environ.get("GRIDFS_MAX_BYTES", 1024 * 1024 * 1024))
+# Largest multipart / octet-stream body /process will receive
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", GRIDFS_MAX_BYTES))
+# Largest body any route reads (a base64 JSON upload of UPLOAD_MAX_BYTES plus its
+# fields); Werkzeug stops multipart parsing and request.stream reads past it
+REQUEST_MAX_BYTES = int(os.environ.get("REQUEST_MAX_BYTES", UPLOAD_MAX_BYTES * 4 // 3 + 1024 * 1024))
+app.config['MAX_CONTENT_LENGTH'] = REQUEST_MAX_BYTES
+
+_db = None
+_uploads_fs = None
+
+def get_db():
+    """Resolve the MongoDB database used for GridFS uploads and caches (once per process)."""
+    global _db
+    if _db is None:
+        try:
+            _db = mongo_client.get_database()
+        except Exception:
+            # If URI doesn't have a default ref, standard drivers default to 'test'
+            # We replicate this behavior here to match the frontend
+            _db = mongo_client.get_database("test")
+    return _db
+
+def get_uploads_fs():
+    """GridFS bucket holding the frontend's uploads, built once per process."""
+    global _uploads_fs
+    if _uploads_fs is None:
+        _uploads_fs = gridfs.GridFS(get_db(), collection="uploads")
+    return _uploads_fs
+
+def open_upload(file_id):
+    """Open a GridFS upload for reading. Returns (grid_out, None) or (None, error response)."""
+    if not mongo_client:
+        return None, (jsonify({'error': 'MongoDB is not configured'}), 500)
+    try:
+        grid_out = get_uploads_fs().get(ObjectId(file_id))
+    except gridfs.errors.NoFile:
+        return None, (jsonify({'error': 'File not found in GridFS'}), 404)
+    except Exception as e:
+        return None, (jsonify({'error': f'Cannot load file: {str(e)}'}), 400)
+    if grid_out.length > GRIDFS_MAX_BYTES:
+        return None, (jsonify({'error': f'File is too large ({grid_out.length} bytes, max {GRIDFS_MAX_BYTES})'}), 413)
+    return grid_out, None
+
+
+_result_cache = None
+
+def get_result_cache():
+    """Lazily build the whole-report cache (MongoDB when configured, else local disk)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(db=get_db() if mongo_client else None)
+    return _result_cache
+
+
+_tool_cache = None
+
+def get_tool_cache():
+    """Lazily build the per-tool output cache used for incremental re-analysis."""
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ResultCache(db=get_db() if mongo_client else None, name="tool_cache")
+    return _tool_cache
+
+_job_queue = None
+
+def get_job_queue():
+    """Lazily open the job store and start this process's job workers."""
+    global _job_queue
+    if _job_queue is None:
+        store = JobStore()
+        _job_queue = (store, JobWorkers(store, analyse_job))
+    _job_queue[1].ensure_started()
+    return _job_queue
+
+# Blueprints reach the queue through the app: importing app from them would load a
+# second copy of this module (and a second queue) when it runs as __main__
+app.extensions['job_queue'] = get_job_queue
+
+def analyse_job(request_data, cancel=None):
+    """Job worker entry point: run /process (or a JWT crack) for a queued payload and yield its events."""
+    if request_data.get('kind') == 'jwt_crack':
+        return crack_events(request_data, cancel)
+    with app.app_context():
+        response = start_analysis(request_data, events=True, cancel=cancel)
+    if isinstance(response, tuple):
+        return [{"status": "error", "error": response[0].get_json().get("error")}]
+    return response
+
+
 def is_tool_installed(tool_name):
     """Check if a tool is installed and available in PATH"""
     return shutil.which(tool_name) is not None
 
-def run_command(cmd):
+def accepts(tool, file_path):
+    """True when file_path is a format the registry selects tool for (by extension or magic bytes)."""
+    return get_tool(tool).applies(file_formats(file_path))
+
+def run_command(cmd, timeout=60):
     try:
         # Execute command and capture output
-        result = subprocess.run(cmd, shell=True, capture_output=True, timeout=60)
+        result = subprocess.run(cmd, shell=True, capture_output=True, timeout=timeout)
         # Handle both text and binary output appropriately
         try:
             # Try to decode as UTF-8 for text output
@@ -49,21 +164,20 @@ def run_command(cmd):
             output = result.stdout[:1000].hex()  # Show first 1000 bytes as hex
         return output
     except subprocess.TimeoutExpired:
-        error_msg = "Command timed out after 60 seconds"
+        error_msg = f"Command timed out after {timeout} seconds"
         return error_msg
     except Exception as e:
         error_msg = f"Error executing command: {str(e)}"
         return error_msg
 
-def run_zsteg_command(image_path):
+def run_zsteg_command(image_path, timeout=60):
     """Run zsteg safely with better error diagnostics."""
     try:
         # Check if file exists and is accessible
         if not os.path.exists(image_path):
             return f"File not found: {image_path}"
 
-        # Check file extension
-        if not image_path.lower().endswith(('.png', '.bmp', '.jpg', '.jpeg', '.gif')):
+        if not accepts("zsteg", image_path):
             return f"Unsupported file format: {image_path}"
 
         # Check if file is empty
@@ -76,7 +190,7 @@ def run_zsteg_command(image_path):
 
         # Execute zsteg with proper error handling
         result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, timeout=60
+            cmd, shell=True, capture_output=True, text=True, timeout=timeout
         )
 
         # Combine stdout and stderr
@@ -101,30 +215,39 @@ def run_zsteg_command(image_path):
         return output.strip() or "No hidden data found."
 
     except subprocess.TimeoutExpired:
-        return "zsteg timed out after 60s"
+        return f"zsteg timed out after {timeout}s"
     except Exception as e:
         return f"zsteg execution failed: {str(e)}"
 
-def crack_steghide_password_with_stegseek(image_path):
+def crack_steghide_password_with_stegseek(image_path, workspace=None):
     """Crack steghide password using StegSeek's built-in rockyou.txt dictionary."""
     if not is_tool_installed("stegseek"):
         return "StegSeek tool is not installed or not available in PATH"
 
-    if not image_path.lower().endswith(('.jpg', '.jpeg', '.bmp')):
-        return "Steghide only works with JPEG and BMP files"
+    if not accepts("steghide_crack", image_path):
+        return "Steghide only works with JPEG, BMP, WAV and AU files"
 
     try:
-        unique_id = str(uuid.uuid4())[:8]
-        extracted_file_path = f"/tmp/stegseek_output_{unique_id}.txt"
+        extracted_file_path = scratch_path(workspace, "stegseek_output.txt")
 
-        # No wordlist arg — stegseek uses its built-in rockyou.txt
-        cmd = f"stegseek -q '{image_path}' '{extracted_file_path}'"
-        print(f"[DEBUG] Running StegSeek: {cmd}")
-        
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=300)  # 5 minute timeout
-        output = result.stdout + result.stderr
+        # No wordlist arg — stegseek uses its built-in rockyou.txt. Streamed so
+        # progress reaches the client and a cancelled request kills the crack.
+        run = run_stegseek(image_path, extracted_file_path)
+        output = run["output"]
         print(f"[DEBUG] StegSeek output: {output}")
-        print(f"[DEBUG] StegSeek return code: {result.returncode}")
+        print(f"[DEBUG] StegSeek return code: {run['returncode']}")
+
+        if run["status"] != "done":
+            if os.path.exists(extracted_file_path):
+                os.remove(extracted_file_path)
+            if run["status"] == "timeout":
+                raise subprocess.TimeoutExpired("stegseek", STEGSEEK_TIMEOUT)
+            return {
+                "password_found": False,
+                "password": None,
+                "extracted_data": None,
+                "message": f"StegSeek cancelled after {run['elapsed']}s at {run['progress']:.1f}% of the wordlist"
+            }
         
         # Debug: Check if output file was created
         if os.path.exists(extracted_file_path):
@@ -134,18 +257,18 @@ def crack_steghide_password_with_stegseek(image_path):
         
         # Check if StegSeek found the password
         # StegSeek returns 0 on success, 1 on failure to find password, 2 on error
-        if result.returncode == 0:
+        if run["returncode"] == 0:
             # Success! Password found
             # Try to extract the password from the output
             lines = output.split('\n')
-            password = None
+            password = run["password"]
             
             # Look for the password in the output
             # StegSeek typically outputs the password to stdout
             for line in lines:
                 line = line.strip()
                 # Skip empty lines and status messages
-                if not line or line.startswith("StegSeek") or line.startswith("Progress") or "trying" in line.lower():
+                if not line or line.startswith("StegSeek") or line.startswith("[") or line.startswith("Progress") or "trying" in line.lower():
                     continue
                     
                 # If we have a line that's not a status message, it's likely the password
@@ -155,8 +278,11 @@ def crack_steghide_password_with_stegseek(image_path):
             
             # Try to read the extracted data
             extracted_data = ""
+            artifact = None
             if os.path.exists(extracted_file_path):
                 try:
+                    # The whole payload stays downloadable; the result only shows a preview
+                    artifact = save_artifact(extracted_file_path, "steghide_extracted.bin")
                     with open(extracted_file_path, 'rb') as f:
                         # Read as binary and try to decode as text
                         raw_data = f.read()
@@ -179,9 +305,10 @@ def crack_steghide_password_with_stegseek(image_path):
                 "password_found": True,
                 "password": password or "unknown",
                 "extracted_data": extracted_data[:500] + "..." if len(extracted_data) > 500 else extracted_data,
+                "artifact": artifact,
                 "message": f"Password cracked! Found password: '{password}'" if password else "Password cracked! But password could not be determined."
             }
-        elif result.returncode == 1:
+        elif run["returncode"] == 1:
             # No password found
             # Clean up any potential output files
             if os.path.exists(extracted_file_path):
@@ -209,14 +336,14 @@ def crack_steghide_password_with_stegseek(image_path):
                 "password_found": False,
                 "password": None,
                 "extracted_data": None,
-                "message": f"StegSeek execution failed with return code {result.returncode}: {output[:500]}..."
+                "message": f"StegSeek execution failed with return code {run['returncode']}: {output[:500]}..."
             }
     except subprocess.TimeoutExpired:
         return {
             "password_found": False,
             "password": None,
             "extracted_data": None,
-            "message": "StegSeek timed out after 5 minutes"
+            "message": f"StegSeek timed out after {STEGSEEK_TIMEOUT // 60} minutes"
         }
     except Exception as e:
         return {
@@ -226,146 +353,37 @@ def crack_steghide_password_with_stegseek(image_path):
             "message": f"StegSeek execution failed: {str(e)}"
         }
 
-def crack_steghide_password(image_path):
-    """Attempt to crack steghide password using StegSeek then a fallback dict."""
+def crack_steghide_password(image_path, workspace=None, wordlist=None):
+    """Attempt to crack steghide password using StegSeek then a parallel steghide dictionary run."""
     if is_tool_installed("stegseek"):
-        result = crack_steghide_password_with_stegseek(image_path)
+        result = crack_steghide_password_with_stegseek(image_path, workspace)
         if isinstance(result, dict) and result.get("password_found"):
             return result
+        if cancelled():
+            return result
     
     if not is_tool_installed("steghide"):
         return "Steghide tool is not installed or not available in PATH"
     
-    # Common passwords for dictionary attack
-    common_passwords = [
-        "", "password", "123456", "admin", "root", "toor", "guest", "user", 
-        "test", "demo", "secret", "hidden", "steg", "steganography", 
-        "hide", "data", "image", "picture", "photo", "file", "document",
-        "pass", "key", "unlock", "open", "access", "login", "signin",
-        "1234", "0000", "1111", "qwerty", "abc123", "password123",
-        "iloveyou", "princess", "rockyou", "dragon", "master", "monkey",
-        "letmein", "welcome", "flower", "football", "michael", "shadow",
-        "sunshine", "superman", "starwars", "trustno1", "hello", "world",
-        "12345", "654321", "password1", "123456789", "987654321", "qwerty123",
-        "12345678", "87654321", "9876543210", "0987654321", "asdfgh", "zxcvbnm",
-        "qazwsx", "123123", "123321", "112233", "11223344", "1122334455", "112233445566",
-        "a123456", "a123456789", "123456a", "123456789a", "abcd1234", "1234abcd",
-        "1q2w3e4r", "1qaz2wsx", "qwer1234", "1234qwer", "admin123", "administrator",
-        "login123", "root123", "default", "unknown", "public", "private", "system",
-        "computer", "internet", "network", "security", "cyber", "hacker", "crack",
-        "exploit", "vulnerability", "backdoor", "malware", "trojan", "virus", "worm",
-        "botnet", "ransomware", "spyware", "adware", "keylogger", "phishing", "scam",
-        "fraud", "identity", "theft", "encryption", "decryption", "cipher", "hash",
-        "md5", "sha1", "sha256", "sha512", "aes", "rsa", "pgp", "gpg", "ssl", "tls",
-        "https", "http", "ftp", "ssh", "telnet", "smtp", "pop3", "imap", "dns", "dhcp",
-        "vpn", "proxy", "firewall", "antivirus", "antimalware", "forensics", "stego",
-        "foremost", "binwalk", "exiftool", "pngcheck", "zsteg", "outguess", "camouflage",
-        "snow", "crypt", "cryptolab", "stegdetect", "stegbreak", "john", "hydra", "medusa",
-        "nmap", "wireshark", "burpsuite", "metasploit", "kali", "parrot", "ubuntu", "debian",
-        "windows", "linux", "macos", "android", "ios", "mobile", "desktop", "server",
-        "database", "mysql", "postgresql", "mongodb", "redis", "oracle", "mssql", "sqlite",
-        "apache", "nginx", "iis", "tomcat", "jboss", "websphere", "weblogic", "glassfish",
-        "python", "java", "javascript", "php", "ruby", "perl", "csharp", "cplus", "cplusplus",
-        "assembly", "machine", "binary", "hex", "octal", "decimal", "base64", "ascii",
-        "unicode", "utf8", "utf16", "utf32", "encoding", "decoding", "compression", "zip",
-        "rar", "7zip", "tar", "gzip", "bzip2", "xz", "lzma", "cab", "iso", "img", "dmg",
-        "exe", "dll", "sys", "bat", "cmd", "sh", "bash", "zsh", "fish", "powershell", "ps1",
-        "html", "css", "xml", "json", "yaml", "yml", "ini", "conf", "config", "txt", "log",
-        "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "odt", "ods", "odp", "rtf",
-        "jpg", "jpeg", "png", "gif", "bmp", "tiff", "svg", "ico", "raw", "cr2", "nef", "arw",
-        "mp3", "wav", "flac", "aac", "ogg", "wma", "m4a", "mp4", "avi", "mkv", "mov", "wmv",
-        "flv", "webm", "3gp", "mpg", "mpeg", "m2ts", "ts", "vob", "ifo", "bup"
-    ]
-    
-    # Check if file supports steghide (JPEG or BMP)
-    if not image_path.lower().endswith(('.jpg', '.jpeg', '.bmp')):
-        return "Steghide only works with JPEG and BMP files"
-    
-    # Try each password
-    for password in common_passwords:
-        try:
-            # Escape password for shell
-            escaped_password = password.replace("'", "'\"'\"'")
-            cmd = f"steghide extract -sf '{image_path}' -p '{escaped_password}' -xf '/tmp/steghide_output.txt' -f -q 2>&1"
-            
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-            output = result.stdout + result.stderr
-            
-            # Check if extraction was successful
-            if "wrote extracted data to" in output.lower() or "the same directory" in output.lower():
-                # Try to read the extracted data
-                try:
-                    with open('/tmp/steghide_output.txt', 'r') as f:
-                        extracted_data = f.read()
-                    # Clean up
-                    if os.path.exists('/tmp/steghide_output.txt'):
-                        os.remove('/tmp/steghide_output.txt')
-                    return {
-                        "password_found": True,
-                        "password": password,
-                        "extracted_data": extracted_data[:500] + "..." if len(extracted_data) > 500 else extracted_data,
-                        "message": f"Password cracked! Found password: '{password}'"
-                    }
-                except Exception as e:
-                    # Clean up
-                    if os.path.exists('/tmp/steghide_output.txt'):
-                        os.remove('/tmp/steghide_output.txt')
-                    return {
-                        "password_found": True,
-                        "password": password,
-                        "extracted_data": "Could not read extracted data",
-                        "message": f"Password cracked! Found password: '{password}' but could not read data"
-                    }
-            elif "could not extract" in output.lower() or "steghide" in output.lower() and "no" in output.lower():
-                # Password didn't work, continue to next
-                continue
-            else:
-                # Some other output, might be a hit
-                if len(output.strip()) > 0 and "no" not in output.lower() and "could not" not in output.lower():
-                    # Try to read any potential output file
-                    if os.path.exists('/tmp/steghide_output.txt'):
-                        try:
-                            with open('/tmp/steghide_output.txt', 'r') as f:
-                                extracted_data = f.read()
-                            # Clean up
-                            os.remove('/tmp/steghide_output.txt')
-                            return {
-                                "password_found": True,
-                                "password": password,
-                                "extracted_data": extracted_data[:500] + "..." if len(extracted_data) > 500 else extracted_data,
-                                "message": f"Password cracked! Found password: '{password}'"
-                            }
-                        except Exception:
-                            # Clean up
-                            if os.path.exists('/tmp/steghide_output.txt'):
-                                os.remove('/tmp/steghide_output.txt')
-        except subprocess.TimeoutExpired:
-            continue
-        except Exception as e:
-            continue
-    
-    # Clean up any remaining files
-    if os.path.exists('/tmp/steghide_output.txt'):
-        os.remove('/tmp/steghide_output.txt')
+    # Check if file supports steghide (by extension or magic bytes, as the registry does)
+    if not accepts("steghide_crack", image_path):
+        return "Steghide only works with JPEG, BMP, WAV and AU files"
     
-    return {
-        "password_found": False,
-        "password": None,
-        "extracted_data": None,
-        "message": "Password cracking completed. No password found in dictionary."
-    }
+    # Built-in passwords, then any requested or configured wordlist (name or path), memory-mapped
+    wordlists = [name for name in (wordlist, STEGHIDE_WORDLIST) if name]
+    return crack_parallel(image_path, iter_candidates(wordlists), workspace)
 
-def run_stegdetect(image_path):
+def run_stegdetect(image_path, timeout=30):
     """Run stegdetect against a JPEG image to identify steganography signature patterns."""
     if not is_tool_installed("stegdetect"):
         return "Stegdetect is not installed or available in PATH"
     
-    if not image_path.lower().endswith(('.jpg', '.jpeg')):
+    if not accepts("stegdetect", image_path):
         return "Stegdetect only operates on JPEG files"
         
     try:
         cmd = f'stegdetect -tjF "{image_path}" 2>&1'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
         output = result.stdout + result.stderr
         
         clean_lines = []
@@ -380,49 +398,49 @@ def run_stegdetect(image_path):
             
         return '\n'.join(clean_lines).strip() or "No anomalies detected."
     except subprocess.TimeoutExpired:
-        return "Stegdetect timed out after 30 seconds"
+        return f"Stegdetect timed out after {timeout} seconds"
     except Exception as e:
         return f"Stegdetect execution failed: {str(e)}"
 
-def run_tesseract(image_path):
+def run_tesseract(image_path, timeout=60):
     """Perform optical character recognition (OCR) using Tesseract to mine visual text."""
     if not is_tool_installed("tesseract"):
         return "Tesseract OCR engine is not installed or available in PATH"
         
-    if not image_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.gif')):
+    if not accepts("tesseract_ocr", image_path):
         return "Tesseract only operates on standard image formats"
         
     try:
         cmd = f'tesseract "{image_path}" stdout -l eng 2>/dev/null'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
         output = result.stdout.strip()
         
         if output:
             return output
         return "No readable visual text detected in image."
     except subprocess.TimeoutExpired:
-        return "Tesseract OCR timed out after 60 seconds"
+        return f"Tesseract OCR timed out after {timeout} seconds"
     except Exception as e:
         return f"Tesseract OCR execution failed: {str(e)}"
 
-def run_outguess(image_path):
+def run_outguess(image_path, workspace=None, timeout=45):
     """Attempt to detect and extract Outguess steganography payloads using an empty key."""
     if not is_tool_installed("outguess"):
         return "Outguess tool is not installed or available in PATH"
         
-    if not image_path.lower().endswith(('.jpg', '.jpeg')):
+    if not accepts("outguess", image_path):
         return "Outguess only operates on JPEG files"
         
-    unique_id = str(uuid.uuid4())[:8]
-    output_path = f"/tmp/outguess_output_{unique_id}.txt"
+    output_path = scratch_path(workspace, "outguess_output.txt")
     
     try:
         cmd = f'outguess -k "" -r "{image_path}" "{output_path}" 2>&1'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=45)
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
         output = result.stdout + result.stderr
         
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             try:
+                artifact = save_artifact(output_path, "outguess_extracted.bin")
                 with open(output_path, 'rb') as f:
                     raw_data = f.read()
                     try:
@@ -437,6 +455,7 @@ def run_outguess(image_path):
                 return {
                     "extracted": True,
                     "payload": extracted_data[:1000] + "..." if len(extracted_data) > 1000 else extracted_data,
+                    "artifact": artifact,
                     "message": "Success! Payload extracted using default empty key."
                 }
             except Exception as read_err:
@@ -465,7 +484,7 @@ def run_outguess(image_path):
         return {
             "extracted": False,
             "payload": None,
-            "message": "Outguess extraction timed out after 45 seconds"
+            "message": f"Outguess extraction timed out after {timeout} seconds"
         }
     except Exception as e:
         if os.path.exists(output_path):
@@ -476,6 +495,127 @@ def run_outguess(image_path):
             "message": f"Outguess execution failed: {str(e)}"
         }
 
+def run_lsb_scan(file_path):
+    """Vectorised zsteg-style LSB sweep over the decoded pixels (NumPy, no subprocess)."""
+    try:
+        from stego.bitplanes import load_pixels, scan, format_hits
+    except ImportError:
+        return {"found": False, "hits": [], "message": "NumPy is not installed"}
+    try:
+        pixels, channels = load_pixels(file_path)
+        hits, scanned = scan(pixels, channels)
+        if hits:
+            return {"found": True, "hits": hits, "specs_scanned": scanned, "summary": format_hits(hits),
+                    "message": f"{len(hits)} candidate payload(s) in {scanned} channel/bit combinations"}
+        return {"found": False, "hits": [], "specs_scanned": scanned,
+                "message": f"No readable payloads in {scanned} channel/bit combinations"}
+    except Exception as e:
+        return {"found": False, "hits": [], "message": f"LSB scan failed: {str(e)}"}
+
+def run_steganalysis(file_path):
+    """Chi-square, RS and sample pair analysis on the decoded pixels; estimates the LSB embedding rate."""
+    try:
+        from stego.bitplanes import load_pixels
+        from stego.steganalysis import analyse_pixels, format_report
+    except ImportError:
+        return {"suspicious": False, "message": "NumPy is not installed"}
+    try:
+        pixels, channels = load_pixels(file_path)
+        report = analyse_pixels(pixels, channels)
+        report["summary"] = format_report(report)
+        report["message"] = (f"Estimated LSB embedding rate {report['estimated_rate']:.1%}"
+                             + (" - likely hidden data" if report["suspicious"] else ""))
+        return report
+    except Exception as e:
+        return {"suspicious": False, "message": f"Steganalysis failed: {str(e)}"}
+
+def run_carve(file_path, workspace=None):
+    """In-process signature scan and carve: one regex pass over an mmap of the upload.
+
+    Carved files are kept in the artefact store; each entry carries only its
+    reference, fetched through /artifacts/<id>.
+    """
+    from stego.carving import scan, carve, format_table
+    try:
+        with borrow_workspace(file_path, workspace) as ws:
+            buf = ws.map_file(file_path)
+            hits, trailing = scan(buf)
+            embedded = [hit for hit in hits if hit["offset"] > 0]
+            if not embedded and not trailing:
+                return {"found": False, "signatures": hits, "trailing": None, "carved": [],
+                        "summary": format_table(hits, trailing), "message": "No embedded files or appended data"}
+            out_dir = ws.subdir("carved")
+            names = carve(buf, hits, trailing, out_dir)
+            carved = []
+            for name in names:
+                path = os.path.join(out_dir, name)
+                carved.append({"name": name, "size": os.path.getsize(path), "artifact": save_artifact(path)})
+            parts = [f"{len(embedded)} embedded file(s)"] if embedded else []
+            if trailing:
+                parts.append(f"{trailing['size']} bytes after end of file")
+            return {"found": True, "signatures": hits, "trailing": trailing, "carved": carved,
+                    "summary": format_table(hits, trailing), "message": "Found " + " and ".join(parts)}
+    except Exception as e:
+        return {"found": False, "signatures": [], "carved": [], "message": f"Carving failed: {str(e)}"}
+
+def run_strings(file_path, workspace=None):
+    """In-process strings: ASCII and UTF-16LE/BE runs in one pass, most interesting first.
+
+    The result carries the top STRINGS_TOP_N strings; the full list is kept
+    in the artefact store ("full_list" is its reference, None if it could not
+    be stored) and /strings pages through it by "listId".
+    """
+    from stego.strings import extract_strings, page, write_list, ENCODINGS, STRINGS_TOP_N
+    try:
+        with borrow_workspace(file_path, workspace) as ws:
+            strings = extract_strings(ws.map_file(file_path))
+            list_path = ws.path("strings.tsv")
+            write_list(strings, list_path)
+            full_list = save_artifact(list_path, name="strings.tsv", mime="text/tab-separated-values")
+        counts = {encoding: sum(1 for s in strings if s["encoding"] == encoding) for encoding in ENCODINGS}
+        top = page(strings, limit=STRINGS_TOP_N)["strings"]
+        interesting = sum(1 for s in strings if s["score"])
+        return {"total": len(strings), "counts": counts, "strings": top,
+                "summary": "\n".join(s["text"] for s in top), "full_list": full_list,
+                "message": f"{len(strings)} strings ({interesting} of interest)"}
+    except Exception as e:
+        return {"total": 0, "strings": [], "message": f"Strings extraction failed: {str(e)}"}
+
+def all_strings_text(workspace, result):
+    """Every string of the input, one per line, up to DECODE_MAX_TEXT characters.
+
+    Read from the list run_strings stored; when that is gone (or was never
+    stored) the input is scanned again.
+    """
+    from stego.strings import extract_strings, read_list
+    ref = result.get("full_list")
+    stored = get_artifact_store().get(ref["id"]) if isinstance(ref, dict) else None
+    strings = read_list(stored[0]) if stored else extract_strings(workspace.map_file(workspace.input_path))
+    texts, size = [], 0
+    for text in (s["text"] for s in strings):
+        if size >= DECODE_MAX_TEXT:
+            break
+        texts.append(text)
+        size += len(text) + 1
+    return "\n".join(texts)
+
+def run_foremost(file_path, workspace=None):
+    """Carve with foremost; the carved files are kept in the artefact store and listed.
+
+    Always {"message", "artifacts"}: message is the text shown for the tool.
+    """
+    try:
+        with borrow_workspace(file_path, workspace) as ws:
+            out_dir = ws.path("foremost_out")
+            subprocess.run(f'foremost -i "{file_path}" -o "{out_dir}"', shell=True, capture_output=True, text=True, timeout=60)
+            artifacts = save_directory(out_dir, skip=("audit.txt",)) if os.path.isdir(out_dir) else []
+            listing = "\n".join("foremost_out/" + ref["name"] for ref in artifacts)
+            return {"message": listing or "Foremost analysis complete but no data found", "artifacts": artifacts}
+    except subprocess.TimeoutExpired:
+        return {"message": "Command timed out after 60 seconds", "artifacts": []}
+    except Exception as e:
+        return {"message": f"Foremost execution failed: {str(e)}", "artifacts": []}
+
 def run_file_command(file_path):
     """Identify file type from magic bytes."""
     try:
@@ -492,24 +632,19 @@ def run_xxd(file_path):
     except Exception as e:
         return f"xxd failed: {str(e)}"
 
-def run_morse_detect(file_path):
+def run_morse_detect(file_path, workspace=None):
     """Detect Morse code in audio using multimon-ng MORSE_CW mode."""
     if not is_tool_installed("multimon-ng"):
         return "multimon-ng is not installed"
     if not is_tool_installed("ffmpeg"):
         return "ffmpeg is not installed (required for audio conversion)"
-    uid = str(uuid.uuid4())[:8]
-    raw_path = f"/tmp/morse_{uid}.raw"
     try:
-        conv_cmd = f'ffmpeg -y -i "{file_path}" -ar 22050 -ac 1 -f s16le "{raw_path}" 2>&1'
-        conv_res = subprocess.run(conv_cmd, shell=True, capture_output=True, text=True, timeout=30)
-        if not os.path.exists(raw_path) or os.path.getsize(raw_path) == 0:
-            return f"Audio conversion failed: {(conv_res.stdout + conv_res.stderr).strip()[:200]}"
-        mmng_cmd = f'multimon-ng -t raw -a MORSE_CW "{raw_path}" 2>&1'
-        result = subprocess.run(mmng_cmd, shell=True, capture_output=True, text=True, timeout=60)
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
+        with borrow_workspace(file_path, workspace) as ws:
+            raw_path, conv_output = decoded_audio_path(file_path, ws, PCM_TARGET)
+            if not raw_path:
+                return f"Audio conversion failed: {conv_output[:200]}"
+            mmng_cmd = f'multimon-ng -t raw -a MORSE_CW "{raw_path}" 2>&1'
+            result = subprocess.run(mmng_cmd, shell=True, capture_output=True, text=True, timeout=60)
         output = (result.stdout + result.stderr).strip()
         if not output or "MORSE_CW:" not in output:
             return "No Morse code detected."
@@ -517,14 +652,8 @@ def run_morse_detect(file_path):
         decoded = ' '.join(l.split("MORSE_CW:")[-1].strip() for l in lines)
         return f"Morse code detected!\n\nDecoded: {decoded}\n\nRaw output:\n{output}"
     except subprocess.TimeoutExpired:
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return "Morse detection timed out"
     except Exception as e:
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return f"Morse detection failed: {str(e)}"
 
 def run_zbarimg(file_path):
@@ -579,106 +708,116 @@ def run_jsteg(file_path):
     except Exception as e:
         return {"found": False, "data": None, "message": f"jsteg failed: {str(e)}"}
 
-def run_stegoveritas(file_path):
-    """Run StegOveritas comprehensive CTF steg checker."""
+def run_stegoveritas(file_path, workspace=None, timeout=180):
+    """Run StegOveritas comprehensive CTF steg checker.
+
+    Always {"message", "artifacts"}: message is the text shown for the tool.
+    """
     if not is_tool_installed("stegoveritas"):
-        return "stegoveritas is not installed"
-    uid = str(uuid.uuid4())[:8]
-    out_dir = f"/tmp/sv_{uid}"
+        return {"message": "stegoveritas is not installed", "artifacts": []}
+    out_dir = scratch_path(workspace, "stegoveritas")
     try:
         cmd = f'stegoveritas -meta -imageTransform -colorMap -trailing -extractLSB -out "{out_dir}" "{file_path}" 2>&1'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=180)
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
         output = (result.stdout + result.stderr).strip()
+        artifacts = []
         if os.path.exists(out_dir):
+            # Transforms, extracted LSB data and trailing bytes outlive the request in the artefact store
+            artifacts = save_directory(out_dir)
             shutil.rmtree(out_dir, ignore_errors=True)
-        return output or "StegOveritas found no anomalies."
+        return {"message": output or "StegOveritas found no anomalies.", "artifacts": artifacts}
     except subprocess.TimeoutExpired:
         if os.path.exists(out_dir):
             shutil.rmtree(out_dir, ignore_errors=True)
-        return "stegoveritas timed out after 180s"
+        return {"message": f"stegoveritas timed out after {timeout}s", "artifacts": []}
     except Exception as e:
-        return f"stegoveritas failed: {str(e)}"
+        return {"message": f"stegoveritas failed: {str(e)}", "artifacts": []}
 
-def run_sox_spectrogram(file_path):
+def run_sox_spectrogram(file_path, workspace=None):
     """Generate audio spectrogram PNG. Converts non-WAV formats via ffmpeg first."""
     if not is_tool_installed("sox"):
         return {"image": None, "message": "sox is not installed"}
-    uid = str(uuid.uuid4())[:8]
-    out_png = f"/tmp/spectrogram_{uid}.png"
-    tmp_wav = None
-    work_file = file_path
-
-    # sox often lacks MP3/OGG/FLAC decoders — use ffmpeg to convert to WAV first
-    if not file_path.lower().endswith('.wav') and is_tool_installed("ffmpeg"):
-        tmp_wav = f"/tmp/sox_conv_{uid}.wav"
-        conv = subprocess.run(
-            f'ffmpeg -y -i "{file_path}" -ar 44100 -ac 2 "{tmp_wav}" 2>&1',
-            shell=True, capture_output=True, text=True, timeout=30
-        )
-        if os.path.exists(tmp_wav) and os.path.getsize(tmp_wav) > 0:
-            work_file = tmp_wav
-
     try:
-        cmd = f'sox "{work_file}" -n spectrogram -o "{out_png}" 2>&1'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
-        if os.path.exists(out_png) and os.path.getsize(out_png) > 0:
-            with open(out_png, 'rb') as f:
-                img_b64 = base64.b64encode(f.read()).decode('utf-8')
-            os.remove(out_png)
-            if tmp_wav and os.path.exists(tmp_wav):
-                try: os.remove(tmp_wav)
-                except: pass
-            return {"image": img_b64, "message": "Spectrogram generated — check for text or patterns hidden in frequency bands!"}
+        with borrow_workspace(file_path, workspace) as ws:
+            out_png = ws.path("spectrogram.png")
+            work_file = file_path
+
+            # sox often lacks MP3/OGG/FLAC decoders — use ffmpeg to convert to WAV first
+            if not is_pcm_wav(file_path) and is_tool_installed("ffmpeg"):
+                wav_path, _ = decoded_audio_path(file_path, ws, WAV_TARGET)
+                if wav_path:
+                    work_file = wav_path
+
+            cmd = f'sox "{work_file}" -n spectrogram -o "{out_png}" 2>&1'
+            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=60)
+            if os.path.exists(out_png) and os.path.getsize(out_png) > 0:
+                with open(out_png, 'rb') as f:
+                    img_b64 = base64.b64encode(f.read()).decode('utf-8')
+                return {"image": img_b64, "message": "Spectrogram generated — check for text or patterns hidden in frequency bands!"}
         output = (result.stdout + result.stderr).strip()
-        if tmp_wav and os.path.exists(tmp_wav):
-            try: os.remove(tmp_wav)
-            except: pass
         return {"image": None, "message": f"Spectrogram generation failed: {output}"}
     except subprocess.TimeoutExpired:
-        if tmp_wav and os.path.exists(tmp_wav):
-            try: os.remove(tmp_wav)
-            except: pass
         return {"image": None, "message": "sox timed out after 60s"}
     except Exception as e:
-        if tmp_wav and os.path.exists(tmp_wav):
-            try: os.remove(tmp_wav)
-            except: pass
         return {"image": None, "message": f"sox failed: {str(e)}"}
 
-def run_rtty_decode(file_path):
+def _spectrogram_source(file_path, workspace):
+    """A PCM WAV the native engine can stream: the upload itself or the shared 44.1 kHz decode."""
+    if is_pcm_wav(file_path):
+        return file_path
+    if is_tool_installed("ffmpeg"):
+        wav_path, _ = decoded_audio_path(file_path, workspace, WAV_TARGET)
+        return wav_path
+    return None
+
+def run_spectrogram(file_path, workspace=None, options=None, output="png"):
+    """Generate a spectrogram in-process with NumPy; falls back to sox when that is not possible."""
+    try:
+        from stego.spectrogram import spectrogram_from_wav
+    except ImportError:
+        return run_sox_spectrogram(file_path, workspace)
+    try:
+        with borrow_workspace(file_path, workspace) as ws:
+            wav_path = _spectrogram_source(file_path, ws)
+            if not wav_path:
+                return run_sox_spectrogram(file_path, ws)
+            result = spectrogram_from_wav(wav_path, options, output)
+        result["engine"] = "numpy"
+        result["message"] = "Spectrogram generated — check for text or patterns hidden in frequency bands!"
+        return result
+    except ValueError as e:
+        return {"image": None, "message": f"Spectrogram generation failed: {str(e)}"}
+    except Exception as e:
+        return {"image": None, "message": f"Spectrogram failed: {str(e)}"}
+
+def run_rtty_decode(file_path, workspace=None):
     """Decode RTTY / Baudot signals via multimon-ng (EEA, EIA, CCIR modes)."""
     if not is_tool_installed("multimon-ng"):
         return "multimon-ng is not installed"
     if not is_tool_installed("ffmpeg"):
         return "ffmpeg is not installed"
-    uid = str(uuid.uuid4())[:8]
-    raw_path = f"/tmp/rtty_{uid}.raw"
     try:
-        subprocess.run(
-            f'ffmpeg -y -i "{file_path}" -ar 22050 -ac 1 -f s16le "{raw_path}" 2>&1',
-            shell=True, capture_output=True, text=True, timeout=30
-        )
-        if not os.path.exists(raw_path) or os.path.getsize(raw_path) == 0:
-            return "Audio conversion failed"
-        all_output = []
-        # Valid multimon-ng modes for teleprinter signals
-        for mode in ["EEA", "EIA", "CCIR"]:
+        with borrow_workspace(file_path, workspace) as ws:
+            raw_path, _ = decoded_audio_path(file_path, ws, PCM_TARGET)
+            if not raw_path:
+                return "Audio conversion failed"
+            # Valid multimon-ng modes for teleprinter signals, all demodulated in one pass
+            modes = ["EEA", "EIA", "CCIR"]
+            demodulators = ' '.join(f'-a {mode}' for mode in modes)
             r = subprocess.run(
-                f'multimon-ng -t raw -a {mode} "{raw_path}" 2>&1',
-                shell=True, capture_output=True, text=True, timeout=30
+                f'multimon-ng -t raw {demodulators} "{raw_path}" 2>&1',
+                shell=True, capture_output=True, text=True, timeout=60
             )
-            out = (r.stdout + r.stderr).strip()
-            lines = [l for l in out.split('\n') if f"{mode}:" in l]
+        out = (r.stdout + r.stderr).strip()
+        all_output = []
+        for mode in modes:
+            lines = [l for l in out.split('\n') if l.startswith(f"{mode}:")]
             if lines:
                 all_output.append(f"=== {mode} ===\n" + '\n'.join(lines))
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return '\n\n'.join(all_output) if all_output else "No RTTY/Baudot signals detected."
+    except subprocess.TimeoutExpired:
+        return "RTTY decode timed out"
     except Exception as e:
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return f"RTTY decode failed: {str(e)}"
 
 def run_ffmpeg_info(file_path):
@@ -697,34 +836,23 @@ def run_ffmpeg_info(file_path):
     except Exception as e:
         return f"ffmpeg failed: {str(e)}"
 
-def run_sox_info(file_path):
+def run_sox_info(file_path, workspace=None):
     """Get sample rate, channels, bit depth, duration. Converts non-WAV via ffmpeg first."""
     if not is_tool_installed("sox"):
         return "sox is not installed"
-    uid = str(uuid.uuid4())[:8]
-    tmp_wav = None
-    work_file = file_path
-    if not file_path.lower().endswith('.wav') and is_tool_installed("ffmpeg"):
-        tmp_wav = f"/tmp/soxinfo_{uid}.wav"
-        subprocess.run(
-            f'ffmpeg -y -i "{file_path}" -ar 44100 -ac 2 "{tmp_wav}" 2>&1',
-            shell=True, capture_output=True, text=True, timeout=30
-        )
-        if os.path.exists(tmp_wav) and os.path.getsize(tmp_wav) > 0:
-            work_file = tmp_wav
     try:
-        result = subprocess.run(
-            f'sox --info "{work_file}" 2>&1',
-            shell=True, capture_output=True, text=True, timeout=15
-        )
-        if tmp_wav and os.path.exists(tmp_wav):
-            try: os.remove(tmp_wav)
-            except: pass
+        with borrow_workspace(file_path, workspace) as ws:
+            work_file = file_path
+            if not is_pcm_wav(file_path) and is_tool_installed("ffmpeg"):
+                wav_path, _ = decoded_audio_path(file_path, ws, WAV_TARGET)
+                if wav_path:
+                    work_file = wav_path
+            result = subprocess.run(
+                f'sox --info "{work_file}" 2>&1',
+                shell=True, capture_output=True, text=True, timeout=15
+            )
         return (result.stdout + result.stderr).strip() or "No output from sox --info"
     except subprocess.TimeoutExpired:
-        if tmp_wav and os.path.exists(tmp_wav):
-            try: os.remove(tmp_wav)
-            except: pass
         return "sox --info timed out"
     except Exception as e:
         return f"sox --info failed: {str(e)}"
@@ -744,43 +872,94 @@ def run_mediainfo(file_path):
     except Exception as e:
         return f"mediainfo failed: {str(e)}"
 
-def run_dtmf_detect(file_path):
+def run_dtmf_detect(file_path, workspace=None):
     """Detect DTMF phone tones using multimon-ng. Uses ffmpeg for format conversion."""
     if not is_tool_installed("multimon-ng"):
         return "multimon-ng is not installed"
     if not is_tool_installed("ffmpeg"):
         return "ffmpeg is not installed (required for audio conversion)"
-    uid = str(uuid.uuid4())[:8]
-    raw_path = f"/tmp/dtmf_{uid}.raw"
     try:
-        # ffmpeg → 22050 Hz mono signed 16-bit little-endian raw (works for all formats)
-        conv_cmd = f'ffmpeg -y -i "{file_path}" -ar 22050 -ac 1 -f s16le "{raw_path}" 2>&1'
-        conv_res = subprocess.run(conv_cmd, shell=True, capture_output=True, text=True, timeout=30)
-        if not os.path.exists(raw_path) or os.path.getsize(raw_path) == 0:
-            return f"Audio conversion failed: {(conv_res.stdout + conv_res.stderr).strip()[:200]}"
-
-        mmng_cmd = f'multimon-ng -t raw -a DTMF "{raw_path}" 2>&1'
-        result = subprocess.run(mmng_cmd, shell=True, capture_output=True, text=True, timeout=30)
+        with borrow_workspace(file_path, workspace) as ws:
+            raw_path, conv_output = decoded_audio_path(file_path, ws, PCM_TARGET)
+            if not raw_path:
+                return f"Audio conversion failed: {conv_output[:200]}"
 
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
+            mmng_cmd = f'multimon-ng -t raw -a DTMF "{raw_path}" 2>&1'
+            result = subprocess.run(mmng_cmd, shell=True, capture_output=True, text=True, timeout=30)
 
         output = (result.stdout + result.stderr).strip()
         if not output or "DTMF:" not in output:
             return "No DTMF tones detected."
         return output
     except subprocess.TimeoutExpired:
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return "DTMF detection timed out"
     except Exception as e:
-        if os.path.exists(raw_path):
-            try: os.remove(raw_path)
-            except: pass
         return f"DTMF detection failed: {str(e)}"
 
+ZSTEG_FORK = os.environ.get("ZSTEG_FORK", "1") != "0"
+
+# Every analyser /process can run: where it applies, what it needs and what it
+# costs. Registration order is report order; their binaries' fingerprints
+# version the per-tool cache.
+register(Tool("file_type", run_file_command, binaries=["file"], cost=0.1))
+register(Tool("hashes", format_digests, args=("digests", "path"), cost=0))  # hashed in-process
+register(Tool("xxd", run_xxd, binaries=["xxd"], cost=0.2))
+register(Tool("strings", run_strings, args=("path", "workspace"), cost=0.5, output="json"))
+register(Tool("carve", run_carve, args=("path", "workspace"), cost=0.5, output="json"))
+# binwalk and foremost re-read the whole file in their own processes; "carve" covers
+# their common signatures, so they only run in deep mode
+register(Tool("binwalk", command="binwalk '{path}'", binaries=["binwalk"], cost=2, deep=True))
+register(Tool("foremost", run_foremost, args=("path", "workspace"),
+              binaries=["foremost"], available=lambda: is_tool_installed("foremost"),
+              skip_message="Foremost tool is not installed or not available in PATH", cost=5, deep=True))
+register(Tool("exiftool", command="exiftool '{path}' 2>&1 || echo 'Exiftool failed'", binaries=["exiftool"], cost=0.5))
+# The native lsb_scan covers zsteg's sweep; ZSTEG_FORK=0 drops the Ruby fork
+register(Tool("zsteg", run_zsteg_command, args=("path", "timeout"), formats=ZSTEG_FORMATS, binaries=["zsteg"],
+              available=lambda: ZSTEG_FORK and is_tool_installed("zsteg"), cost=10))
+register(Tool("pngcheck", command="pngcheck '{path}' 2>&1 || echo 'PNGCheck failed or not a PNG file'",
+              formats=IMAGE_FORMATS, binaries=["pngcheck"], cost=0.1))
+register(Tool("steghide_crack", crack_steghide_password, args=("path", "workspace"),
+              formats=STEGHIDE_FORMATS, binaries=["stegseek", "steghide"],
+              available=lambda: is_tool_installed("stegseek") or is_tool_installed("steghide"),
+              skip_message="Steghide password cracking not available for this file type or steghide not installed",
+              cost=300, timeout=STEGSEEK_TIMEOUT, message="Running steghide_crack (this may take time)...",
+              output="json"))
+# Native bit-plane tools (lossless images only; JPEG pixels are re-quantised)
+register(Tool("lsb_scan", run_lsb_scan, formats=LOSSLESS_IMAGE_FORMATS, cost=2, output="json"))
+register(Tool("steganalysis", run_steganalysis, formats=LOSSLESS_IMAGE_FORMATS, cost=1, output="json"))
+register(Tool("stegdetect", run_stegdetect, args=("path", "timeout"), formats=("jpeg",), binaries=["stegdetect"],
+              cost=1, timeout=30))
+register(Tool("outguess", run_outguess, args=("path", "workspace", "timeout"), formats=("jpeg",), binaries=["outguess"],
+              cost=5, timeout=45))
+register(Tool("tesseract_ocr", run_tesseract, args=("path", "timeout"), formats=("png", "jpeg", "bmp", "webp", "gif"),
+              binaries=["tesseract"], cost=5))
+register(Tool("zbarimg", run_zbarimg, formats=("png", "jpeg", "bmp", "gif", "webp"), binaries=["zbarimg"],
+              cost=1, message="Running zbarimg (QR/barcode scan)..."))
+register(Tool("identify", run_identify, formats=IMAGE_FORMATS, binaries=["identify"], cost=0.5))
+register(Tool("jsteg", run_jsteg, formats=("jpeg",), binaries=["jsteg"], cost=1,
+              message="Running jsteg (JPEG LSB check)...", output="json"))
+register(Tool("stegoveritas", run_stegoveritas, args=("path", "workspace", "timeout"),
+              formats=("png", "jpeg", "bmp", "gif", "webp"), binaries=["stegoveritas"], cost=60, timeout=180,
+              message="Running stegoveritas (may take ~30s)..."))
+# Audio converters share the workspace: one ffmpeg decode feeds all of them
+register(Tool("ffmpeg_info", run_ffmpeg_info, formats=AUDIO_FORMATS, binaries=["ffmpeg"], cost=0.5))
+register(Tool("sox_info", run_sox_info, args=("path", "workspace"), formats=AUDIO_FORMATS,
+              binaries=["sox", "ffmpeg"], cost=1))
+register(Tool("sox_spectrogram", run_spectrogram, args=("path", "workspace"), formats=AUDIO_FORMATS,
+              binaries=["ffmpeg", "sox"], cost=3, output="json"))  # NumPy engine, sox fallback
+register(Tool("mediainfo", run_mediainfo, formats=AUDIO_FORMATS, binaries=["mediainfo"], cost=0.5))
+register(Tool("dtmf_detect", run_dtmf_detect, args=("path", "workspace"), formats=AUDIO_FORMATS,
+              binaries=["multimon-ng", "ffmpeg"], cost=5))
+register(Tool("morse_detect", run_morse_detect, args=("path", "workspace"), formats=AUDIO_FORMATS,
+              binaries=["multimon-ng", "ffmpeg"], cost=5))
+register(Tool("rtty_decode", run_rtty_decode, args=("path", "workspace"), formats=AUDIO_FORMATS,
+              binaries=["multimon-ng", "ffmpeg"], cost=5))
+
+def tool_version(tool):
+    """Fingerprint of the installed binaries a tool entry depends on."""
+    entry = get_tool(tool)
+    return binary_fingerprint(entry.binaries if entry else [])
+
 def get_file_extension_from_mime(content_type, original_filename):
     """Get appropriate file extension based on content type and original filename"""
     # First, try to get extension from the original filename
@@ -812,59 +991,344 @@ def get_file_extension_from_mime(content_type, original_filename):
     # Default to .bin if we can't determine
     return '.bin'
 
+def normalize_extension(file_name, content_type):
+    """Extension the upload is saved with, so extension-sniffing tools see the real format."""
+    # Preserve the exact original extension - this is critical for steganalysis tools
+    file_extension = ""
+    if file_name and '.' in file_name:
+        file_extension = os.path.splitext(file_name)[1]
+    else:
+        # Try to determine extension from content type if not in filename
+        file_extension = get_file_extension_from_mime(content_type, file_name)
+    
+    # Validate that we have a proper extension for steganalysis tools
+    supported_extensions = {'.png': '.png', '.bmp': '.bmp', '.jpg': '.jpg', '.jpeg': '.jpg', '.gif': '.gif'}
+    if file_extension.lower() in supported_extensions:
+        # Use the exact original extension to preserve file format
+        normalized_extension = file_extension
+    else:
+        # For unsupported extensions, try to map to a supported one based on content type
+        if content_type:
+            if 'image/jpeg' in content_type or 'image/jpg' in content_type:
+                normalized_extension = '.jpg'
+            elif 'image/png' in content_type:
+                normalized_extension = '.png'
+            elif 'image/bmp' in content_type:
+                normalized_extension = '.bmp'
+            elif 'image/gif' in content_type:
+                normalized_extension = '.gif'
+            else:
+                # Default to .jpg for unknown image types
+                normalized_extension = '.jpg' if content_type and content_type.startswith('image/') else file_extension
+        else:
+            normalized_extension = file_extension
+    return normalized_extension
+
 @app.route('/', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "service": "cicaado-processor"}), 200
 
+@app.route('/tools', methods=['GET'])
+def list_tools():
+    """Registered analysers with their formats, MIME types, cost, lane and availability."""
+    return jsonify({"tools": [tool.info() for tool in TOOLS.values()]})
+
+@app.route('/artifacts/<artifact_id>', methods=['GET'])
+def get_artifact(artifact_id):
+    """Download a stored payload by id (its SHA256); Range requests get partial content."""
+    from flask import send_file
+    found = get_artifact_store().get(artifact_id)
+    if found is None:
+        return jsonify({'error': 'Artifact not found'}), 404
+    path, meta = found
+    # The id is the content hash, so it doubles as a strong ETag
+    return send_file(path, mimetype=meta["mime"], download_name=os.path.basename(meta["name"]),
+                     conditional=True, etag=artifact_id, max_age=3600)
+
+@app.route('/metrics/lanes', methods=['GET'])
+def lanes_metrics():
+    """Concurrency limit, running and queued tools per scheduler lane (this worker process)."""
+    return jsonify({"pid": os.getpid(), "lanes": lane_metrics()})
+
+def load_request_file(data):
+    """Copy the file a JSON request points at (originalFileId in GridFS, artifactId in the
+    artefact store, or base64 fileData) into a new workspace.
+
+    GridFS and artefact files are copied in chunks and hashed on the way,
+    never read into memory as a whole. The caller cleans the workspace up.
+    Returns ((workspace, digests), file name, None) or (None, None, error response).
+    """
+    original_file_id = data.get('originalFileId')
+    artifact_id = data.get('artifactId')
+    file_data = data.get('fileData')
+    file_name = data.get('fileName') or ''
+    content_type = data.get('contentType')
+    if not original_file_id and not artifact_id and not file_data:
+        return None, None, (jsonify({'error': 'Missing file data, originalFileId or artifactId'}), 400)
+    workspace = None
+    try:
+        if artifact_id:
+            found = get_artifact_store().get(artifact_id)
+            if found is None:
+                return None, None, (jsonify({'error': 'Artifact not found'}), 404)
+            artifact_path, meta = found
+            file_name = file_name or meta["name"]
+            workspace = Workspace(size_hint=meta["size"])
+            with open(artifact_path, 'rb') as f:
+                digests = stream_to_workspace(workspace, f, normalize_extension(file_name, content_type or meta["mime"]))
+        elif original_file_id:
+            grid_out, error = open_upload(original_file_id)
+            if error:
+                return None, None, error
+            file_name = file_name or grid_out.filename or ''
+            workspace = Workspace(size_hint=grid_out.length)
+            digests = stream_to_workspace(workspace, grid_out, normalize_extension(file_name, content_type))
+        else:
+            file_bytes = base64.b64decode(file_data)
+            workspace = Workspace(size_hint=len(file_bytes))
+            workspace.add_input(file_bytes, normalize_extension(file_name, content_type))
+            digests = compute_digests(file_bytes)
+    except Exception as e:
+        if workspace is not None:
+            workspace.cleanup()
+        return None, None, (jsonify({'error': f'Cannot load file: {str(e)}'}), 400)
+    if not os.path.getsize(workspace.input_path):
+        workspace.cleanup()
+        return None, None, (jsonify({'error': 'File data is empty'}), 400)
+    return (workspace, digests), file_name, None
+
+@app.route('/strings', methods=['POST'])
+def strings_page():
+    """Page through every string of an upload.
+
+    "offset"/"limit" select the page, "order" is "interest" (default) or
+    "offset", "encoding" keeps one of ascii/utf-16le/utf-16be and "query"
+    is a case-insensitive substring filter; "minLength" overrides the
+    shortest run reported. "listId" (the id of a strings result's
+    "full_list") pages the stored list instead of extracting the upload again.
+    """
+    from stego.strings import extract_strings, load_list, page, ENCODINGS, STRINGS_MIN_LENGTH, STRINGS_TOP_N
+    data = request.json or {}
+    try:
+        offset = max(0, int(data.get('offset', 0)))
+        limit = max(1, min(int(data.get('limit', STRINGS_TOP_N)), 5000))
+        min_length = max(2, int(data.get('minLength', STRINGS_MIN_LENGTH)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'offset, limit and minLength must be integers'}), 400
+    order = data.get('order', 'interest')
+    if order not in ('interest', 'offset'):
+        return jsonify({'error': 'order must be "interest" or "offset"'}), 400
+    encoding = data.get('encoding')
+    if encoding and encoding not in ENCODINGS:
+        return jsonify({'error': f'encoding must be one of {", ".join(ENCODINGS)}'}), 400
+    # The stored list holds runs of STRINGS_MIN_LENGTH and up; shorter ones, or an
+    # expired list, need the upload itself
+    stored = get_artifact_store().get(data.get('listId')) if data.get('listId') else None
+    if stored and min_length >= STRINGS_MIN_LENGTH:
+        strings = load_list(stored[0], min_length)
+    else:
+        upload, _, error = load_request_file(data)
+        if error:
+            return error
+        with upload[0] as workspace:
+            strings = extract_strings(workspace.map_file(workspace.input_path), min_length)
+    return jsonify(page(strings, offset, limit, order, encoding, data.get('query')))
+
+@app.route('/bitplanes', methods=['POST'])
+def bitplanes():
+    """Bit-plane decomposition and LSB payload extraction for an uploaded image.
+
+    Default: every plane of every channel as packed 1-bit bitmaps.
+    "plane": {"channel": "r", "bit": 0} renders one plane as PNG.
+    "spec": "b1,rgb,lsb,xy" extracts that payload (optionally "maxBytes").
+    "scan": true runs the zsteg-style sweep.
+    """
+    try:
+        from stego import bitplanes as bp
+    except ImportError:
+        return jsonify({'error': 'NumPy is not installed'}), 500
+    data = request.json or {}
+    upload, _, error = load_request_file(data)
+    if error:
+        return error
+    with upload[0] as workspace:
+        try:
+            pixels, channels = bp.load_pixels(workspace.input_path)
+        except Exception as e:
+            return jsonify({'error': f'Cannot decode image: {str(e)}'}), 400
+
+    try:
+        if data.get('scan'):
+            hits, scanned = bp.scan(pixels, channels)
+            return jsonify({"channels": channels, "specs_scanned": scanned, "hits": hits})
+        if data.get('spec'):
+            max_bytes = data.get('maxBytes')
+            payload = bp.extract_payload(pixels, channels, data['spec'], int(max_bytes) if max_bytes else None)
+            return jsonify({"spec": data['spec'], "size": len(payload),
+                            "payload": base64.b64encode(payload).decode('utf-8'),
+                            "detected": bp.describe_payload(payload)})
+        if data.get('plane'):
+            plane = data['plane']
+            png = bp.plane_png(pixels, channels, plane.get('channel', channels[0]), int(plane.get('bit', 0)))
+            return jsonify({"image": base64.b64encode(png).decode('utf-8')})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({"channels": channels, **bp.packed_bitmaps(pixels, channels)})
+
+@app.route('/spectrogram', methods=['POST'])
+def spectrogram():
+    """Re-render a spectrogram with custom window/hop/scale/frequency band, without re-uploading."""
+    data = request.json or {}
+    options = {
+        "window": data.get('window'),
+        "n_fft": data.get('nFft'),
+        "hop": data.get('hop'),
+        "log_scale": data.get('logScale'),
+        "dynamic_range_db": data.get('dynamicRange'),
+        "fmin": data.get('fmin'),
+        "fmax": data.get('fmax'),
+        "max_columns": data.get('maxColumns'),
+    }
+    output = 'tiles' if data.get('format') == 'tiles' else 'png'
+
+    upload, _, error = load_request_file(data)
+    if error:
+        return error
+    with upload[0] as workspace:
+        result = run_spectrogram(workspace.input_path, workspace, options, output)
+    if not result.get("image") and not result.get("tiles"):
+        return jsonify({'error': result.get("message", "Spectrogram generation failed")}), 400
+    return jsonify(result)
+
+# Bytes copied per read when streaming an upload (request body or GridFS) to the workspace
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def stream_to_workspace(workspace, stream, extension, max_bytes=None):
+    """Write stream to the workspace input file in chunks and return its digests."""
+    hashers = new_hashers()
+    workspace.add_input_stream(stream, extension, hashers.values(), UPLOAD_CHUNK_SIZE, max_bytes)
+    return {name: h.hexdigest() for name, h in hashers.items()}
+
+def receive_upload():
+    """Stream a multipart or application/octet-stream /process body into a new workspace.
+
+    Raw bodies take their options (fileName, contentType, mode, stream,
+    noCache, lazy) from the query string; multipart bodies from the form fields,
+    with the file in the "file" part. The body is written in chunks and
+    hashed on the way, so it is never held in memory as a whole. Bodies
+    over UPLOAD_MAX_BYTES are refused, those without a Content-Length
+    while they stream in, and a body of unknown length is written to disk.
+    Returns (options, (workspace, digests), None) or (None, None, error response).
+    """
+    too_large = (jsonify({'error': f'File is too large (max {UPLOAD_MAX_BYTES} bytes)'}), 413)
+    # Before request.form / request.files, which parse (and spool) the whole body
+    if request.content_length is not None and request.content_length > UPLOAD_MAX_BYTES:
+        return None, None, too_large
+    if request.mimetype == 'multipart/form-data':
+        try:
+            options = request.form.to_dict()
+        except RequestEntityTooLarge:
+            return None, None, too_large
+        upload = request.files.get('file') or next(iter(request.files.values()), None)
+        if upload is None:
+            return None, None, (jsonify({'error': 'Missing "file" part in multipart upload'}), 400)
+        stream = upload.stream
+        options.setdefault('fileName', upload.filename or '')
+        options.setdefault('contentType', upload.mimetype)
+    else:
+        options = request.args.to_dict()
+        stream = request.stream
+    for flag in ('stream', 'noCache', 'lazy'):
+        if flag in options:
+            options[flag] = options[flag].lower() in ('1', 'true', 'yes')
+
+    workspace = Workspace(size_hint=request.content_length)
+    try:
+        extension = normalize_extension(options.get('fileName'), options.get('contentType'))
+        digests = stream_to_workspace(workspace, stream, extension, UPLOAD_MAX_BYTES)
+    except (UploadTooLarge, RequestEntityTooLarge):
+        workspace.cleanup()
+        return None, None, too_large
+    except Exception as e:
+        workspace.cleanup()
+        return None, None, (jsonify({'error': f'Cannot receive upload: {str(e)}'}), 400)
+    print(f"[DEBUG] Streamed upload to workspace: {os.path.getsize(workspace.input_path)} bytes")
+    return options, (workspace, digests), None
+
 @app.route('/process', methods=['POST'])
 def process():
-    data = request.json
+    """Analyse one file: JSON (base64 fileData or originalFileId), multipart or a raw octet-stream body."""
+    if request.mimetype in ('multipart/form-data', 'application/octet-stream'):
+        options, upload, error = receive_upload()
+        if error:
+            return error
+        return start_analysis(options, upload=upload)
+    return start_analysis(request.json)
+
+def start_analysis(data, events=False, cancel=None, upload=None):
+    """Run the analysis pipeline for a /process payload.
+
+    Returns the HTTP response, or with events=True a generator of progress
+    event dicts (what /process streams as NDJSON) for the background job workers.
+    Setting cancel (a threading.Event) stops queued tools and kills running cracks.
+    upload is a (workspace, digests) pair for a file already copied to disk
+    (a streamed body or a /process/batch file).
+    """
     file_data = data.get('fileData') if data else None
     file_name = data.get('fileName') if data else None
     content_type = data.get('contentType') if data else None
     original_file_id = data.get('originalFileId') if data else None
+    artifact_id = data.get('artifactId') if data else None
+    workspace, digests = upload or (None, None)
+    file_bytes = None
+    if workspace is not None:
+        # Streamed uploads are read through a mapping of the workspace file, never copied into memory
+        file_bytes = workspace.map_file(workspace.input_path)
     
     # Validate file data or ID
-    if not file_data and not original_file_id:
-        return jsonify({'error': 'Missing file data or originalFileId'}), 400
-    
-    file_bytes = None
+    if not file_data and not original_file_id and not artifact_id and file_bytes is None:
+        return jsonify({'error': 'Missing file data, originalFileId or artifactId'}), 400
     
-    # FETCH FROM MONGODB (Optimized Path)
-    if not file_data and original_file_id and mongo_client:
+    # ANALYSE A STORED ARTEFACT (a payload an earlier run extracted or carved)
+    if file_bytes is None and artifact_id:
+        found = get_artifact_store().get(artifact_id)
+        if found is None:
+            return jsonify({'error': 'Artifact not found'}), 404
+        artifact_path, meta = found
+        file_name = file_name or meta["name"]
+        content_type = content_type or meta["mime"]
+        workspace = Workspace(size_hint=meta["size"])
         try:
-            print(f"[DEBUG] Fetching file directly from MongoDB GridFS: {original_file_id}")
-            # Try to get database from URI
-            try:
-                db = mongo_client.get_database()
-            except Exception:
-                # If URI doesn't have a default ref, standard drivers default to 'test'
-                # We replicate this behavior here to match the frontend
-                db = mongo_client.get_database("test")
+            with open(artifact_path, 'rb') as f:
+                digests = stream_to_workspace(workspace, f, normalize_extension(file_name, content_type))
+        except Exception as e:
+            workspace.cleanup()
+            return jsonify({'error': f'Cannot load artifact: {str(e)}'}), 500
+        file_bytes = workspace.map_file(workspace.input_path)
 
-            fs = gridfs.GridFS(db, collection="uploads")
-            
-            # Read from GridFS
-            try:
-                grid_out = fs.get(ObjectId(original_file_id))
-                file_bytes = grid_out.read()
-                
-                # Update metadata if missing
-                if not file_name:
-                    file_name = grid_out.filename
-                if not content_type:
-                    content_type = getattr(grid_out, 'contentType', None)
-                    
-                print(f"[DEBUG] Successfully fetched from MongoDB. Size: {len(file_bytes)} bytes")
-            except gridfs.errors.NoFile:
-                return jsonify({'error': 'File not found in GridFS'}), 404
-                
+    # FETCH FROM MONGODB (Optimized Path)
+    if file_bytes is None and not file_data and original_file_id and mongo_client:
+        print(f"[DEBUG] Fetching file directly from MongoDB GridFS: {original_file_id}")
+        grid_out, error = open_upload(original_file_id)
+        if error:
+            return error
+        # Update metadata if missing
+        if not file_name:
+            file_name = grid_out.filename
+        if not content_type:
+            content_type = getattr(grid_out, 'contentType', None)
+        # Chunks go straight from GridFS to the workspace file, hashed on the way
+        workspace = Workspace(size_hint=grid_out.length)
+        try:
+            digests = stream_to_workspace(workspace, grid_out, normalize_extension(file_name, content_type))
         except Exception as e:
-             # Fallback or error
-             import traceback
-             print(f"[ERROR] MongoDB Fetch Failed: {e}")
-             print(traceback.format_exc())
-             return jsonify({'error': f'Failed to fetch from MongoDB: {str(e)}'}), 500
+            import traceback
+            print(f"[ERROR] MongoDB Fetch Failed: {e}")
+            print(traceback.format_exc())
+            workspace.cleanup()
+            return jsonify({'error': f'Failed to fetch from MongoDB: {str(e)}'}), 500
+        file_bytes = workspace.map_file(workspace.input_path)
+        print(f"[DEBUG] Successfully fetched from MongoDB. Size: {len(file_bytes)} bytes")
 
     # DECODE BASE64 (Legacy/Direct Path)
     if file_bytes is None and file_data:
@@ -874,57 +1338,33 @@ def process():
             return jsonify({'error': f'Cannot decode file data: {str(e)}'}), 400
 
     if not file_bytes or len(file_bytes) == 0:
+         if workspace is not None:
+             workspace.cleanup()
          return jsonify({'error': 'File data is empty'}), 400
          
     print(f"File data ready. Size: {len(file_bytes)} bytes")
     
     # Validate that the decoded data matches expected size if provided
-    expected_size = data.get('fileSize') if data else None
+    try:
+        # Query-string and form uploads carry it as text
+        expected_size = int(data.get('fileSize') or 0) if data else 0
+    except (TypeError, ValueError):
+        expected_size = 0
     if expected_size and len(file_bytes) != expected_size:
         print(f"Warning: File size mismatch. Expected: {expected_size}, Actual: {len(file_bytes)}")
     
-    # Save file data to a temporary file with proper extension
-    tmp_file = None
-    local_path = None
+    # Save file data into the request workspace with proper extension
     try:
-        # Preserve the exact original extension - this is critical for steganalysis tools
-        file_extension = ""
-        if file_name and '.' in file_name:
-            file_extension = os.path.splitext(file_name)[1]
-        else:
-            # Try to determine extension from content type if not in filename
-            file_extension = get_file_extension_from_mime(content_type, file_name)
-        
-        # Validate that we have a proper extension for steganalysis tools
-        supported_extensions = {'.png': '.png', '.bmp': '.bmp', '.jpg': '.jpg', '.jpeg': '.jpg', '.gif': '.gif'}
-        if file_extension.lower() in supported_extensions:
-            # Use the exact original extension to preserve file format
-            normalized_extension = file_extension
-        else:
-            # For unsupported extensions, try to map to a supported one based on content type
-            if content_type:
-                if 'image/jpeg' in content_type or 'image/jpg' in content_type:
-                    normalized_extension = '.jpg'
-                elif 'image/png' in content_type:
-                    normalized_extension = '.png'
-                elif 'image/bmp' in content_type:
-                    normalized_extension = '.bmp'
-                elif 'image/gif' in content_type:
-                    normalized_extension = '.gif'
-                else:
-                    # Default to .jpg for unknown image types
-                    normalized_extension = '.jpg' if content_type and content_type.startswith('image/') else file_extension
-            else:
-                normalized_extension = file_extension
-        
-        # Create temporary file with the exact same extension as the original
-        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=normalized_extension)
-        tmp_file.write(file_bytes)
-        tmp_file.flush()  # Ensure data is written
-        local_path = tmp_file.name
-        print(f"Created temporary file: {local_path}")
+        if workspace is None:
+            normalized_extension = normalize_extension(file_name, content_type)
+            # One workspace per request (tmpfs when it fits) holds the upload with the
+            # exact same extension as the original plus every artefact tools derive from it
+            workspace = Workspace(size_hint=len(file_bytes))
+            workspace.add_input(file_bytes, normalized_extension)
+        local_path = workspace.input_path
+        print(f"Created request workspace file: {local_path}")
         print(f"Original filename: {file_name}")
-        print(f"File extension used: {normalized_extension}")
+        print(f"File extension used: {os.path.splitext(local_path)[1]}")
         print(f"File size: {len(file_bytes)} bytes")
         
         # Verify file was written correctly
@@ -932,19 +1372,16 @@ def process():
         if written_size != len(file_bytes):
             print(f"Warning: File write verification failed. Expected: {len(file_bytes)}, Written: {written_size}")
     except Exception as e:
-        if tmp_file:
-            tmp_file.close()
+        if workspace:
+            workspace.cleanup()
         return jsonify({'error': f'Cannot create temporary file: {str(e)}'}), 400
-    finally:
-        if tmp_file:
-            tmp_file.close()
     
     # Ensure file is properly written
     try:
         file_size = os.path.getsize(local_path)
         print(f"Temporary file size: {file_size} bytes")
         if file_size == 0:
-            os.unlink(local_path)  # Clean up
+            workspace.cleanup()
             return jsonify({'error': 'Temporary file is empty'}), 400
             
         # Additional verification: try to open as image if it's supposed to be one
@@ -956,165 +1393,180 @@ def process():
             except Exception as img_error:
                 print(f"Warning: Image verification failed: {img_error}")
     except Exception as e:
-        if local_path and os.path.exists(local_path):
-            os.unlink(local_path)  # Clean up
+        workspace.cleanup()
         return jsonify({'error': f'Cannot access temporary file: {str(e)}'}), 400
     
-    stream_output = data.get('stream', False) if data else False
+    stream_output = events or (data.get('stream', False) if data else False)
+    use_cache = not data.get('noCache', False) if data else True
+    # Structured results: a summary per tool, big payloads as /artifacts/<id> references,
+    # and a streamed "complete" event that points at the partials instead of repeating them
+    lazy = bool(data.get('lazy', False)) if data else False
+    reference_partials = lazy and stream_output and not events
+    mode = (data.get('mode') or 'full') if data else 'full'
+    if mode not in ('full', 'triage', 'deep'):
+        workspace.cleanup()
+        return jsonify({'error': f"Unknown mode '{mode}' (use 'full', 'triage' or 'deep')"}), 400
+    # One pass over the bytes already in memory; shared by the hashes tool and the caches
+    if digests is None:
+        digests = compute_digests(file_bytes)
+    file_sha256 = digests["sha256"]
     
     try:
         def generate_results():
             results = {}
-            with tempfile.TemporaryDirectory() as tmpdir:
-                if stream_output:
-                    yield json.dumps({"status": "progress", "message": "Starting analysis...", "tool": "init"}) + "\n"
-                
-                tools = {
-                    "file_type": None,  # handled via run_file_command
-                    "hashes": f"printf 'MD5:\\n' && md5sum '{local_path}' && printf '\\nSHA1:\\n' && sha1sum '{local_path}' && printf '\\nSHA256:\\n' && sha256sum '{local_path}'",
-                    "xxd": None,        # handled via run_xxd
-                    "strings": f"strings -n 8 '{local_path}' || echo 'Strings command failed or no output'",
-                    "binwalk": f"binwalk '{local_path}'",
-                }
-                
-                if is_tool_installed("foremost"):
-                    tools["foremost"] = f"foremost -T -i '{local_path}' -o '{tmpdir}/foremost_out' && find '{tmpdir}/foremost_out' 2>/dev/null || echo 'Foremost analysis complete but no data found'"
-                else:
-                    tools["foremost"] = "echo 'Foremost tool is not installed or not available in PATH'"
-                    
-                tools["exiftool"] = f"exiftool '{local_path}' 2>&1 || echo 'Exiftool failed'"
-
-                # zsteg and pngcheck are image-only — skip for audio/other files
-                IMAGE_EXT = ('.png', '.bmp', '.jpg', '.jpeg', '.gif', '.webp', '.tiff')
-                if local_path.lower().endswith(IMAGE_EXT):
-                    if is_tool_installed("zsteg"):
-                        tools["zsteg"] = "zsteg_custom"
-                    tools["pngcheck"] = f"pngcheck '{local_path}' 2>&1 || echo 'PNGCheck failed or not a PNG file'"
-                
-                for tool, cmd in tools.items():
-                    print(f"[DEBUG] Running tool: {tool}")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": f"Running {tool}...", "tool": tool}) + "\n"
-
-                    if tool == "file_type":
-                        results[tool] = run_file_command(local_path)
-                    elif tool == "xxd":
-                        results[tool] = run_xxd(local_path)
-                    elif tool == "zsteg" and cmd == "zsteg_custom":
-                        results[tool] = run_zsteg_command(local_path)
-                    else:
-                        results[tool] = run_command(cmd)
 
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": f"Finished {tool}", "tool": tool, "partial_result": results[tool]}) + "\n"
-                    print(f"[DEBUG] Finished tool: {tool}")
-
-                if (is_tool_installed("stegseek") or is_tool_installed("steghide")) and local_path.lower().endswith(('.jpg', '.jpeg', '.bmp', '.wav', '.au')):
-                    print("[DEBUG] Starting StegSeek password cracking (this may take time)...")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running steghide_crack (this may take time)...", "tool": "steghide_crack"}) + "\n"
-                    results["steghide_crack"] = crack_steghide_password(local_path)
-                    print("[DEBUG] Finished StegSeek password cracking")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished steghide_crack", "tool": "steghide_crack", "partial_result": results["steghide_crack"]}) + "\n"
-                else:
-                    results["steghide_crack"] = "Steghide password cracking not available for this file type or steghide not installed"
-
-                # stegdetect scan (JPEGs)
-                if local_path.lower().endswith(('.jpg', '.jpeg')):
-                    print("[DEBUG] Starting stegdetect analysis...")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running stegdetect...", "tool": "stegdetect"}) + "\n"
-                    results["stegdetect"] = run_stegdetect(local_path)
-                    print("[DEBUG] Finished stegdetect analysis")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished stegdetect", "tool": "stegdetect", "partial_result": results["stegdetect"]}) + "\n"
-
-                # outguess empty key scan (JPEGs)
-                if local_path.lower().endswith(('.jpg', '.jpeg')):
-                    print("[DEBUG] Starting outguess analysis...")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running outguess...", "tool": "outguess"}) + "\n"
-                    results["outguess"] = run_outguess(local_path)
-                    print("[DEBUG] Finished outguess analysis")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished outguess", "tool": "outguess", "partial_result": results["outguess"]}) + "\n"
+            def shown(tool, result):
+                return compact_result(tool, result, get_artifact_store()) if lazy else result
 
-                # tesseract ocr text mining (all images)
-                if local_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp', '.gif')):
-                    print("[DEBUG] Starting Tesseract OCR analysis...")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running tesseract_ocr...", "tool": "tesseract_ocr"}) + "\n"
-                    results["tesseract_ocr"] = run_tesseract(local_path)
-                    print("[DEBUG] Finished Tesseract OCR analysis")
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished tesseract_ocr", "tool": "tesseract_ocr", "partial_result": results["tesseract_ocr"]}) + "\n"
+            def final(report, streamed):
+                """Results for the last event: with lazy, compact and without the tools already streamed."""
+                if not lazy:
+                    return report
+                return {tool: shown(tool, result) for tool, result in report.items() if tool not in streamed}
 
-                # zbarimg — QR code / barcode detection (all images)
-                if local_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')):
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running zbarimg (QR/barcode scan)...", "tool": "zbarimg"}) + "\n"
-                    results["zbarimg"] = run_zbarimg(local_path)
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished zbarimg", "tool": "zbarimg", "partial_result": results["zbarimg"]}) + "\n"
+            def portable(value):
+                """A result as cached: this request's workspace paths replaced by WORKSPACE_TOKEN."""
+                for directory in workspace.directories():
+                    value = relocate(value, directory, WORKSPACE_TOKEN)
+                return value
 
-                # identify — ImageMagick detailed image metadata (all images)
-                if local_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff')):
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running identify...", "tool": "identify"}) + "\n"
-                    results["identify"] = run_identify(local_path)
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished identify", "tool": "identify", "partial_result": results["identify"]}) + "\n"
-
-                # jsteg — JPEG LSB steganography detector
-                if local_path.lower().endswith(('.jpg', '.jpeg')):
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running jsteg (JPEG LSB check)...", "tool": "jsteg"}) + "\n"
-                    results["jsteg"] = run_jsteg(local_path)
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished jsteg", "tool": "jsteg", "partial_result": results["jsteg"]}) + "\n"
-
-                # stegoveritas — comprehensive CTF steg checker (images)
-                if local_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')):
-                    if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Running stegoveritas (may take ~30s)...", "tool": "stegoveritas"}) + "\n"
-                    results["stegoveritas"] = run_stegoveritas(local_path)
+            # Leaving the block removes the upload and all derived artefacts
+            with workspace:
+                if stream_output:
+                    yield json.dumps({"status": "progress", "message": "Starting analysis...", "tool": "init"}) + "\n"
+                
+                # The registry picks the tools that apply to this upload (by
+                # extension or magic bytes); the rest may report why they were skipped
+                selected, skipped = select_tools(local_path, bytes(file_bytes[:HEADER_BYTES]), deep=mode == "deep")
+                results.update(skipped)
+
+                # Triage runs the cheap tools first and only schedules the
+                # heavy ones when their output makes the upload look interesting
+                heavy_tools = []
+                if mode == "triage":
+                    heavy_tools = [tool for tool in selected if tool.name in HEAVY_TOOLS]
+                    selected = [tool for tool in selected if tool.name not in HEAVY_TOOLS]
+
+                context = {"path": local_path, "workspace": workspace, "dir": workspace.dir, "digests": digests}
+                phases = [[tool.job(context, run_command) for tool in phase] for phase in plan(selected)]
+                heavy_jobs = [tool.job(context, run_command) for phase in plan(heavy_tools) for tool in phase]
+                jobs = [job for phase in phases for job in phase]
+
+                # Same bytes + same tool set and builds → replay the stored report
+                extension = os.path.splitext(local_path)[1]
+                versions = {name: tool_version(name) for name, _, _ in jobs + heavy_jobs}
+                key = cache_key(file_sha256, [f"{name}@{v}" for name, v in versions.items()] + list(results)
+                                + [f"candidates@{DECODER_VERSION}"]
+                                + ([f"mode:{mode}"] if mode != "full" else []), extension)
+                cached = get_result_cache().get(key) if use_cache else None
+                if cached and not touch_references(cached["results"]):
+                    # An artefact it links to was evicted: run again (the new report replaces it)
+                    print(f"[DEBUG] Result cache entry {key} references evicted artefacts, re-running")
+                    cached = None
+                if cached:
+                    cached = relocate(cached, WORKSPACE_TOKEN, workspace.dir)
+                    print(f"[DEBUG] Result cache hit: {key}")
                     if stream_output:
-                        yield json.dumps({"status": "progress", "message": "Finished stegoveritas", "tool": "stegoveritas", "partial_result": results["stegoveritas"]}) + "\n"
-
-                # ── Audio-specific tools ────────────────────────────────────────
-                AUDIO_EXTENSIONS = ('.wav', '.mp3', '.ogg', '.flac', '.aac', '.m4a',
-                                    '.mp4', '.au', '.opus', '.wma', '.aiff', '.aif')
-                if local_path.lower().endswith(AUDIO_EXTENSIONS):
-                    audio_tools = [
-                        ("ffmpeg_info",     run_ffmpeg_info),
-                        ("sox_info",        run_sox_info),
-                        ("sox_spectrogram", run_sox_spectrogram),
-                        ("mediainfo",       run_mediainfo),
-                        ("dtmf_detect",     run_dtmf_detect),
-                        ("morse_detect",    run_morse_detect),
-                        ("rtty_decode",     run_rtty_decode),
-                    ]
-                    for tool_name, tool_fn in audio_tools:
-                        print(f"[DEBUG] Running audio tool: {tool_name}")
+                        for tool in cached["order"]:
+                            yield json.dumps({"status": "progress", "message": f"Finished {tool}", "tool": tool, "partial_result": shown(tool, cached["results"][tool]), "cached": True}) + "\n"
+                        streamed = cached["order"] if reference_partials else ()
+                        yield json.dumps({"status": "complete", "results": final(cached["results"], streamed), "digests": digests, "cached": True,
+                                          **({"streamed": list(streamed)} if reference_partials else {})}) + "\n"
+                    else:
+                        yield final(cached["results"], ())
+                    return
+
+                order = []
+
+                def run_phase(phase_jobs):
+                    """Reuse whatever individual tool outputs are still valid and
+                    only run the tools that are new or were upgraded."""
+                    pending = []
+                    hits = []
+                    for job in phase_jobs:
+                        tool = job[0]
+                        tool_key = tool_cache_key(file_sha256, tool, versions[tool], extension)
+                        hit = get_tool_cache().get(tool_key) if use_cache else None
+                        if hit is None or not touch_references(hit["result"]):
+                            pending.append(job)
+                            continue
+                        results[tool] = relocate(hit["result"], WORKSPACE_TOKEN, workspace.dir)
+                        order.append(tool)
+                        hits.append(tool)
                         if stream_output:
-                            yield json.dumps({"status": "progress", "message": f"Running {tool_name}...", "tool": tool_name}) + "\n"
-                        results[tool_name] = tool_fn(local_path)
+                            yield json.dumps({"status": "progress", "message": f"Finished {tool}", "tool": tool, "partial_result": shown(tool, results[tool]), "cached": True}) + "\n"
+                    if hits:
+                        print(f"[DEBUG] Tool cache hits: {', '.join(hits)}")
+
+                    for event, tool, result in run_tools(pending, cancel=cancel):
+                        if event == "start":
+                            print(f"[DEBUG] Running tool: {tool}")
+                            if stream_output:
+                                message = get_tool(tool).message or f"Running {tool}..."
+                                yield json.dumps({"status": "progress", "message": message, "tool": tool}) + "\n"
+                            continue
+                        if event == "progress":
+                            if stream_output:
+                                if "percent" in result:
+                                    message = f"{tool}: {result['percent']:.1f}%"
+                                else:
+                                    message = f"{tool}: {result.get('attempts', 0):,} tried"
+                                if result.get("candidates_per_second"):
+                                    message += f" ({result['candidates_per_second']:,} passwords/s)"
+                                yield json.dumps({"status": "progress", "message": message, "tool": tool, "progress": result}) + "\n"
+                            continue
+
+                        results[tool] = result
+                        order.append(tool)
+                        if use_cache and is_cacheable(result):
+                            get_tool_cache().put(tool_cache_key(file_sha256, tool, versions[tool], extension),
+                                                 {"result": portable(result)})
                         if stream_output:
-                            yield json.dumps({"status": "progress", "message": f"Finished {tool_name}", "tool": tool_name, "partial_result": results[tool_name]}) + "\n"
-                        print(f"[DEBUG] Finished audio tool: {tool_name}")
+                            yield json.dumps({"status": "progress", "message": f"Finished {tool}", "tool": tool, "partial_result": shown(tool, results[tool])}) + "\n"
+                        print(f"[DEBUG] Finished tool: {tool}")
+
+                for phase_jobs in phases:
+                    yield from run_phase(phase_jobs)
+
+                if mode == "triage":
+                    score, reasons = score_evidence(results, file_bytes, extension)
+                    run_heavy = score >= TRIAGE_THRESHOLD
+                    triage = {"score": score, "threshold": TRIAGE_THRESHOLD, "reasons": reasons,
+                              "ran": [job[0] for job in heavy_jobs] if run_heavy else [], "skipped": {}}
+                    if run_heavy:
+                        print(f"[DEBUG] Triage score {score}: running heavy tools")
+                        yield from run_phase(heavy_jobs)
+                    else:
+                        print(f"[DEBUG] Triage score {score}: skipping {', '.join(j[0] for j in heavy_jobs)}")
+                        for tool, _, _ in heavy_jobs:
+                            results[tool] = skip_message(tool, reasons)
+                            triage["skipped"][tool] = results[tool]
+                            order.append(tool)
+                            if stream_output:
+                                yield json.dumps({"status": "progress", "message": f"Skipped {tool}", "tool": tool, "partial_result": shown(tool, results[tool])}) + "\n"
+                    results["triage"] = triage
+                    order.append("triage")
+
+                # Flags and encoded blobs anywhere in the tools' output, decoded and ranked
+                # The strings result holds the top few; every string is searched
+                texts = {"strings": all_strings_text(workspace, results["strings"])} if isinstance(results.get("strings"), dict) else {}
+                results["candidates"] = find_candidates(results, texts=texts)
+                order.append("candidates")
+                if stream_output:
+                    yield json.dumps({"status": "progress", "message": "Finished candidates", "tool": "candidates", "partial_result": shown("candidates", results["candidates"])}) + "\n"
 
-                if local_path and os.path.exists(local_path):
-                    try:
-                        os.unlink(local_path)
-                    except Exception:
-                        pass
+                if use_cache and all(is_cacheable(r) for r in results.values()):
+                    get_result_cache().put(key, {"results": portable(results), "order": order})
 
                 if stream_output:
-                    yield json.dumps({"status": "complete", "results": results}) + "\n"
+                    streamed = order if reference_partials else ()
+                    yield json.dumps({"status": "complete", "results": final(results, streamed), "digests": digests,
+                                      **({"streamed": list(streamed)} if reference_partials else {})}) + "\n"
                 else:
-                    yield results
+                    yield final(results, ())
 
+        if events:
+            return (json.loads(line) for line in generate_results())
         if stream_output:
             from flask import Response, stream_with_context
             return Response(stream_with_context(generate_results()), mimetype='application/x-ndjson')
@@ -1130,14 +1582,260 @@ def process():
             return jsonify(res)
             
     except Exception as e:
-        # Clean up the temporary file if there was an error
-        if local_path and os.path.exists(local_path):
-            try:
-                os.unlink(local_path)
-            except Exception:
-                pass
+        # Clean up the request workspace if there was an error
+        workspace.cleanup()
         return jsonify({'error': f'Processing failed: {str(e)}'}), 500
 
+def load_batch_files():
+    """Files of a /process/batch request as (entries, options, error response).
+
+    Multipart: every uploaded file part, options from the form fields.
+    JSON: "fileIds" (GridFS ids) and/or "files" (/process-style dicts).
+    Entries only describe their file (a multipart "stream" or a JSON
+    "item"); load_batch_entry copies it into a workspace when a worker
+    picks it up.
+    """
+    entries = []
+    if request.files:
+        options = request.form.to_dict()
+        for index, part in enumerate(request.files.getlist('files') or list(request.files.values())):
+            # Flask closes request.files when the view returns, before the batch streams:
+            # the entry takes over the part's spooled file and closes it once loaded
+            stream, part.stream = part.stream, io.BytesIO()
+            entries.append({"fileId": part.filename or f"file-{index}", "fileName": part.filename or '',
+                            "contentType": part.mimetype, "stream": stream})
+    else:
+        options = request.get_json(silent=True) or {}
+        items = [{'originalFileId': file_id} for file_id in options.get('fileIds') or []]
+        items += [item for item in options.get('files') or [] if isinstance(item, dict)]
+        for index, item in enumerate(items):
+            entries.append({"fileId": item.get('originalFileId') or item.get('fileName') or f"file-{index}",
+                            "fileName": item.get('fileName') or '', "contentType": item.get('contentType'),
+                            "item": item})
+    # Two parts with the same name still need distinct ids in the event stream
+    seen = {}
+    for entry in entries:
+        count = seen.get(entry["fileId"], 0)
+        seen[entry["fileId"]] = count + 1
+        if count:
+            entry["fileId"] = f"{entry['fileId']}#{count + 1}"
+
+    if not entries:
+        return None, None, (jsonify({'error': 'No files in batch (send "fileIds", "files" or multipart files)'}), 400)
+    if len(entries) > BATCH_MAX_FILES:
+        return None, None, (jsonify({'error': f'Too many files in batch (max {BATCH_MAX_FILES})'}), 400)
+    return entries, options, None
+
+def load_batch_entry(entry):
+    """Copy one batch file into a new workspace. Returns ((workspace, digests), file name, error message)."""
+    if "item" in entry:
+        upload, file_name, error = load_request_file(entry["item"])
+        if error:
+            return None, None, error[0].get_json().get('error')
+        return upload, file_name or entry["fileName"], None
+    stream = entry["stream"]
+    try:
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+    except (AttributeError, OSError):
+        size = None
+    workspace = Workspace(size_hint=size)
+    try:
+        digests = stream_to_workspace(workspace, stream, normalize_extension(entry["fileName"], entry["contentType"]),
+                                      UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        workspace.cleanup()
+        return None, None, str(e)
+    except Exception as e:
+        workspace.cleanup()
+        return None, None, f'Cannot load file: {str(e)}'
+    finally:
+        stream.close()
+    if not os.path.getsize(workspace.input_path):
+        workspace.cleanup()
+        return None, None, 'File data is empty'
+    return (workspace, digests), entry["fileName"], None
+
+@app.route('/process/batch', methods=['POST'])
+def process_batch():
+    """Analyse several files in one call, streaming NDJSON events tagged with "fileId".
+
+    Each file is loaded by the worker that analyses it, so at most
+    BATCH_FILE_CONCURRENCY are on local disk at once. Files with identical
+    content are analysed once. Every file ends with a "file_complete"
+    (results) or "file_error" event; the last line is
+    {"status": "complete", "files": [...]} with one summary per file.
+    """
+    entries, options, error = load_batch_files()
+    if error:
+        return error
+    settings = {key: options.get(key) for key in ('mode', 'noCache') if options.get(key) not in (None, '')}
+    if isinstance(settings.get('noCache'), str):
+        settings['noCache'] = settings['noCache'].lower() in ('1', 'true', 'yes')
+    print(f"[DEBUG] Batch of {len(entries)} files")
+    index = ContentIndex()
+
+    def analyse_entry(entry, cancel):
+        upload, file_name, error = load_batch_entry(entry)
+        if error:
+            yield {"status": "error", "error": error}
+            return
+        sha256 = upload[1]["sha256"]
+        yield {"status": "loaded", "fileName": file_name, "sha256": sha256}
+        original = index.claim(sha256, entry["fileId"])
+        if original != entry["fileId"]:
+            upload[0].cleanup()
+            yield {"status": "duplicate", "duplicateOf": original}
+            return
+        data = {**settings, 'fileName': file_name, 'contentType': entry['contentType']}
+        with app.app_context():
+            response = start_analysis(data, events=True, cancel=cancel, upload=upload)
+            if isinstance(response, tuple):
+                yield {"status": "error", "error": response[0].get_json().get('error')}
+                return
+        yield from response
+
+    def generate_batch():
+        summaries = {entry["fileId"]: {"fileId": entry["fileId"], "fileName": entry["fileName"],
+                                       "sha256": None, "status": "queued"} for entry in entries}
+        copies = {}
+        finished = {}
+
+        def emit(file_id, event, duplicate_of=None):
+            summaries[file_id]["status"] = "complete" if event["status"] == "file_complete" else "error"
+            extra = {"duplicateOf": duplicate_of} if duplicate_of else {}
+            return json.dumps({**event, "fileId": file_id, **extra}, default=str) + "\n"
+
+        def finish(file_id, event):
+            finished[file_id] = event
+            yield emit(file_id, event)
+            for duplicate in copies.pop(file_id, []):
+                yield emit(duplicate, event, file_id)
+
+        try:
+            for file_id, event in run_batch(entries, analyse_entry, threading.Event()):
+                status = event.get("status")
+                if status == "loaded":
+                    summaries[file_id].update({"fileName": event["fileName"] or summaries[file_id]["fileName"],
+                                               "sha256": event["sha256"]})
+                elif status == "duplicate":
+                    original = event["duplicateOf"]
+                    summaries[file_id]["duplicateOf"] = original
+                    if original in finished:
+                        yield emit(file_id, finished[original], original)
+                    else:
+                        copies.setdefault(original, []).append(file_id)
+                elif status == "complete":
+                    yield from finish(file_id, {**event, "status": "file_complete"})
+                elif status == "error":
+                    yield from finish(file_id, {**event, "status": "file_error"})
+                else:
+                    summaries[file_id]["status"] = "running"
+                    yield json.dumps({**event, "fileId": file_id}, default=str) + "\n"
+        finally:
+            # Parts of a cancelled batch that no worker loaded
+            for entry in entries:
+                if "stream" in entry:
+                    entry["stream"].close()
+        yield json.dumps({"status": "complete", "files": list(summaries.values())}) + "\n"
+
+    from flask import Response, stream_with_context
+    return Response(stream_with_context(generate_batch()), mimetype='application/x-ndjson')
+
+@app.route('/wordlists', methods=['GET'])
+def list_wordlists():
+    """Wordlists the crackers can use, in the order they are tried."""
+    lists = []
+    for name in available_wordlists():
+        wordlist = get_wordlist(name)
+        if wordlist is not None:
+            lists.append(wordlist.info())
+    return jsonify({"wordlists": lists})
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a /process payload and return its job id straight away (202).
+
+    Inline fileData is moved to the artefact store first, so the queued
+    job only holds its artifactId.
+    """
+    data = request.json or {}
+    if not data.get('fileData') and not data.get('originalFileId') and not data.get('artifactId'):
+        return jsonify({'error': 'Missing file data, originalFileId or artifactId'}), 400
+    job_request = {k: v for k, v in data.items() if k not in ('stream', 'fileData')}
+    if data.get('fileData'):
+        try:
+            file_bytes = base64.b64decode(data['fileData'])
+        except Exception as e:
+            return jsonify({'error': f'Cannot decode file data: {str(e)}'}), 400
+        if not file_bytes:
+            return jsonify({'error': 'File data is empty'}), 400
+        ref = save_artifact(file_bytes, data.get('fileName'), data.get('contentType'))
+        if ref is None:
+            return jsonify({'error': 'Cannot store file data for the job'}), 500
+        job_request['artifactId'] = ref['id']
+    store, workers = get_job_queue()
+    job_id = store.submit(job_request)
+    workers.notify()
+    return jsonify({
+        "jobId": job_id,
+        "status": "queued",
+        "statusUrl": f"/jobs/{job_id}",
+        "eventsUrl": f"/jobs/{job_id}/events",
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status plus partial results while running, full results once complete."""
+    store, _ = get_job_queue()
+    job = store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a job: queued jobs never start, running ones have their tools killed."""
+    store, _ = get_job_queue()
+    status = store.request_cancel(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if status in ('complete', 'failed'):
+        return jsonify({'error': f'Job already {status}', 'status': status}), 409
+    return jsonify({"jobId": job_id, "status": status})
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    """Progress events as NDJSON, the same lines /process streams.
+
+    ?after=<seq> skips events already seen; ?follow=1 keeps the response open
+    until the job finishes. Every line carries its "seq".
+    """
+    store, _ = get_job_queue()
+    if store.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    after = request.args.get('after', 0, type=int)
+    follow = request.args.get('follow', '0') not in ('0', 'false', '')
+
+    def generate_events():
+        last = after
+        while True:
+            for seq, event in store.events(job_id, last):
+                last = seq
+                yield json.dumps({**event, "seq": seq}, default=str) + "\n"
+            if not follow:
+                return
+            job = store.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                # Pick up anything written between the read above and the status check
+                for seq, event in store.events(job_id, last):
+                    yield json.dumps({**event, "seq": seq}, default=str) + "\n"
+                return
+            time.sleep(JOB_POLL_INTERVAL)
+
+    from flask import Response, stream_with_context
+    return Response(stream_with_context(generate_events()), mimetype='application/x-ndjson')
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=False)
\ No newline at end of file
@@ -1,12 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import json
 import re
 import base64
-import hmac
-import hashlib
 import urllib3
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from stego.wordlists import available_wordlists
+from stego.jwtcrack import crack, crack_size, JWT_INLINE_MAX
 
 # Suppress SSL warnings — CTF servers commonly use self-signed certs
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -392,33 +392,24 @@ def jwt_tools():
     }
 
     if do_crack and header.get("alg", "").startswith("HS"):
-        hash_fn = {
-            "HS256": hashlib.sha256,
-            "HS384": hashlib.sha384,
-            "HS512": hashlib.sha512,
-        }.get(header["alg"], hashlib.sha256)
-
-        header_payload = parts[0] + "." + parts[1]
-        common_secrets = [
-            "", "secret", "password", "123456", "admin", "key",
-            "your-256-bit-secret", "supersecret", "jwt_secret", "jwtsecret",
-            "mysecret", "changeme", "development", "test", "prod",
-            "production", "staging", "flask", "django", "express", "laravel",
-            "node", "api_key", "api_secret", "token", "jwt", "hs256",
-            "hmac", "secret_key", "private_key", "access_secret",
-            "app_secret", "auth_secret", "signing_key", "s3cr3t",
-            "p@ssword", "P@ssword", "P@ssw0rd", "qwerty", "letmein",
-            "1234567890", "abcdefgh", "hello", "world", "root", "toor",
-        ]
-
+        # Only lists from the wordlist directories, never arbitrary paths
+        known = set(available_wordlists())
+        wordlists = [n for n in (data.get("wordlists") or []) if isinstance(n, str) and n in known]
         result["crack_attempted"] = True
-        for s in common_secrets:
-            sig = base64.urlsafe_b64encode(
-                hmac.new(s.encode(), header_payload.encode(), hash_fn).digest()
-            ).rstrip(b"=").decode()
-            if sig == parts[2]:
-                result["cracked_secret"] = s
-                break
+        result["wordlists"] = wordlists
+        if data.get("async") or crack_size(wordlists) > JWT_INLINE_MAX:
+            # Big lists run as a job: poll /jobs/<id>, stream /jobs/<id>/events, cancel with /jobs/<id>/cancel
+            store, workers = current_app.extensions["job_queue"]()
+            job_id = store.submit({"kind": "jwt_crack", "token": token, "wordlists": wordlists})
+            workers.notify()
+            result.update({"jobId": job_id, "status": "queued",
+                           "statusUrl": f"/jobs/{job_id}", "eventsUrl": f"/jobs/{job_id}/events"})
+            return jsonify(result), 202
+        crack_result = crack(token, wordlists)
+        if crack_result.get("status") == "error":
+            return jsonify({**result, "error": crack_result["error"]}), 400
+        result["cracked_secret"] = crack_result["cracked_secret"]
+        result["crack"] = crack_result
 
     return jsonify(result)
 
@@ -0,0 +1,273 @@
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import binascii
+import threading
+
+from stego.cache import RESULT_CACHE_TTL
+from stego.registry import FORMATS
+
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "/tmp/cicaado_artifacts")
+# Artefacts unread for this long are deleted; cached results reference them, so the default matches the cache
+ARTIFACT_TTL = int(os.environ.get("ARTIFACT_TTL", RESULT_CACHE_TTL))
+ARTIFACT_MAX_BYTES = int(os.environ.get("ARTIFACT_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+# Seconds between eviction sweeps (a sweep lists the whole store)
+ARTIFACT_EVICT_INTERVAL = 60
+# Files one extractor run keeps (stegoveritas alone writes hundreds of transforms)
+ARTIFACT_MAX_FILES = int(os.environ.get("ARTIFACT_MAX_FILES", 200))
+# Strings in a result longer than this are stored as artefacts and fetched through /artifacts/<id>
+RESULT_INLINE_MAX = int(os.environ.get("RESULT_INLINE_MAX", 16 * 1024))
+# Characters of a stored text kept inline as its preview
+RESULT_PREVIEW_CHARS = int(os.environ.get("RESULT_PREVIEW_CHARS", 2000))
+# Length of the one-line summary every compact result carries
+SUMMARY_CHARS = 200
+
+_CHUNK_SIZE = 1024 * 1024
+_ID_RE = re.compile(r"[0-9a-f]{64}")
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+
+def _mime_for(data):
+    """MIME type from magic bytes (the formats the registry knows), else octet-stream."""
+    for spec in FORMATS.values():
+        if any(data[offset:offset + len(magic)] == magic for offset, magic in spec["magic"]):
+            return spec["mime"]
+    return "application/octet-stream"
+
+
+class ArtifactStore:
+    """Extracted payloads and large result fields on local disk, addressed by SHA256.
+
+    Identical payloads (the same carve from two uploads, a cached result
+    stored again) share one file. Each file has a small JSON sidecar with
+    its MIME type and first name. Reading an artefact (or replaying a cached
+    result that references it) refreshes its mtime; those unread for
+    ARTIFACT_TTL seconds are evicted, and the least
+    recently read go first when the store outgrows ARTIFACT_MAX_BYTES.
+    """
+
+    def __init__(self, root=ARTIFACT_DIR, ttl=ARTIFACT_TTL, max_bytes=ARTIFACT_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, data, mime=None, name=None):
+        """Store bytes and return the reference put into results: {"id", "size", "mime", "name"}."""
+        artifact_id = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, artifact_id)
+        if not self._touch(path):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return self._finish(artifact_id, len(data), mime or _mime_for(data[:64]), name)
+
+    def put_file(self, source, mime=None, name=None):
+        """Store a file (hashed and copied in chunks) and return its reference."""
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(self.root, f"incoming.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            head = src.read(64)
+            chunk = head
+            while chunk:
+                hasher.update(chunk)
+                dst.write(chunk)
+                chunk = src.read(_CHUNK_SIZE)
+            size = dst.tell()
+        artifact_id = hasher.hexdigest()
+        path = os.path.join(self.root, artifact_id)
+        if self._touch(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return self._finish(artifact_id, size, mime or _mime_for(head), name or os.path.basename(source))
+
+    def get(self, artifact_id):
+        """(path, meta) of a stored artefact, or None for unknown, expired or malformed ids."""
+        if not _ID_RE.fullmatch(artifact_id or ""):
+            return None
+        path = os.path.join(self.root, artifact_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove(artifact_id)
+                return None
+            with open(path + ".json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return path, meta
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+            return True
+        except OSError:
+            return False
+
+    def _finish(self, artifact_id, size, mime, name):
+        meta_path = os.path.join(self.root, artifact_id + ".json")
+        meta = {"id": artifact_id, "size": size, "mime": mime, "name": name or artifact_id}
+        try:
+            with open(meta_path) as f:
+                # The first name and type stay; the payload is the same
+                meta = json.load(f)
+        except (OSError, ValueError):
+            # Written aside and renamed, so a concurrent get() never reads half a sidecar
+            tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        self._maybe_evict()
+        return meta
+
+    def _remove(self, artifact_id):
+        for path in (os.path.join(self.root, artifact_id), os.path.join(self.root, artifact_id + ".json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_evict < ARTIFACT_EVICT_INTERVAL:
+            return
+        self._last_evict = now
+        self.evict()
+
+    def evict(self):
+        """Drop expired artefacts, then the least recently read until under max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            now = time.time()
+            for name in os.listdir(self.root):
+                if not _ID_RE.fullmatch(name):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.ttl:
+                    self._remove(name)
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+                total += st.st_size
+            entries.sort()
+            while entries and total > self.max_bytes:
+                _, size, name = entries.pop(0)
+                self._remove(name)
+                total -= size
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """The store shared by every request in this process, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
+
+
+def save_artifact(source, name=None, mime=None):
+    """Keep an extracted payload (bytes or a file path); returns its reference, or None if it could not be stored."""
+    try:
+        store = get_artifact_store()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return store.put(bytes(source), mime, name)
+        return store.put_file(source, mime, name)
+    except Exception as e:
+        print(f"[ERROR] Could not store artefact {name or source}: {e}")
+        return None
+
+
+def save_directory(directory, limit=ARTIFACT_MAX_FILES, skip=()):
+    """save_artifact for the files under directory (named by their relative path), up to limit."""
+    refs = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name in skip:
+                continue
+            if len(refs) >= limit:
+                return refs
+            path = os.path.join(root, name)
+            ref = save_artifact(path, os.path.relpath(path, directory))
+            if ref is not None:
+                refs.append(ref)
+    return refs
+
+
+def touch_references(value, store=None):
+    """Refresh every artefact a (cached) result references, as reading them would.
+
+    Returns False when one of them is no longer stored: the result links to
+    a deleted file and should be computed again rather than replayed.
+    """
+    store = store or get_artifact_store()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if "mime" in item and _ID_RE.fullmatch(str(item.get("id", ""))):
+                if store.get(item["id"]) is None:
+                    return False
+                continue
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return True
+
+
+def _store_string(value, store, name):
+    """Reference for one long string: base64 payloads are stored decoded, text as UTF-8."""
+    if len(value) % 4 == 0 and _BASE64_RE.fullmatch(value):
+        try:
+            data = base64.b64decode(value, validate=True)
+        except (ValueError, binascii.Error):
+            data = None
+        if data is not None:
+            return {"artifact": store.put(data, None, name)}
+    return {"artifact": store.put(value.encode("utf-8"), "text/plain; charset=utf-8", name),
+            "preview": value[:RESULT_PREVIEW_CHARS], "truncated": True}
+
+
+def compact_value(value, store, name="result"):
+    """Copy of value with every string over RESULT_INLINE_MAX replaced by an artefact reference."""
+    if isinstance(value, str):
+        return _store_string(value, store, name) if len(value) > RESULT_INLINE_MAX else value
+    if isinstance(value, dict):
+        return {key: compact_value(item, store, f"{name}.{key}") for key, item in value.items()}
+    if isinstance(value, list):
+        return [compact_value(item, store, f"{name}.{i}") for i, item in enumerate(value)]
+    return value
+
+
+def summarize(result):
+    """One line describing a tool result: its message, else the first non-empty line."""
+    if isinstance(result, dict):
+        text = result.get("message") or ""
+    else:
+        text = result if isinstance(result, str) else ""
+    line = next((line.strip() for line in str(text).splitlines() if line.strip()), "")
+    return line[:SUMMARY_CHARS]
+
+
+def compact_result(tool, result, store):
+    """The structured form of one tool result: {"summary", "output", "result"}.
+
+    output is "json" or "text"; result is the value with its large payloads
+    moved to the artefact store.
+    """
+    return {"summary": summarize(result), "output": "json" if isinstance(result, (dict, list)) else "text",
+            "result": compact_value(result, store, tool)}
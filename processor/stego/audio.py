@@ -0,0 +1,82 @@
+import os
+import wave
+import shutil
+import subprocess
+
+# Every format an audio analyser needs. decode_audio() writes the ones this
+# input will use from a single ffmpeg run, so it is demuxed and decoded once.
+WAV_TARGET = "audio_44k_stereo.wav"
+PCM_TARGET = "audio_22k_mono.raw"
+DECODE_TARGETS = {
+    # 44.1 kHz stereo WAV for sox (often built without MP3/OGG/FLAC decoders)
+    WAV_TARGET: "-ar 44100 -ac 2",
+    # 22050 Hz mono signed 16-bit little-endian raw for multimon-ng
+    PCM_TARGET: "-ar 22050 -ac 1 -f s16le",
+}
+PCM_SAMPLE_RATE = 22050
+# Integer PCM sample widths (bytes) read straight from a WAV without decoding
+WAV_SAMPLE_WIDTHS = (1, 2, 3, 4)
+
+
+def is_pcm_wav(file_path):
+    """True for a WAV of integer PCM samples that sox and the spectrogram read as is."""
+    if not file_path.lower().endswith(".wav"):
+        return False
+    try:
+        with wave.open(file_path, "rb") as w:
+            return w.getsampwidth() in WAV_SAMPLE_WIDTHS
+    except (wave.Error, EOFError, OSError):
+        return False  # float / compressed WAV — ffmpeg normalises it
+
+
+def _used_targets(file_path, target):
+    """target plus the other decodes this input will need, so one ffmpeg run writes them all."""
+    targets = {target}
+    if shutil.which("multimon-ng"):
+        targets.add(PCM_TARGET)
+    if not is_pcm_wav(file_path):
+        targets.add(WAV_TARGET)
+    return [name for name in DECODE_TARGETS if name in targets]
+
+
+def _run_decode(file_path, out_dir, targets, timeout):
+    outputs = " ".join(f'{DECODE_TARGETS[name]} "{os.path.join(out_dir, name)}"' for name in targets)
+    try:
+        result = subprocess.run(
+            f'ffmpeg -y -i "{file_path}" {outputs} 2>&1',
+            shell=True, capture_output=True, text=True, timeout=timeout
+        )
+        output = (result.stdout + result.stderr).strip()
+    except subprocess.TimeoutExpired:
+        output = f"ffmpeg decode timed out after {timeout}s"
+    except Exception as e:
+        output = f"ffmpeg decode failed: {str(e)}"
+    paths = {}
+    for name in targets:
+        path = os.path.join(out_dir, name)
+        paths[name] = path if os.path.exists(path) and os.path.getsize(path) > 0 else None
+    print(f"[DEBUG] Audio decoded once for {len(paths)} target format(s)")
+    return paths, output
+
+
+def decode_audio(file_path, workspace, target, timeout=60):
+    """Decode the input once per workspace into target and the other formats it will use.
+
+    Returns ({target name: path or None}, ffmpeg output). Decoded PCM is
+    many times the size of a compressed upload, so it is written to the
+    workspace's disk directory rather than tmpfs. Concurrent callers wait
+    for the first decode instead of starting their own ffmpeg; a target
+    the first run did not write is decoded on its own when first asked for.
+    """
+    out_dir = workspace.disk_dir()
+    paths, output = workspace.once(
+        "audio_decode", lambda: _run_decode(file_path, out_dir, _used_targets(file_path, target), timeout))
+    if target in paths:
+        return paths, output
+    return workspace.once(f"audio_decode:{target}", lambda: _run_decode(file_path, out_dir, [target], timeout))
+
+
+def decoded_audio_path(file_path, workspace, target):
+    """Path of one decoded format (None if decoding failed) and the ffmpeg output."""
+    paths, output = decode_audio(file_path, workspace, target)
+    return paths[target], output
@@ -0,0 +1,66 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Files analysed at the same time in one batch; their tools still queue on the shared scheduler lanes
+BATCH_FILE_CONCURRENCY = int(os.environ.get("BATCH_FILE_CONCURRENCY", 2))
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", 50))
+
+_DONE = object()
+
+
+class ContentIndex:
+    """The first file of a batch seen with each SHA256, shared by the batch workers."""
+
+    def __init__(self):
+        self._first = {}
+        self._lock = threading.Lock()
+
+    def claim(self, sha256, file_id):
+        """fileId that analyses this content: file_id itself when it is the first, else the earlier file."""
+        with self._lock:
+            return self._first.setdefault(sha256, file_id)
+
+
+def run_batch(entries, analyse, cancel, concurrency=BATCH_FILE_CONCURRENCY):
+    """Run analyse(entry, cancel) for every entry on a small thread pool.
+
+    analyse returns an iterable of event dicts; they are yielded as
+    (fileId, event) pairs in the order they happen across files. Closing
+    this generator sets cancel, so abandoned batches stop their tools.
+    """
+    events = queue.Queue()
+
+    def worker(entry):
+        try:
+            if cancel.is_set():
+                return
+            stream = analyse(entry, cancel)
+            try:
+                for event in stream:
+                    events.put((entry["fileId"], event))
+            finally:
+                if hasattr(stream, "close"):
+                    stream.close()
+        except Exception as e:
+            print(f"[ERROR] Batch analysis of {entry['fileId']} failed: {e}")
+            events.put((entry["fileId"], {"status": "error", "error": f"Processing failed: {str(e)}"}))
+        finally:
+            events.put((entry["fileId"], _DONE))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch")
+    remaining = len(entries)
+    try:
+        for entry in entries:
+            executor.submit(worker, entry)
+        while remaining:
+            file_id, event = events.get()
+            if event is _DONE:
+                remaining -= 1
+                continue
+            yield file_id, event
+    finally:
+        if remaining:
+            cancel.set()
+        executor.shutdown(wait=False)
@@ -0,0 +1,195 @@
+import io
+import re
+import base64
+
+import numpy as np
+from PIL import Image
+
+from stego.patterns import FLAG_BYTES_RE
+
+# Bytes of payload inspected per scan spec; enough to spot headers and text
+SCAN_PREFIX_BYTES = 4096
+PREVIEW_BYTES = 64
+
+FILE_MAGICS = [
+    (b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (b"\xff\xd8\xff", "JPEG image"),
+    (b"GIF8", "GIF image"),
+    (b"PK\x03\x04", "Zip archive"),
+    (b"%PDF", "PDF document"),
+    (b"\x7fELF", "ELF executable"),
+    (b"7z\xbc\xaf\x27\x1c", "7-zip archive"),
+    (b"\x1f\x8b\x08", "gzip data"),
+    (b"Rar!\x1a\x07", "RAR archive"),
+    (b"BM", "BMP image"),
+    (b"OggS", "Ogg audio"),
+    (b"RIFF", "RIFF (WAV/AVI) data"),
+]
+
+# Channel subsets and orders tried by scan(), mirroring zsteg's default sweep
+SCAN_CHANNELS = ["r", "g", "b", "a", "rgb", "bgr", "rgba", "abgr"]
+SCAN_BITS = [1, 2, 4]
+SCAN_ORDERS = ["xy", "yx"]
+
+
+def load_pixels(image):
+    """Decode a PIL image (or path / file object) into an HxWxC uint8 array plus channel names."""
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    if image.mode in ("P", "PA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode == "PA" else "RGB")
+    elif image.mode not in ("L", "LA", "RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.mode else "RGB")
+    pixels = np.asarray(image, dtype=np.uint8)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    channels = {"L": "l", "LA": "la", "RGB": "rgb", "RGBA": "rgba"}[image.mode]
+    return pixels, channels
+
+
+def packed_planes(pixels):
+    """All 8 bit planes of every channel, packed 1 bit per pixel.
+
+    Returns uint8 [channel, bit, y, row_bytes] with rows padded to a byte, the
+    layout of PIL's "1" mode. Each bit is one vectorised shift/mask/packbits
+    over every channel, so memory stays at ~1 byte per sample.
+    """
+    height, width, count = pixels.shape
+    out = np.empty((count, 8, height, (width + 7) // 8), dtype=np.uint8)
+    chw = np.ascontiguousarray(pixels.transpose(2, 0, 1))
+    for bit in range(8):
+        out[:, bit] = np.packbits((chw >> bit) & 1, axis=2)
+    return out
+
+
+def packed_bitmaps(pixels, channels):
+    """Every plane as a base64 1-bit bitmap, keyed by channel name then bit (0 = LSB)."""
+    planes = packed_planes(pixels)
+    height, width = pixels.shape[:2]
+    out = {"width": int(width), "height": int(height), "row_bytes": int(planes.shape[3]), "planes": {}}
+    for c, name in enumerate(channels):
+        out["planes"][name] = [base64.b64encode(planes[c, bit].tobytes()).decode("ascii") for bit in range(8)]
+    return out
+
+
+def plane_png(pixels, channels, channel, bit):
+    """Render one bit plane as a black/white PNG (bytes)."""
+    c = channels.index(channel)
+    packed = np.packbits((pixels[:, :, c] >> bit) & 1, axis=1)
+    height, width = pixels.shape[:2]
+    out = io.BytesIO()
+    Image.frombytes("1", (width, height), packed.tobytes()).save(out, format="PNG")
+    return out.getvalue()
+
+
+def parse_spec(spec):
+    """Parse a zsteg-style spec such as "b1,rgb,lsb,xy" into (bits, channels, bit_order, order)."""
+    parts = [p.strip().lower() if i != 3 else p.strip() for i, p in enumerate(spec.split(","))]
+    if len(parts) != 4 or not re.fullmatch(r"b[1-8]", parts[0]):
+        raise ValueError(f"Invalid spec '{spec}' (expected e.g. b1,rgb,lsb,xy)")
+    if parts[2] not in ("lsb", "msb"):
+        raise ValueError(f"Invalid bit order '{parts[2]}' (lsb or msb)")
+    if not re.fullmatch(r"[xX][yY]|[yY][xX]", parts[3]):
+        raise ValueError(f"Invalid pixel order '{parts[3]}' (xy, yx, XY, Yx, ...)")
+    return int(parts[0][1:]), parts[1], parts[2], parts[3]
+
+
+def _ordered(pixels, order, limit=None):
+    """Reorder pixels into a flat stream. Lowercase axes ascend, uppercase descend; the
+    second letter is the outer loop, so "xy" is row by row and "yx" column by column.
+
+    With limit, only the rows/columns holding the first `limit` pixels are
+    touched, so scanning a payload prefix never copies the whole image.
+    """
+    arr = pixels
+    if "X" in order:
+        arr = arr[:, ::-1]
+    if "Y" in order:
+        arr = arr[::-1, :]
+    if order[0] in "yY":
+        if limit is not None:
+            arr = arr[:, :-(-limit // arr.shape[0])]
+        arr = arr.transpose(1, 0, 2)
+    elif limit is not None:
+        arr = arr[:-(-limit // arr.shape[1])]
+    stream = arr.reshape(-1, arr.shape[2])
+    return stream[:limit] if limit is not None else stream
+
+
+def extract_payload(pixels, channels, spec, max_bytes=None):
+    """Pull the bit stream described by spec out of the pixels and pack it into bytes.
+
+    lsb takes the lowest N bits of each sample, msb the highest N; within a
+    sample they are emitted most significant first and the stream is packed
+    MSB-first, which is how zsteg reports payloads.
+    """
+    bits, wanted, bit_order, order = parse_spec(spec)
+    try:
+        idx = [channels.index(ch) for ch in wanted]
+    except ValueError:
+        raise ValueError(f"Image has channels '{channels}', spec asks for '{wanted}'")
+    limit = None
+    if max_bytes is not None:
+        limit = -(-max_bytes * 8 // (bits * len(idx)))
+    stream = _ordered(pixels, order, limit)
+    samples = stream[:, idx].reshape(-1)
+
+    low_bit = 0 if bit_order == "lsb" else 8 - bits
+    shifts = np.arange(low_bit + bits - 1, low_bit - 1, -1, dtype=np.uint8)
+    bitstream = ((samples[:, None] >> shifts[None, :]) & 1).astype(np.uint8).reshape(-1)
+    payload = np.packbits(bitstream).tobytes()
+    return payload[:max_bytes] if max_bytes is not None else payload
+
+
+def describe_payload(payload):
+    """Classify an extracted prefix: known file header, flag, readable text or nothing."""
+    for magic, label in FILE_MAGICS:
+        if payload.startswith(magic):
+            return {"kind": "file", "label": label, "score": 3.0}
+    flag = FLAG_BYTES_RE.search(payload)
+    if flag:
+        return {"kind": "flag", "label": flag.group(0).decode("ascii", "replace"), "score": 5.0}
+    head = payload[:PREVIEW_BYTES * 4]
+    if not head:
+        return None
+    arr = np.frombuffer(head, dtype=np.uint8)
+    printable = ((arr >= 0x20) & (arr < 0x7f)) | (arr == 0x0a) | (arr == 0x0d) | (arr == 0x09)
+    # Require a printable run at the start, like zsteg's text detector
+    run = int(np.argmin(printable)) if not printable.all() else len(arr)
+    if run >= 8:
+        return {"kind": "text", "label": head[:run].decode("ascii", "replace"), "score": 1.0 + min(run, 64) / 64.0}
+    return None
+
+
+def scan(pixels, channels, specs=None, prefix_bytes=SCAN_PREFIX_BYTES):
+    """Run a zsteg-style sweep and return the interesting hits, best first."""
+    if specs is None:
+        specs = []
+        for bits in SCAN_BITS:
+            for wanted in SCAN_CHANNELS:
+                if any(ch not in channels for ch in wanted):
+                    continue
+                for bit_order in (("lsb", "msb") if bits == 1 else ("lsb",)):
+                    for order in SCAN_ORDERS:
+                        specs.append(f"b{bits},{wanted},{bit_order},{order}")
+    hits = []
+    for spec in specs:
+        payload = extract_payload(pixels, channels, spec, max_bytes=prefix_bytes)
+        info = describe_payload(payload)
+        if info:
+            info["spec"] = spec
+            info["preview"] = payload[:PREVIEW_BYTES].hex()
+            hits.append(info)
+    hits.sort(key=lambda h: -h["score"])
+    return hits, len(specs)
+
+
+def format_hits(hits):
+    """zsteg-like text lines for the UI."""
+    lines = []
+    for hit in hits:
+        if hit["kind"] == "file":
+            lines.append(f"{hit['spec']:<20} .. file: {hit['label']}")
+        else:
+            lines.append(f"{hit['spec']:<20} .. {hit['kind']}: {hit['label'][:120]!r}")
+    return "\n".join(lines)
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import hashlib
+import shutil
+import threading
+
+# Bump when tool invocations or result formats change so stale reports are ignored
+# (2: structured strings / foremost / stegoveritas results and the candidates report,
+# 3: carved files returned by artefact reference only)
+PIPELINE_VERSION = "3"
+
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "auto")  # auto | mongo | disk | off
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "/tmp/cicaado_cache")
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 500))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", 7 * 24 * 3600))
+
+# Stands in for the request's workspace directory in cached results, so a
+# replay shows the current request's paths rather than the first request's
+WORKSPACE_TOKEN = "$WORKSPACE"
+
+# Results that only tell us the run went wrong should be retried next time
+_TRANSIENT_MARKERS = ("timed out", "execution failed", "Command timed out", "cancelled", "Cancelled")
+
+
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def binary_fingerprint(binaries):
+    """Identify the installed build of one or more tool binaries.
+
+    Uses each binary's resolved path, size and mtime, so upgrading a package
+    changes the fingerprint without having to parse every tool's --version
+    output. Pure-Python tools (no binaries) are versioned by PIPELINE_VERSION.
+    """
+    if not binaries:
+        return "py" + PIPELINE_VERSION
+    cache_id = tuple(binaries)
+    with _fingerprints_lock:
+        if cache_id in _fingerprints:
+            return _fingerprints[cache_id]
+    parts = []
+    for binary in binaries:
+        path = shutil.which(binary)
+        if not path:
+            parts.append(f"{binary}:missing")
+            continue
+        try:
+            st = os.stat(os.path.realpath(path))
+            parts.append(f"{binary}:{st.st_size}:{int(st.st_mtime)}")
+        except OSError:
+            parts.append(f"{binary}:unknown")
+    fingerprint = hashlib.sha256("|".join(parts).encode()).hexdigest()[:12]
+    with _fingerprints_lock:
+        _fingerprints[cache_id] = fingerprint
+    return fingerprint
+
+
+def cache_key(sha256, tool_names, extension):
+    """Key a report by content hash, the set of tools that ran and the pipeline version."""
+    signature = ",".join(sorted(tool_names)) + "|" + (extension or "").lower() + "|" + PIPELINE_VERSION
+    return sha256 + "-" + hashlib.sha256(signature.encode()).hexdigest()[:16]
+
+
+def tool_cache_key(sha256, tool, version, extension):
+    """Key a single tool's output by content hash, tool name and tool build."""
+    return f"{sha256}-{tool}-{version}-{(extension or '').lower().lstrip('.')}-{PIPELINE_VERSION}"
+
+
+def is_cacheable(result):
+    """Skip caching tool output that only says the tool timed out or crashed."""
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    return not any(marker in text for marker in _TRANSIENT_MARKERS)
+
+
+def relocate(value, old, new):
+    """Copy of a result with directory old replaced by new in every string (dicts and lists walked)."""
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, dict):
+        return {key: relocate(item, old, new) for key, item in value.items()}
+    if isinstance(value, list):
+        return [relocate(item, old, new) for item in value]
+    return value
+
+
+class ResultCache:
+    """Result cache in MongoDB (next to GridFS) or on local disk with LRU eviction.
+
+    name selects the MongoDB collection and the on-disk subdirectory, so the
+    whole-report cache ("analysis_cache") and the per-tool cache
+    ("tool_cache") share one implementation.
+    """
+
+    def __init__(self, db=None, name="analysis_cache", backend=RESULT_CACHE_BACKEND,
+                 cache_dir=RESULT_CACHE_DIR, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                 max_bytes=RESULT_CACHE_MAX_BYTES, ttl=RESULT_CACHE_TTL):
+        if backend == "auto":
+            backend = "mongo" if db is not None else "disk"
+        self.backend = backend
+        self.cache_dir = os.path.join(cache_dir, name)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._collection = None
+
+        if backend == "mongo":
+            try:
+                self._collection = db[name]
+                self._collection.create_index("last_access", expireAfterSeconds=ttl)
+            except Exception as e:
+                print(f"[ERROR] Result cache falling back to disk: {e}")
+                self.backend = "disk"
+        if self.backend == "disk":
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached value (a dict) or None."""
+        if self.backend == "off":
+            return None
+        try:
+            if self.backend == "mongo":
+                from datetime import datetime
+                doc = self._collection.find_one_and_update(
+                    {"_id": key}, {"$set": {"last_access": datetime.utcnow()}}
+                )
+                return doc["value"] if doc else None
+
+            path = self._path(key)
+            if not os.path.exists(path):
+                return None
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove(path)
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path, None)  # mark as recently used for LRU
+            return entry
+        except Exception as e:
+            print(f"[ERROR] Result cache read failed: {e}")
+            return None
+
+    def put(self, key, value):
+        """Store a dict value; failures are logged and otherwise ignored."""
+        if self.backend == "off":
+            return
+        try:
+            if self.backend == "mongo":
+                from datetime import datetime
+                self._collection.replace_one(
+                    {"_id": key},
+                    {"_id": key, "value": value,
+                     "created_at": datetime.utcnow(), "last_access": datetime.utcnow()},
+                    upsert=True,
+                )
+                return
+
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(value, f, default=str)
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            print(f"[ERROR] Result cache write failed: {e}")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until under the entry and byte limits."""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            entries.sort()
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                _, size, path = entries.pop(0)
+                self._remove(path)
+                total -= size
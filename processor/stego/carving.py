@@ -0,0 +1,231 @@
+import os
+import re
+import struct
+
+# Most embedded files carved out of one upload
+CARVE_MAX_FILES = int(os.environ.get("CARVE_MAX_FILES", 64))
+# Matches kept in the report (a noisy file can contain thousands of "BM" or "PK" hits)
+CARVE_MAX_HITS = int(os.environ.get("CARVE_MAX_HITS", 500))
+# Appended data shorter than this is padding, not a payload
+TRAILING_MIN_BYTES = 16
+
+
+def _png_end(buf, start):
+    end = buf.find(b"IEND\xaeB`\x82", start)
+    return end + 8 if end >= 0 else None
+
+
+def _jpeg_end(buf, start):
+    """Walk the marker segments to the scan, then find the EOI that ends it.
+
+    Skipping segments by length means an EXIF thumbnail (with its own
+    FFD8...FFD9 inside APP1) does not cut the image short.
+    """
+    pos = start + 2
+    size = len(buf)
+    while pos + 4 <= size:
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xD9:
+            return pos + 2
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            pos += 2
+            continue
+        length = struct.unpack(">H", buf[pos + 2:pos + 4])[0]
+        pos += 2 + length
+        if marker == 0xDA:
+            break
+    # Entropy-coded data: FF00 is a stuffed byte and FFD0-FFD7 are restart markers
+    while True:
+        pos = buf.find(b"\xff", pos)
+        if pos < 0 or pos + 1 >= size:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xD9:
+            return pos + 2
+        if marker == 0x00 or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xDA or 0xC0 <= marker <= 0xFE:
+            # Progressive JPEGs have several scans with tables in between
+            if pos + 4 > size:
+                return None
+            pos += 2 + struct.unpack(">H", buf[pos + 2:pos + 4])[0]
+            continue
+        pos += 1
+
+
+def _gif_end(buf, start):
+    end = buf.find(b"\x00\x3b", start + 13)
+    return end + 2 if end >= 0 else None
+
+
+def _zip_end(buf, start):
+    end = buf.find(b"PK\x05\x06", start)
+    if end < 0 or end + 22 > len(buf):
+        return None
+    comment = struct.unpack("<H", buf[end + 20:end + 22])[0]
+    return min(end + 22 + comment, len(buf))
+
+
+def _pdf_end(buf, start):
+    # Incremental updates append more %%EOF markers; take the last one
+    end = buf.rfind(b"%%EOF", start)
+    if end < 0:
+        return None
+    end += 5
+    while end < len(buf) and buf[end] in b"\r\n":
+        end += 1
+    return end
+
+
+def _elf_end(buf, start):
+    header = buf[start:start + 64]
+    if len(header) < 52 or header[4] not in (1, 2) or header[5] not in (1, 2):
+        return None
+    order = "<" if header[5] == 1 else ">"
+    if header[4] == 1:
+        shoff = struct.unpack(order + "I", header[32:36])[0]
+        shentsize, shnum = struct.unpack(order + "HH", header[46:50])
+    else:
+        if len(header) < 64:
+            return None
+        shoff = struct.unpack(order + "Q", header[40:48])[0]
+        shentsize, shnum = struct.unpack(order + "HH", header[58:62])
+    if not shoff or not shnum:
+        return None
+    end = start + shoff + shentsize * shnum
+    return end if end <= len(buf) else None
+
+
+def _7z_end(buf, start):
+    header = buf[start + 12:start + 32]
+    if len(header) < 20:
+        return None
+    next_offset, next_size = struct.unpack("<QQ", header[:16])
+    end = start + 32 + next_offset + next_size
+    return end if end <= len(buf) else None
+
+
+def _gzip_end(buf, start):
+    return None  # member length is only known after inflating; carve to the next hit
+
+
+# name: (magic regex, extension, description, end finder)
+SIGNATURES = {
+    "png": (rb"\x89PNG\r\n\x1a\n", ".png", "PNG image", _png_end),
+    "jpeg": (rb"\xff\xd8\xff[\xc0-\xc4\xdb\xdd\xe0-\xef\xfe]", ".jpg", "JPEG image", _jpeg_end),
+    "gif": (rb"GIF8[79]a", ".gif", "GIF image", _gif_end),
+    "zip": (rb"PK\x03\x04", ".zip", "Zip archive data", _zip_end),
+    "pdf": (rb"%PDF-\d\.\d", ".pdf", "PDF document", _pdf_end),
+    "elf": (rb"\x7fELF[\x01\x02][\x01\x02]\x01", ".elf", "ELF executable", _elf_end),
+    "7z": (rb"7z\xbc\xaf\x27\x1c", ".7z", "7-zip archive data", _7z_end),
+    "gzip": (rb"\x1f\x8b\x08", ".gz", "gzip compressed data", _gzip_end),
+}
+
+# One alternation, one linear pass over the file for every signature. Plain
+# (group-free) branches let the regex engine skip ahead on their first bytes.
+_PATTERN = re.compile(b"|".join(magic for magic, _, _, _ in SIGNATURES.values()))
+_MATCHERS = [(name, re.compile(magic)) for name, (magic, _, _, _) in SIGNATURES.items()]
+
+
+def _signature(matched):
+    return next(name for name, matcher in _MATCHERS if matcher.match(matched))
+
+
+def host_size(buf):
+    """Size of the file that starts at offset 0 (the upload itself), or None if unknown."""
+    match = _PATTERN.match(buf)
+    if not match:
+        return None
+    try:
+        end = SIGNATURES[_signature(match.group())][3](buf, 0)
+    except (struct.error, IndexError):
+        return None
+    return end or None
+
+
+def scan(buf):
+    """Find embedded file signatures and the data appended after the host file.
+
+    buf is any bytes-like object (an mmap of the upload). Returns (hits,
+    trailing): each hit is {"offset", "type", "description", "size"} where
+    size is None when the end could not be determined; trailing is
+    {"offset", "size"} for bytes after the host file's own end, or None.
+    Signatures inside the host's own extent (an EXIF thumbnail in a
+    camera JPEG) are part of the host and not reported.
+    """
+    hits = []
+    host_end = None
+    for match in _PATTERN.finditer(buf):
+        name = _signature(match.group())
+        _, extension, description, find_end = SIGNATURES[name]
+        offset = match.start()
+        if host_end and offset < host_end:
+            continue
+        # Zip local headers repeat for every member; only the first of an archive starts a file
+        if name == "zip" and hits and hits[-1]["type"] == "zip" and (
+                hits[-1]["size"] is None or offset < hits[-1]["offset"] + hits[-1]["size"]):
+            continue
+        try:
+            end = find_end(buf, offset)
+        except (struct.error, IndexError):
+            end = None
+        hits.append({"offset": offset, "type": name, "description": description, "extension": extension,
+                     "size": end - offset if end else None})
+        if offset == 0:
+            host_end = end
+        if len(hits) >= CARVE_MAX_HITS:
+            break
+
+    trailing = None
+    if hits and hits[0]["offset"] == 0 and hits[0]["size"]:
+        host_end = hits[0]["size"]
+        if len(buf) - host_end >= TRAILING_MIN_BYTES:
+            trailing = {"offset": host_end, "size": len(buf) - host_end}
+    return hits, trailing
+
+
+def carve(buf, hits, trailing, out_dir):
+    """Write every embedded file (not the host itself) and the trailing data into out_dir.
+
+    A hit without a known end runs to the next hit or the end of the file.
+    Sets "carved" (file name) on the hits written and returns the names.
+    """
+    carved = []
+    for index, hit in enumerate(hits):
+        if hit["offset"] == 0 or len(carved) >= CARVE_MAX_FILES:
+            continue
+        size = hit["size"]
+        if size is None:
+            following = [h["offset"] for h in hits[index + 1:] if h["offset"] > hit["offset"]]
+            size = (following[0] if following else len(buf)) - hit["offset"]
+        name = f"{hit['offset']:08x}{hit['extension']}"
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(buf[hit["offset"]:hit["offset"] + size])
+        hit["carved"] = name
+        carved.append(name)
+    if trailing and len(carved) < CARVE_MAX_FILES:
+        name = f"{trailing['offset']:08x}_trailing.bin"
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(buf[trailing["offset"]:])
+        trailing["carved"] = name
+        carved.append(name)
+    return carved
+
+
+def format_table(hits, trailing):
+    """binwalk-style DECIMAL / HEXADECIMAL / DESCRIPTION table for the UI."""
+    lines = ["DECIMAL       HEXADECIMAL     DESCRIPTION",
+             "-" * 80]
+    for hit in hits:
+        size = f", {hit['size']} bytes" if hit["size"] else ""
+        lines.append(f"{hit['offset']:<14}0x{hit['offset']:<14X}{hit['description']}{size}")
+    if trailing:
+        lines.append(f"{trailing['offset']:<14}0x{trailing['offset']:<14X}"
+                     f"Data after end of image, {trailing['size']} bytes")
+    return "\n".join(lines)
@@ -0,0 +1,259 @@
+import os
+import re
+import base64
+import binascii
+from urllib.parse import unquote_to_bytes
+
+from stego.patterns import FLAG_RE
+
+# Tools whose output is searched for flags and encoded blobs
+DECODE_SOURCES = ("strings", "exiftool", "zsteg", "tesseract_ocr", "zbarimg", "lsb_scan",
+                  "morse_detect", "dtmf_detect", "rtty_decode")
+# Decoders applied one after another at most this many times (base64 of hex of ROT13 is 3)
+DECODE_MAX_DEPTH = int(os.environ.get("DECODE_MAX_DEPTH", 3))
+# Characters of one tool's output scanned; the matcher is linear, this only bounds the work
+DECODE_MAX_TEXT = int(os.environ.get("DECODE_MAX_TEXT", 4 * 1024 * 1024))
+# Encoded blobs decoded per source, so a binary full of base64-like strings
+# cannot use up the budget of the small tool outputs (QR codes, OCR, metadata)
+DECODE_MAX_TOKENS = int(os.environ.get("DECODE_MAX_TOKENS", 5000))
+# Candidates kept in the report
+DECODE_MAX_CANDIDATES = int(os.environ.get("DECODE_MAX_CANDIDATES", 50))
+# Flag prefixes that score above any other flag-shaped text
+FLAG_PREFIXES = [p.strip().lower() for p in
+                 os.environ.get("FLAG_PREFIXES", "flag,ctf,picoctf,htb,thm,ductf,csaw,cicada").split(",") if p.strip()]
+# Bumped when decoding changes, so cached reports are not replayed without it
+DECODER_VERSION = 3
+
+# One alternation over the text: Ascii85 in its <~ ~> frame, Morse, and runs of
+# the base64/base32/hex/URL-encoding alphabet. Every quantifier is bounded, so
+# finditer stays linear in the text however long it is.
+_TOKEN_RE = re.compile(r"<~[!-uz\s]{5,4096}~>"
+                       r"|[.\-]{1,8}(?:[ /]{1,3}[.\-]{1,8}){3,200}"
+                       r"|[A-Za-z0-9+/=_%\-]{12,4096}")
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/\-_]+={0,2}")
+_BASE32_RE = re.compile(r"[A-Z2-7]+={0,6}")
+_HEX_RE = re.compile(r"(?:[0-9a-fA-F]{2})+")
+_PERCENT_RE = re.compile(r"%[0-9A-Fa-f]{2}")
+_MORSE_RE = re.compile(r"[.\-]+(?:[ /]+[.\-]+)*")
+
+MORSE_CODE = {
+    ".-": "A", "-...": "B", "-.-.": "C", "-..": "D", ".": "E", "..-.": "F", "--.": "G", "....": "H",
+    "..": "I", ".---": "J", "-.-": "K", ".-..": "L", "--": "M", "-.": "N", "---": "O", ".--.": "P",
+    "--.-": "Q", ".-.": "R", "...": "S", "-": "T", "..-": "U", "...-": "V", ".--": "W", "-..-": "X",
+    "-.--": "Y", "--..": "Z", "-----": "0", ".----": "1", "..---": "2", "...--": "3", "....-": "4",
+    ".....": "5", "-....": "6", "--...": "7", "---..": "8", "----.": "9", "..--.-": "_", "-.--.": "{",
+    "-.--.-": "}", ".-.-.-": ".", "--..--": ",", "..--..": "?", "-....-": "-",
+}
+
+# bytes.translate tables for single-byte XOR and str tables for ROT-N, built once
+_XOR_TABLES = [bytes(b ^ key for b in range(256)) for key in range(256)]
+_ROT_TABLES = [str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "".join(chr((i + n) % 26 + 65) for i in range(26)) + "".join(chr((i + n) % 26 + 97) for i in range(26)))
+    for n in range(26)]
+_PRINTABLE = bytes(range(0x20, 0x7F)) + b"\t\n\r"
+
+
+def _is_text(data):
+    """Mostly printable ASCII, long enough to mean something."""
+    if len(data) < 4:
+        return False
+    return len(data.translate(None, _PRINTABLE)) <= 0.05 * len(data)
+
+
+def _base64(data):
+    text = data.decode("ascii")
+    if len(text) < 8 or not _BASE64_RE.fullmatch(text) or len(text.rstrip("=")) % 4 == 1:
+        return None
+    padded = text.rstrip("=") + "=" * (-len(text.rstrip("=")) % 4)
+    if "-" in text or "_" in text:
+        return base64.urlsafe_b64decode(padded)
+    return base64.b64decode(padded, validate=True)
+
+
+def _base32(data):
+    text = data.decode("ascii")
+    if len(text) < 8 or not _BASE32_RE.fullmatch(text):
+        return None
+    stripped = text.rstrip("=")
+    return base64.b32decode(stripped + "=" * (-len(stripped) % 8))
+
+
+def _base85(data):
+    if data.startswith(b"<~"):
+        return base64.a85decode(data, adobe=True, ignorechars=b" \t\r\n")
+    return base64.b85decode(data)
+
+
+def _hex(data):
+    if len(data) < 8 or not _HEX_RE.fullmatch(data.decode("ascii")):
+        return None
+    return binascii.unhexlify(data)
+
+
+def _url(data):
+    if not _PERCENT_RE.search(data.decode("ascii", "replace")):
+        return None
+    return unquote_to_bytes(data)
+
+
+def _morse(data):
+    text = data.decode("ascii")
+    if not _MORSE_RE.fullmatch(text):
+        return None
+    words = []
+    for word in re.split(r"\s*/\s*|\s{2,}", text.strip()):
+        letters = [MORSE_CODE.get(code) for code in word.split()]
+        if None in letters:
+            return None
+        words.append("".join(letters))
+    return " ".join(words).encode()
+
+
+# (name, decoder): a decoder returns bytes, None when the input is not its encoding, or raises
+DECODERS = [
+    ("base64", _base64),
+    ("base32", _base32),
+    ("base85", _base85),
+    ("hex", _hex),
+    ("url", _url),
+    ("morse", _morse),
+]
+
+
+def is_known_flag(text):
+    prefix = text.split("{", 1)[0].lower()
+    return any(prefix.endswith(known) for known in FLAG_PREFIXES)
+
+
+def score_candidate(value):
+    """Known-prefix flags first, then any flag-shaped text, then readable decoded text."""
+    flag = FLAG_RE.search(value)
+    if flag:
+        return (100 if is_known_flag(flag.group()) else 60), True
+    letters = sum(1 for c in value if c.isalpha() or c == " ")
+    return 10 + round(10 * letters / len(value)), False
+
+
+def _decode(data, depth, memo):
+    """Every readable text reachable from data as (chain, text), memoized on (data, depth).
+
+    Decoded text is scanned for blobs again, so a base64 string inside a
+    decoded sentence is followed too. ROT-N and single-byte XOR turn any
+    input into something, so they only count when they produce a flag
+    (ROT: one with a known prefix) and are never decoded further.
+    """
+    key = (data, depth)
+    if key in memo:
+        return memo[key]
+    memo[key] = found = []
+    if depth <= 0:
+        return found
+    for name, decoder in DECODERS:
+        try:
+            decoded = decoder(data)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            continue
+        if not decoded or decoded == data:
+            continue
+        if _is_text(decoded):
+            text = decoded.decode("latin-1")
+            found.append(((name,), text))
+            found.extend(((name,) + chain, rotated) for chain, rotated in _rotations(text))
+            for match in _TOKEN_RE.finditer(text):
+                for chain, deeper in _decode(match.group().encode("ascii"), depth - 1, memo):
+                    found.append(((name,) + chain, deeper))
+        elif len(decoded) <= 4096:
+            found.extend(((name,) + chain, text) for chain, text in _xor(decoded))
+    return found
+
+
+def _rotations(text):
+    flag = FLAG_RE.search(text)
+    if not flag or is_known_flag(flag.group()):
+        return []
+    found = []
+    for n in range(1, 26):
+        rotated = text.translate(_ROT_TABLES[n])
+        if is_known_flag(FLAG_RE.search(rotated).group()):
+            found.append(((f"rot{n}",), rotated))
+    return found
+
+
+def _xor(data):
+    # XOR maps distinct bytes to distinct bytes: with more of them than there
+    # are printable characters no key can make the data text
+    if len(set(data)) > len(_PRINTABLE) + 5:
+        return []
+    found = []
+    for key in range(1, 256):
+        xored = data.translate(_XOR_TABLES[key])
+        if _is_text(xored):
+            text = xored.decode("latin-1")
+            if FLAG_RE.search(text):
+                found.append(((f"xor:{key:#04x}",), text))
+    return found
+
+
+def _texts(result, limit):
+    """String values of a tool result (strings, dicts and lists walked), up to limit characters.
+
+    A dict's "summary" restates its other fields as a table and is skipped.
+    """
+    texts = []
+    stack = [result]
+    while stack and limit > 0:
+        value = stack.pop()
+        if isinstance(value, str):
+            texts.append(value[:limit])
+            limit -= len(value)
+        elif isinstance(value, dict):
+            stack.extend(reversed([v for k, v in value.items() if k != "summary"]))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+    return texts
+
+
+def find_candidates(results, sources=DECODE_SOURCES, texts=None):
+    """Flags and decodable blobs in the tools' outputs, best first.
+
+    Each candidate is {"value", "score", "flag", "chain", "source",
+    "input"}: chain lists the decoders applied to input (empty for text
+    found as is). Identical blobs are decoded once however many tools
+    printed them. texts maps a source to the text scanned instead of its
+    result, e.g. every string of the input where the result holds the top few.
+    """
+    texts = texts or {}
+    memo = {}
+    best = {}
+
+    def add(value, chain, source, token):
+        value = value.strip()
+        if len(value) < 6:
+            return
+        score, flag = score_candidate(value)
+        current = best.get(value)
+        if current is None or (score, -len(chain)) > (current["score"], -len(current["chain"])):
+            best[value] = {"value": value[:500], "score": score, "flag": flag, "chain": list(chain),
+                           "source": source, "input": token[:200]}
+
+    for source in sources:
+        tokens = 0
+        for text in _texts(texts.get(source, results.get(source)), DECODE_MAX_TEXT):
+            for match in FLAG_RE.finditer(text):
+                add(match.group(), (), source, match.group())
+                for chain, rotated in _rotations(match.group()):
+                    add(rotated, chain, source, match.group())
+            for match in _TOKEN_RE.finditer(text):
+                if tokens >= DECODE_MAX_TOKENS:
+                    break
+                tokens += 1
+                token = match.group()
+                for chain, decoded in _decode(token.encode("ascii"), DECODE_MAX_DEPTH, memo):
+                    flag = FLAG_RE.search(decoded)
+                    add(flag.group() if flag else decoded, chain, source, token)
+
+    ranked = sorted(best.values(), key=lambda c: (-c["score"], len(c["chain"]), c["value"]))
+    return {"found": any(c["flag"] for c in ranked), "candidates": ranked[:DECODE_MAX_CANDIDATES],
+            "decoded_blobs": len(memo), "message": f"{len(ranked)} candidate(s), "
+                                                   f"{sum(1 for c in ranked if c['flag'])} flag-like"}
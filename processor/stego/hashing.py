@@ -0,0 +1,35 @@
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Order matters: it is the order of the sections in the "hashes" tool output
+DIGEST_ALGORITHMS = ("md5", "sha1", "sha256")
+
+
+def new_hashers():
+    """Fresh hashlib objects for every digest we report."""
+    return {name: hashlib.new(name) for name in DIGEST_ALGORITHMS}
+
+
+def compute_digests(data, chunk_size=HASH_CHUNK_SIZE):
+    """Hash a bytes-like object with every algorithm in one pass.
+
+    Feeds memoryview slices so large uploads are never copied; hashlib
+    releases the GIL on big updates, so this also plays well with the
+    tool scheduler threads.
+    """
+    hashers = new_hashers()
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        chunk = view[offset:offset + chunk_size]
+        for h in hashers.values():
+            h.update(chunk)
+    return {name: h.hexdigest() for name, h in hashers.items()}
+
+
+def format_digests(digests, file_path):
+    """Render digests exactly like the old md5sum/sha1sum/sha256sum printf chain."""
+    sections = []
+    for name in DIGEST_ALGORITHMS:
+        sections.append(f"{name.upper()}:\n{digests[name]}  {file_path}\n")
+    return "\n".join(sections)
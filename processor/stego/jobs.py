@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# SQLite lives on local disk so both gunicorn workers see the same queue
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "/tmp/cicaado_jobs.sqlite")
+# Analysis threads per gunicorn worker process
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+# Finished jobs (and their events) are dropped after this many seconds
+JOB_TTL = int(os.environ.get("JOB_TTL", 24 * 3600))
+# Seconds between a running job's heartbeats (sent whether or not its tools report progress)
+JOB_HEARTBEAT_SECONDS = int(os.environ.get("JOB_HEARTBEAT_SECONDS", 30))
+# A running job without a heartbeat for this long belonged to a dead worker and is re-queued
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 10 * JOB_HEARTBEAT_SECONDS))
+JOB_POLL_INTERVAL = 0.5
+
+FINISHED_STATES = ("complete", "failed", "cancelled")
+
+
+class JobStore:
+    """Job queue and event log in one SQLite file.
+
+    Every call opens its own connection, so the store can be shared freely
+    between HTTP threads, worker threads and processes.
+    """
+
+    def __init__(self, path=JOB_DB_PATH):
+        self.path = path
+        with self._db() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL,
+                results TEXT, error TEXT, created_at REAL, started_at REAL,
+                finished_at REAL, updated_at REAL, cancel_requested INTEGER DEFAULT 0)""")
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass  # column already there
+            conn.execute("""CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, request_data):
+        """Queue a /process payload and return the new job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("INSERT INTO jobs (id, status, request, results, created_at, updated_at) "
+                         "VALUES (?, 'queued', ?, '{}', ?, ?)", (job_id, json.dumps(request_data), now, now))
+        self.purge()
+        return job_id
+
+    def claim(self):
+        """Atomically take the oldest queued job (or a stale running one). Returns (id, request) or None."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, request FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND updated_at < ?) ORDER BY created_at LIMIT 1",
+                (now - JOB_STALE_SECONDS,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ?, updated_at = ? WHERE id = ?",
+                         (now, now, row[0]))
+            conn.execute("COMMIT")
+            return row[0], json.loads(row[1])
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def add_event(self, job_id, event, results=None):
+        """Append one progress event; results (when given) replaces the partial results."""
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("INSERT INTO job_events (job_id, seq, event) SELECT ?, COALESCE(MAX(seq), 0) + 1, ? "
+                         "FROM job_events WHERE job_id = ?", (job_id, json.dumps(event, default=str), job_id))
+            if results is not None:
+                conn.execute("UPDATE jobs SET results = ?, updated_at = ? WHERE id = ?",
+                             (json.dumps(results, default=str), now, job_id))
+            else:
+                conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+
+    def finish(self, job_id, results=None, error=None, cancelled=False):
+        now = time.time()
+        with self._db() as conn:
+            if cancelled:
+                conn.execute("UPDATE jobs SET status = 'cancelled', results = ?, finished_at = ?, updated_at = ? "
+                             "WHERE id = ?", (json.dumps(results or {}, default=str), now, now, job_id))
+            elif error:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ? "
+                             "WHERE id = ?", (error, now, now, job_id))
+            else:
+                conn.execute("UPDATE jobs SET status = 'complete', results = ?, finished_at = ?, updated_at = ? "
+                             "WHERE id = ?", (json.dumps(results, default=str), now, now, job_id))
+
+    def get(self, job_id):
+        """Job status and (partial) results as a dict, or None."""
+        with self._db() as conn:
+            row = conn.execute("SELECT id, status, results, error, created_at, started_at, finished_at "
+                               "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row[1] == "queued":
+                position = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?",
+                                        (row[4],)).fetchone()[0]
+        job = {"id": row[0], "status": row[1], "error": row[3],
+               "created_at": row[4], "started_at": row[5], "finished_at": row[6]}
+        results = json.loads(row[2] or "{}")
+        job["results" if row[1] == "complete" else "partial_results"] = results
+        if position is not None:
+            job["queue_position"] = position
+        return job
+
+    def request_cancel(self, job_id):
+        """Cancel a queued job outright or flag a running one for its worker. Returns the new status."""
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ?, updated_at = ? "
+                         "WHERE id = ? AND status = 'queued'", (now, now, job_id))
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+            row = conn.execute("SELECT status, cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return "cancelling" if row[0] == "running" and row[1] else row[0]
+
+    def heartbeat(self, job_id):
+        """Mark a running job as alive, so claim() never hands it to a second worker."""
+        with self._db() as conn:
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id))
+
+    def cancel_requested(self, job_id):
+        with self._db() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def events(self, job_id, after=0):
+        """Events with seq > after, as (seq, event dict) pairs."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                                (job_id, after)).fetchall()
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+    def purge(self, ttl=JOB_TTL):
+        """Drop finished jobs older than ttl."""
+        cutoff = time.time() - ttl
+        with self._db() as conn:
+            conn.execute("DELETE FROM job_events WHERE job_id IN "
+                         "(SELECT id FROM jobs WHERE status IN ('complete', 'failed', 'cancelled') AND finished_at < ?)",
+                         (cutoff,))
+            conn.execute("DELETE FROM jobs WHERE status IN ('complete', 'failed', 'cancelled') AND finished_at < ?",
+                         (cutoff,))
+
+
+def run_job(store, job_id, events, cancel=None):
+    """Drain an analysis event stream into the store.
+
+    events yields the same dicts /process streams as NDJSON; each finished
+    tool is folded into the job's partial results as it arrives. When cancel
+    is set by the time the stream ends, the job is marked cancelled and keeps
+    whatever results it had.
+    """
+    partial = {}
+    finished = False
+    try:
+        # Keep iterating after the final event so the analysis can clean up its workspace
+        for event in events:
+            if finished:
+                continue
+            if cancel is not None and cancel.is_set() and event.get("status") == "complete":
+                store.add_event(job_id, {"status": "cancelled", "message": "Job cancelled"})
+                store.finish(job_id, results=event.get("results", partial), cancelled=True)
+                finished = True
+            elif event.get("status") == "complete":
+                store.add_event(job_id, event)
+                store.finish(job_id, results=event.get("results", partial))
+                finished = True
+            elif event.get("status") == "error":
+                store.add_event(job_id, event)
+                store.finish(job_id, error=event.get("error") or "Analysis failed")
+                finished = True
+            elif "partial_result" in event:
+                partial[event["tool"]] = event["partial_result"]
+                store.add_event(job_id, event, results=partial)
+            else:
+                store.add_event(job_id, event)
+        if not finished and cancel is not None and cancel.is_set():
+            store.finish(job_id, results=partial, cancelled=True)
+        elif not finished:
+            store.finish(job_id, error="Analysis ended without a result")
+    except Exception as e:
+        print(f"[ERROR] Job {job_id} failed: {e}")
+        store.finish(job_id, error=f"Analysis failed: {str(e)}")
+    finally:
+        if hasattr(events, "close"):
+            events.close()
+
+
+class JobWorkers:
+    """Background threads that claim queued jobs and run them through analyse(request, cancel).
+
+    analyse returns an iterable of event dicts and should stop early once the
+    cancel Event is set; a watcher sets it when the job is cancelled from any
+    process. The pool starts lazily, once per process, so every gunicorn
+    worker drains the shared queue.
+    """
+
+    def __init__(self, store, analyse, count=JOB_WORKERS):
+        self.store = store
+        self.analyse = analyse
+        self.count = count
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._threads and all(t.is_alive() for t in self._threads):
+                return
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.count:
+                thread = threading.Thread(target=self._loop, name=f"job-worker-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake idle workers after a submit instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            try:
+                claimed = self.store.claim()
+            except Exception as e:
+                print(f"[ERROR] Job queue unavailable: {e}")
+                claimed = None
+            if claimed is None:
+                self._wake.wait(JOB_POLL_INTERVAL * 4)
+                self._wake.clear()
+                continue
+            job_id, request_data = claimed
+            print(f"[DEBUG] Running job {job_id}")
+            cancel = threading.Event()
+            done = threading.Event()
+            watcher = threading.Thread(target=self._watch, args=(job_id, cancel, done), daemon=True)
+            watcher.start()
+            try:
+                events = self.analyse(request_data, cancel)
+            except Exception as e:
+                self.store.finish(job_id, error=f"Analysis failed: {str(e)}")
+                continue
+            else:
+                run_job(self.store, job_id, events, cancel)
+            finally:
+                done.set()
+            print(f"[DEBUG] Finished job {job_id}")
+
+    def _watch(self, job_id, cancel, done):
+        """Heartbeat the running job and turn a cancel request stored by any process into its Event."""
+        last_beat = time.monotonic()
+        while not done.wait(JOB_POLL_INTERVAL):
+            try:
+                if time.monotonic() - last_beat >= JOB_HEARTBEAT_SECONDS:
+                    self.store.heartbeat(job_id)
+                    last_beat = time.monotonic()
+                # Keeps beating after a cancel while the tools wind down
+                if not cancel.is_set() and self.store.cancel_requested(job_id):
+                    print(f"[DEBUG] Cancelling job {job_id}")
+                    cancel.set()
+            except Exception as e:
+                print(f"[ERROR] Job heartbeat / cancel check failed: {e}")
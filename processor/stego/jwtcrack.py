@@ -0,0 +1,243 @@
+import os
+import hmac
+import json
+import time
+import base64
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from stego.scheduler import _cpu_quota
+from stego.wordlists import get_wordlist, WORDLIST_DEDUP_MAX
+
+# HMAC is pure CPU work, so one process per CPU
+JWT_CRACK_WORKERS = int(os.environ.get("JWT_CRACK_WORKERS", max(1, int(_cpu_quota()))))
+# Wall-clock budget for one crack
+JWT_CRACK_TIMEOUT = int(os.environ.get("JWT_CRACK_TIMEOUT", 600))
+# Candidates per pool task: small enough that cancel and progress stay responsive
+JWT_CHUNK_SIZE = int(os.environ.get("JWT_CHUNK_SIZE", 250000))
+# Cracks over this many candidates are queued as jobs instead of run in the request
+JWT_INLINE_MAX = int(os.environ.get("JWT_INLINE_MAX", 1000000))
+# Seconds between progress events
+PROGRESS_INTERVAL = 1.0
+
+# Tried before any list the caller picks
+JWT_BASE_WORDLISTS = ["jwt-secrets"]
+
+HMAC_DIGESTS = {
+    "HS256": "sha256",
+    "HS384": "sha384",
+    "HS512": "sha512",
+}
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def parse_token(token):
+    """Split an HS* JWT into (signing_input, signature, digest name); returns an error string if it cannot be cracked."""
+    parts = token.strip().split(".")
+    if len(parts) != 3:
+        return "Invalid JWT: expected 3 dot-separated parts"
+    try:
+        header = json.loads(_b64decode(parts[0]))
+        signature = _b64decode(parts[2])
+    except Exception as e:
+        return f"Failed to decode JWT: {str(e)}"
+    digest = HMAC_DIGESTS.get(header.get("alg", "") if isinstance(header, dict) else "")
+    if digest is None:
+        return "Only HS256/HS384/HS512 tokens can be cracked"
+    if not signature:
+        return "Token has no signature"
+    return (parts[0] + "." + parts[1]).encode(), signature, digest
+
+
+def check_words(words, signing_input, signature, digest):
+    """Index of the first word that signs signing_input to signature, or None.
+
+    The signing input and signature are decoded once per crack, so each
+    candidate costs a single one-shot hmac.digest() and a bytes compare.
+    """
+    for i, word in enumerate(words):
+        if hmac.digest(word, signing_input, digest) == signature:
+            return i
+    return None
+
+
+def _crack_chunk(path, start, stop, signing_input, signature, digest):
+    """Pool task: check entries start..stop of a wordlist. Returns (secret or None, attempts)."""
+    words = get_wordlist(path).entries(start, stop)
+    i = check_words(words, signing_input, signature, digest)
+    if i is None:
+        return None, len(words)
+    return words[i], i + 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process pool shared by every crack in this process, started on first use.
+
+    Workers are spawned rather than forked so they never inherit the
+    server's threads and locks.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=JWT_CRACK_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def resolve_wordlists(names):
+    """The base lists plus the caller's, loaded and in priority order (unknown names skipped)."""
+    lists = {}
+    for name in JWT_BASE_WORDLISTS + [n for n in (names or []) if n]:
+        wordlist = get_wordlist(name)
+        if wordlist is not None:
+            lists[wordlist.path] = wordlist
+    return sorted(lists.values(), key=lambda w: w.priority)
+
+
+def iter_crack(token, wordlists=None, cancel=None, timeout=JWT_CRACK_TIMEOUT):
+    """Crack an HS* JWT secret, yielding progress dicts and finally the result dict.
+
+    Small lists are checked in this process (skipping words an earlier list
+    already tried); big ones are cut into JWT_CHUNK_SIZE ranges that the
+    process pool works through, each worker reading its range straight
+    from the memory-mapped list. Progress dicts carry attempts, total,
+    percent, candidates_per_second and eta_seconds; the result has
+    "status": "found" | "exhausted" | "timeout" | "cancelled".
+    """
+    parsed = parse_token(token)
+    if isinstance(parsed, str):
+        yield {"done": True, "status": "error", "error": parsed}
+        return
+    signing_input, signature, digest = parsed
+    lists = resolve_wordlists(wordlists)
+    total = sum(len(w) for w in lists)
+    started = time.monotonic()
+    deadline = started + timeout
+    state = {"attempts": 0, "secret": None, "status": "exhausted", "last_report": started}
+
+    def progress():
+        now = time.monotonic()
+        elapsed = max(now - started, 1e-6)
+        rate = state["attempts"] / elapsed
+        remaining = max(total - state["attempts"], 0)
+        return {
+            "attempts": state["attempts"],
+            "total": total,
+            "percent": round(100.0 * state["attempts"] / total, 2) if total else 100.0,
+            "candidates_per_second": int(rate),
+            "elapsed": round(elapsed, 1),
+            "eta_seconds": round(remaining / rate, 1) if rate else None,
+        }
+
+    def should_stop():
+        if cancel is not None and cancel.is_set():
+            state["status"] = "cancelled"
+        elif time.monotonic() > deadline:
+            state["status"] = "timeout"
+        return state["status"] in ("cancelled", "timeout")
+
+    seen = set()
+    for wordlist in lists:
+        if state["secret"] is not None or should_stop():
+            break
+        if len(wordlist) <= JWT_CHUNK_SIZE:
+            words = [w for w in wordlist.entries(0, len(wordlist)) if w not in seen]
+            if len(wordlist) <= WORDLIST_DEDUP_MAX:
+                seen.update(words)
+            i = check_words(words, signing_input, signature, digest)
+            state["attempts"] += len(words) if i is None else i + 1
+            total -= len(wordlist) - len(words)
+            if i is not None:
+                state["secret"] = words[i]
+            continue
+
+        print(f"[DEBUG] Cracking JWT against {wordlist.name} ({len(wordlist)} entries, {JWT_CRACK_WORKERS} workers)")
+        pool = get_pool()
+        ranges = iter(range(0, len(wordlist), JWT_CHUNK_SIZE))
+        pending = set()
+        try:
+            while True:
+                while state["secret"] is None and len(pending) < JWT_CRACK_WORKERS * 2 and not should_stop():
+                    start = next(ranges, None)
+                    if start is None:
+                        break
+                    pending.add(pool.submit(_crack_chunk, wordlist.path, start, start + JWT_CHUNK_SIZE,
+                                            signing_input, signature, digest))
+                if not pending:
+                    break
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    secret, attempts = future.result()
+                    state["attempts"] += attempts
+                    if secret is not None and state["secret"] is None:
+                        state["secret"] = secret
+                if state["secret"] is not None or should_stop():
+                    break
+                now = time.monotonic()
+                if now - state["last_report"] >= PROGRESS_INTERVAL:
+                    state["last_report"] = now
+                    yield progress()
+        except BrokenProcessPool as e:
+            _reset_pool()
+            yield {"done": True, "status": "error", "error": f"JWT cracker worker died: {str(e)}"}
+            return
+        finally:
+            # Also runs when the consumer goes away mid-crack
+            for future in pending:
+                future.cancel()
+
+    result = progress()
+    result.pop("eta_seconds")
+    result.update({
+        "done": True,
+        "status": "found" if state["secret"] is not None else state["status"],
+        "cracked_secret": None if state["secret"] is None else state["secret"].decode("utf-8", "replace"),
+        "wordlists": [w.name for w in lists],
+        "workers": JWT_CRACK_WORKERS,
+    })
+    yield result
+
+
+def crack(token, wordlists=None, cancel=None, timeout=JWT_CRACK_TIMEOUT):
+    """Run iter_crack to the end and return its result dict."""
+    result = None
+    for result in iter_crack(token, wordlists, cancel, timeout):
+        pass
+    result.pop("done", None)
+    return result
+
+
+def crack_size(wordlists=None):
+    """Candidates a crack over these lists would try at most."""
+    return sum(len(w) for w in resolve_wordlists(wordlists))
+
+
+def crack_events(request_data, cancel=None):
+    """Job entry point: a JWT crack as the same event dicts /process streams."""
+    for update in iter_crack(request_data.get("token", ""), request_data.get("wordlists"), cancel):
+        if not update.pop("done", False):
+            message = f"{update['percent']:.1f}% ({update['candidates_per_second']} candidates/s"
+            if update["eta_seconds"] is not None:
+                message += f", ETA {update['eta_seconds']:.0f}s"
+            yield {"status": "progress", "tool": "jwt_crack", "message": message + ")", **update}
+        elif update["status"] == "error":
+            yield {"status": "error", "error": update["error"]}
+        else:
+            yield {"status": "complete", "results": {"jwt_crack": update}}
@@ -0,0 +1,7 @@
+import re
+
+# A CTF flag: a short prefix and a brace-wrapped body without whitespace,
+# e.g. flag{...}, CTF{...} or picoCTF{...}
+FLAG_RE = re.compile(r"[A-Za-z0-9_]{2,20}\{[^\s{}]{3,120}\}")
+# The same shape in raw bytes (extracted LSB payloads); the body is printable ASCII
+FLAG_BYTES_RE = re.compile(rb"[A-Za-z0-9_]{2,20}\{[!-z|~]{3,120}\}")
@@ -0,0 +1,175 @@
+import os
+
+from stego.scheduler import lane_for
+
+# File formats tools can declare. A format matches by (normalised) extension
+# or by magic bytes at an offset, so a mislabelled upload still reaches the
+# tools that understand its content.
+FORMATS = {
+    "png": {"mime": "image/png", "extensions": (".png",), "magic": [(0, b"\x89PNG\r\n\x1a\n")]},
+    "jpeg": {"mime": "image/jpeg", "extensions": (".jpg", ".jpeg"), "magic": [(0, b"\xff\xd8\xff")]},
+    "gif": {"mime": "image/gif", "extensions": (".gif",), "magic": [(0, b"GIF87a"), (0, b"GIF89a")]},
+    "bmp": {"mime": "image/bmp", "extensions": (".bmp",), "magic": [(0, b"BM")]},
+    "webp": {"mime": "image/webp", "extensions": (".webp",), "magic": [(8, b"WEBP")]},
+    "tiff": {"mime": "image/tiff", "extensions": (".tiff", ".tif"), "magic": [(0, b"II*\x00"), (0, b"MM\x00*")]},
+    "wav": {"mime": "audio/wav", "extensions": (".wav",), "magic": [(8, b"WAVE")]},
+    "au": {"mime": "audio/basic", "extensions": (".au",), "magic": [(0, b".snd")]},
+    "mp3": {"mime": "audio/mpeg", "extensions": (".mp3",), "magic": [(0, b"ID3"), (0, b"\xff\xfb"), (0, b"\xff\xf3")]},
+    "ogg": {"mime": "audio/ogg", "extensions": (".ogg", ".opus"), "magic": [(0, b"OggS")]},
+    "flac": {"mime": "audio/flac", "extensions": (".flac",), "magic": [(0, b"fLaC")]},
+    "aac": {"mime": "audio/aac", "extensions": (".aac",), "magic": [(0, b"\xff\xf1"), (0, b"\xff\xf9")]},
+    "mp4": {"mime": "audio/mp4", "extensions": (".m4a", ".mp4"), "magic": [(4, b"ftyp")]},
+    "wma": {"mime": "audio/x-ms-wma", "extensions": (".wma",), "magic": [(0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11")]},
+    "aiff": {"mime": "audio/aiff", "extensions": (".aiff", ".aif"), "magic": [(8, b"AIFF"), (8, b"AIFC")]},
+}
+
+IMAGE_FORMATS = ("png", "jpeg", "gif", "bmp", "webp", "tiff")
+# Formats whose pixels survive a save unchanged (JPEG re-quantises them)
+LOSSLESS_IMAGE_FORMATS = ("png", "gif", "bmp", "webp", "tiff")
+AUDIO_FORMATS = ("wav", "au", "mp3", "ogg", "flac", "aac", "mp4", "wma", "aiff")
+# The carriers zsteg reads
+ZSTEG_FORMATS = ("png", "bmp")
+# The carriers steghide (and stegseek) embed in
+STEGHIDE_FORMATS = ("jpeg", "bmp", "wav", "au")
+
+# Bytes of the upload read to match magic numbers
+HEADER_BYTES = 16
+
+
+def detect_formats(extension, header):
+    """Names of every format the upload matches by extension or by magic bytes."""
+    extension = (extension or "").lower()
+    found = set()
+    for name, spec in FORMATS.items():
+        if extension in spec["extensions"]:
+            found.add(name)
+        elif any(header[offset:offset + len(magic)] == magic for offset, magic in spec["magic"]):
+            found.add(name)
+    return found
+
+
+def file_formats(path):
+    """detect_formats for a file on disk: its extension and first HEADER_BYTES."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+    return detect_formats(os.path.splitext(path)[1], header)
+
+
+class Tool:
+    """One analyser and the rules for when and how it runs.
+
+    Either `run` (called with the context values named in `args`) or a shell
+    `command` template (formatted with the context) does the work; `timeout`
+    bounds the command, and a run function gets it by naming "timeout" in
+    `args`. `formats`
+    limits the tool to those uploads (None: every file); `available` is an
+    optional check for its binaries, and `skip_message`, when set, is
+    reported as the result whenever the tool does not apply or is missing.
+    `cost` is a rough run time in seconds used to order the plan, `after`
+    names tools whose results must exist before this one starts, and
+    `output` is "text" or "json" (a dict result). `deep` tools only run
+    when the caller asks for deep mode.
+    """
+
+    def __init__(self, name, run=None, args=("path",), command=None, formats=None, binaries=(),
+                 available=None, skip_message=None, cost=1.0, timeout=60, after=(), message=None,
+                 output="text", deep=False):
+        self.name = name
+        self.run = run
+        self.args = tuple(args)
+        self.command = command
+        self.formats = tuple(formats) if formats else None
+        self.binaries = list(binaries)
+        self.available = available
+        self.skip_message = skip_message
+        self.cost = cost
+        self.timeout = timeout
+        self.after = tuple(after)
+        self.message = message
+        self.output = output
+        self.deep = deep
+
+    def applies(self, formats):
+        return self.formats is None or bool(formats & set(self.formats))
+
+    def is_available(self):
+        return self.available is None or bool(self.available())
+
+    def job(self, context, run_command):
+        """The (name, fn, args) tuple run_tools expects, for this upload."""
+        if self.command is not None:
+            return (self.name, run_command, (self.command.format(**context), self.timeout))
+        context = dict(context, timeout=self.timeout)
+        return (self.name, self.run, tuple(context[arg] for arg in self.args))
+
+    def info(self):
+        mimes = sorted({FORMATS[f]["mime"] for f in self.formats}) if self.formats else ["*/*"]
+        return {
+            "name": self.name,
+            "formats": list(self.formats) if self.formats else None,
+            "mime_types": mimes,
+            "binaries": self.binaries,
+            "available": self.is_available(),
+            "cost": self.cost,
+            "timeout": self.timeout,
+            "lane": lane_for(self.name),
+            "after": list(self.after),
+            "output": self.output,
+            "deep": self.deep,
+        }
+
+
+# Registration order is the order tools appear in reports
+TOOLS = {}
+
+
+def register(tool):
+    TOOLS[tool.name] = tool
+    return tool
+
+
+def get_tool(name):
+    return TOOLS.get(name)
+
+
+def select_tools(local_path, header, deep=False):
+    """Tools to run for an upload, plus {tool: message} for the ones reported as skipped."""
+    formats = detect_formats(os.path.splitext(local_path)[1], header)
+    selected = []
+    skipped = {}
+    for tool in TOOLS.values():
+        if tool.deep and not deep:
+            continue
+        if tool.applies(formats) and tool.is_available():
+            selected.append(tool)
+        elif tool.skip_message:
+            skipped[tool.name] = tool.skip_message
+    return selected, skipped
+
+
+def plan(tools):
+    """Order tools into phases: a tool runs in the first phase after everything it waits for.
+
+    Inside a phase the most expensive tools come first, so the long
+    crackers take their lane slot straight away and the cheap tools fill
+    the remaining slots around them. Dependencies on tools that are not
+    part of this run are ignored.
+    """
+    names = {tool.name for tool in tools}
+    level = {}
+
+    def depth(tool, seen=()):
+        if tool.name not in level:
+            if tool.name in seen:
+                raise ValueError(f"Tool dependency cycle through {tool.name}")
+            deps = [TOOLS[d] for d in tool.after if d in names]
+            level[tool.name] = 1 + max((depth(d, seen + (tool.name,)) for d in deps), default=-1)
+        return level[tool.name]
+
+    phases = []
+    for tool in tools:
+        index = depth(tool)
+        while len(phases) <= index:
+            phases.append([])
+        phases[index].append(tool)
+    return [sorted(phase, key=lambda t: -t.cost) for phase in phases]
@@ -0,0 +1,223 @@
+import os
+import math
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _cpu_quota():
+    """Return the number of CPUs this container may use (cgroup quota, else cpu_count)."""
+    # cgroup v2
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+            if quota != "max":
+                return float(quota) / float(period)
+    except Exception:
+        pass
+    # cgroup v1
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read().strip())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read().strip())
+        if quota > 0 and period > 0:
+            return quota / period
+    except Exception:
+        pass
+    return float(os.cpu_count() or 1)
+
+
+# Most tools spend their time waiting on a subprocess, so keep at least two
+# slots even on fractional-CPU containers; a cheap tool can then run beside
+# a long stegseek crack.
+GLOBAL_TOOL_CONCURRENCY = int(os.environ.get(
+    "TOOL_CONCURRENCY_GLOBAL", max(2, math.ceil(_cpu_quota()))
+))
+REQUEST_TOOL_CONCURRENCY = int(os.environ.get(
+    "TOOL_CONCURRENCY_PER_REQUEST", min(4, GLOBAL_TOOL_CONCURRENCY)
+))
+
+# Shared by every request handled by this gunicorn worker process
+_global_slots = threading.BoundedSemaphore(GLOBAL_TOOL_CONCURRENCY)
+
+# Each lane has its own cap on top of the per-request and global limits, so
+# crackers and heavy extractors queue behind each other instead of taking
+# every slot that file/xxd/exiftool need.
+LANE_CONCURRENCY = {
+    "fast": int(os.environ.get("LANE_FAST_CONCURRENCY", GLOBAL_TOOL_CONCURRENCY)),
+    "slow": int(os.environ.get("LANE_SLOW_CONCURRENCY", 1)),
+    "audio": int(os.environ.get("LANE_AUDIO_CONCURRENCY", 2)),
+}
+
+# Tools not listed run in the fast lane
+TOOL_LANES = {
+    "steghide_crack": "slow",
+    "stegoveritas": "slow",
+    "outguess": "slow",
+    "foremost": "slow",
+    "tesseract_ocr": "slow",
+    "ffmpeg_info": "audio",
+    "sox_info": "audio",
+    "sox_spectrogram": "audio",
+    "mediainfo": "audio",
+    "dtmf_detect": "audio",
+    "morse_detect": "audio",
+    "rtty_decode": "audio",
+}
+
+
+class Lane:
+    """A concurrency cap shared by every request in this process, with queue metrics."""
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = max(1, limit)
+        self._slots = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def acquire(self):
+        with self._lock:
+            self.waiting += 1
+        started = time.monotonic()
+        self._slots.acquire()
+        waited = time.monotonic() - started
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def release(self):
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "running": self.running,
+                "queued": self.waiting,
+                "completed": self.completed,
+                "avg_wait_seconds": round(self.wait_seconds / self.completed, 3) if self.completed else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+            }
+
+
+# One per lane, shared by every request in this process
+_lanes = {name: Lane(name, limit) for name, limit in LANE_CONCURRENCY.items()}
+
+
+def lane_for(tool):
+    return TOOL_LANES.get(tool, "fast")
+
+
+def lane_metrics():
+    """Per-lane limit, running/queued counts and wait times for this process."""
+    return {name: lane.metrics() for name, lane in _lanes.items()}
+
+
+# The tool a scheduler thread is currently running, for report_progress()/cancelled()
+_current = threading.local()
+
+CANCELLED_RESULT = "Cancelled before completion"
+
+
+def report_progress(**info):
+    """Emit a progress event for the tool running on this thread (no-op outside run_tools)."""
+    events = getattr(_current, "events", None)
+    if events is not None:
+        events.put(("progress", _current.name, info))
+
+
+def cancel_event():
+    """The cancellation Event of the run this thread belongs to, or None."""
+    return getattr(_current, "cancel", None)
+
+
+def cancelled():
+    event = cancel_event()
+    return event is not None and event.is_set()
+
+
+def run_tools(jobs, max_concurrency=None, cancel=None):
+    """Run independent tool jobs concurrently and yield events as they happen.
+
+    jobs is a list of (name, fn, args) tuples. Yields ("start", name, None)
+    when a tool actually begins running, ("progress", name, info) whenever
+    it calls report_progress(), and ("done", name, result) when it finishes,
+    in completion order. A tool that raises reports the error string as its
+    result, matching the run_* helpers.
+
+    Jobs are grouped by lane and every lane gets its own threads, so a
+    request's slow tools never sit on the threads its fast tools need. A
+    tool runs once it holds a slot of the request (max_concurrency), of its
+    lane and of the process (GLOBAL_TOOL_CONCURRENCY), taken in that order.
+
+    Setting cancel (a threading.Event) stops tools that have not started;
+    long-running tools poll cancelled() and kill their subprocess. Closing
+    the generator early (the client went away) sets it too.
+    """
+    if not jobs:
+        return
+    per_request = max_concurrency or REQUEST_TOOL_CONCURRENCY
+    request_slots = threading.BoundedSemaphore(per_request)
+    cancel = cancel or threading.Event()
+    events = queue.Queue()
+
+    def _run(name, fn, args, lane):
+        if cancel.is_set():
+            events.put(("done", name, CANCELLED_RESULT))
+            return
+        with request_slots:
+            lane.acquire()
+            try:
+                with _global_slots:
+                    _current.events, _current.name, _current.cancel = events, name, cancel
+                    try:
+                        if cancel.is_set():
+                            result = CANCELLED_RESULT
+                        else:
+                            events.put(("start", name, None))
+                            try:
+                                result = fn(*args)
+                            except Exception as e:
+                                result = f"{name} failed: {str(e)}"
+                    finally:
+                        _current.events = _current.name = _current.cancel = None
+            finally:
+                lane.release()
+        events.put(("done", name, result))
+
+    by_lane = {}
+    for job in jobs:
+        by_lane.setdefault(lane_for(job[0]), []).append(job)
+
+    pools = []
+    remaining = len(jobs)
+    try:
+        for lane_name, lane_jobs in by_lane.items():
+            lane = _lanes[lane_name]
+            workers = max(1, min(per_request, lane.limit, len(lane_jobs)))
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{lane_name}-lane")
+            pools.append(pool)
+            for name, fn, args in lane_jobs:
+                pool.submit(_run, name, fn, args, lane)
+        while remaining:
+            event = events.get()
+            if event[0] == "done":
+                remaining -= 1
+            yield event
+    finally:
+        if remaining:
+            cancel.set()
+        for pool in pools:
+            pool.shutdown(wait=True)
@@ -0,0 +1,220 @@
+import io
+import math
+import wave
+import base64
+
+import numpy as np
+from PIL import Image
+
+from stego.audio import WAV_SAMPLE_WIDTHS
+
+# Defaults roughly match `sox -n spectrogram`: ~1.5k columns, 120 dB of range
+DEFAULT_OPTIONS = {
+    "window": "hann",
+    "n_fft": 1024,
+    "hop": 256,
+    "log_scale": True,
+    "dynamic_range_db": 120.0,
+    "fmin": 0.0,
+    "fmax": None,
+    "max_columns": 1600,
+}
+
+# Frames read from the WAV per step; bounds memory independently of file length
+CHUNK_FRAMES = 1 << 18
+# Samples windowed and transformed per FFT batch (n_fft x STFT frames), so hop
+# and n_fft cannot blow up the working set: ~50 MB with the complex output
+STFT_BATCH_SAMPLES = 1 << 21
+TILE_WIDTH = 256
+
+_WINDOWS = {
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+    "bartlett": np.bartlett,
+    "rect": np.ones,
+}
+
+
+def _palette():
+    """Black → purple → red → yellow → white, close to sox's default colours."""
+    stops = [(0.0, (0, 0, 0)), (0.25, (70, 0, 110)), (0.5, (200, 0, 60)),
+             (0.75, (255, 160, 0)), (1.0, (255, 255, 255))]
+    palette = []
+    for i in range(256):
+        x = i / 255.0
+        for (x0, c0), (x1, c1) in zip(stops, stops[1:]):
+            if x <= x1:
+                t = (x - x0) / (x1 - x0)
+                palette.extend(int(a + (b - a) * t) for a, b in zip(c0, c1))
+                break
+    return palette
+
+
+_PALETTE = _palette()
+
+
+def normalize_options(options):
+    """Merge caller options over the defaults and sanity-check them."""
+    opts = dict(DEFAULT_OPTIONS)
+    for key, value in (options or {}).items():
+        if key in opts and value is not None:
+            opts[key] = value
+    if opts["window"] not in _WINDOWS:
+        raise ValueError(f"Unknown window '{opts['window']}' (choose from {', '.join(_WINDOWS)})")
+    n_fft = int(opts["n_fft"])
+    if n_fft < 16 or n_fft > 65536 or n_fft & (n_fft - 1):
+        raise ValueError("n_fft must be a power of two between 16 and 65536")
+    opts["n_fft"] = n_fft
+    # More than 8x window overlap adds no detail to the image, only FFTs
+    opts["hop"] = max(n_fft // 8, min(int(opts["hop"]), n_fft))
+    opts["max_columns"] = max(1, int(opts["max_columns"]))
+    opts["fmin"] = float(opts["fmin"] or 0.0)
+    opts["fmax"] = float(opts["fmax"]) if opts["fmax"] is not None else None
+    opts["log_scale"] = bool(opts["log_scale"])
+    return opts
+
+
+def iter_wav_chunks(wav_path, chunk_frames=CHUNK_FRAMES):
+    """Yield (sample_rate, total_frames) once, then mono float32 sample chunks."""
+    with wave.open(wav_path, "rb") as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        if width not in WAV_SAMPLE_WIDTHS:
+            raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+        yield w.getframerate(), w.getnframes()
+        dtype = {1: np.uint8, 2: "<i2", 4: "<i4"}.get(width)
+        scale = float(1 << (8 * width - 1))
+        while True:
+            raw = w.readframes(chunk_frames)
+            if not raw:
+                break
+            if width == 3:
+                # 24-bit PCM: widen each little-endian triple into the top of an int32
+                padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+                padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+                samples = (padded.view("<i4").ravel() >> 8).astype(np.float32)
+            else:
+                samples = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+            if width == 1:
+                samples -= 128.0
+            samples = samples.reshape(-1, channels).mean(axis=1) / scale
+            yield samples
+
+
+def compute_spectrogram(chunks, sample_rate, total_frames, options=None):
+    """Streaming STFT over sample chunks.
+
+    Frames are max-pooled in time so the output never exceeds max_columns,
+    and transformed STFT_BATCH_SAMPLES at a time, so memory stays bounded
+    for hour-long recordings and any n_fft / hop combination. Returns
+    (magnitude[bins, columns] as float32 in dB or linear, frequency axis,
+    seconds per column).
+    """
+    opts = normalize_options(options)
+    n_fft, hop = opts["n_fft"], opts["hop"]
+    window = _WINDOWS[opts["window"]](n_fft).astype(np.float32)
+
+    freqs = np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+    fmax = opts["fmax"] if opts["fmax"] is not None else sample_rate / 2.0
+    band = np.nonzero((freqs >= opts["fmin"]) & (freqs <= fmax))[0]
+    if band.size == 0:
+        raise ValueError("Requested frequency range is empty")
+    lo, hi = band[0], band[-1] + 1
+
+    total_stft_frames = max(1, 1 + (max(total_frames, n_fft) - n_fft) // hop)
+    pool = max(1, math.ceil(total_stft_frames / opts["max_columns"]))
+    batch = max(1, STFT_BATCH_SAMPLES // n_fft)
+
+    columns = []
+    pending = None  # partially filled pooling group
+    pending_count = 0
+    carry = np.zeros(0, dtype=np.float32)
+
+    for chunk in chunks:
+        buf = np.concatenate([carry, chunk]) if carry.size else chunk
+        n_frames = 0 if buf.size < n_fft else 1 + (buf.size - n_fft) // hop
+        if n_frames:
+            # A strided view: frames share the chunk's memory until a batch is windowed
+            frames = np.lib.stride_tricks.sliding_window_view(buf, n_fft)[::hop][:n_frames]
+            for first in range(0, n_frames, batch):
+                mags = np.abs(np.fft.rfft(frames[first:first + batch] * window, axis=1))[:, lo:hi].astype(np.float32)
+                start = 0
+                while start < len(mags):
+                    take = min(pool - pending_count, len(mags) - start)
+                    group = mags[start:start + take].max(axis=0)
+                    pending = group if pending is None else np.maximum(pending, group)
+                    pending_count += take
+                    start += take
+                    if pending_count == pool:
+                        columns.append(pending)
+                        pending, pending_count = None, 0
+        carry = buf[n_frames * hop:].copy() if n_frames else buf.copy()
+
+    if pending is not None:
+        columns.append(pending)
+    if not columns:
+        raise ValueError("Audio is shorter than one FFT window")
+
+    magnitude = np.stack(columns, axis=1)
+    if opts["log_scale"]:
+        magnitude = 20.0 * np.log10(magnitude / (n_fft / 2.0) + 1e-12)
+    return magnitude.astype(np.float32), freqs[lo:hi], pool * hop / float(sample_rate)
+
+
+def to_uint8(magnitude, options=None):
+    """Scale magnitudes to 0–255 (dB range for log scale, peak for linear)."""
+    opts = normalize_options(options)
+    if opts["log_scale"]:
+        top = float(magnitude.max())
+        floor = top - float(opts["dynamic_range_db"])
+        scaled = (np.clip(magnitude, floor, top) - floor) / max(top - floor, 1e-9)
+    else:
+        peak = float(magnitude.max()) or 1.0
+        scaled = magnitude / peak
+    return (scaled * 255.0).astype(np.uint8)
+
+
+def render_png(levels):
+    """Palette PNG with low frequencies at the bottom."""
+    img = Image.fromarray(np.ascontiguousarray(levels[::-1]), mode="L")
+    img.putpalette(_PALETTE)  # L → P keeping the 8-bit levels as palette indices
+    out = io.BytesIO()
+    img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def to_tiles(levels, tile_width=TILE_WIDTH):
+    """Split 8-bit magnitudes into column tiles for client-side rendering."""
+    tiles = []
+    for x in range(0, levels.shape[1], tile_width):
+        tile = np.ascontiguousarray(levels[::-1, x:x + tile_width])
+        tiles.append({
+            "x": x,
+            "width": int(tile.shape[1]),
+            "data": base64.b64encode(tile.tobytes()).decode("ascii"),
+        })
+    return tiles
+
+
+def spectrogram_from_wav(wav_path, options=None, output="png"):
+    """Full pipeline: WAV file → {"image"} PNG or {"tiles"} raw magnitude tiles plus axes."""
+    opts = normalize_options(options)
+    chunks = iter_wav_chunks(wav_path)
+    sample_rate, total_frames = next(chunks)
+    magnitude, freqs, seconds_per_column = compute_spectrogram(chunks, sample_rate, total_frames, opts)
+    levels = to_uint8(magnitude, opts)
+    result = {
+        "sample_rate": sample_rate,
+        "duration": round(total_frames / float(sample_rate), 3) if sample_rate else 0,
+        "frequency_range": [round(float(freqs[0]), 1), round(float(freqs[-1]), 1)],
+        "seconds_per_column": round(seconds_per_column, 6),
+        "height": int(levels.shape[0]),
+        "width": int(levels.shape[1]),
+        "options": opts,
+    }
+    if output == "tiles":
+        result["tiles"] = to_tiles(levels)
+    else:
+        result["image"] = base64.b64encode(render_png(levels)).decode("utf-8")
+    return result
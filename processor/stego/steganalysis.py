@@ -0,0 +1,196 @@
+import math
+
+import numpy as np
+
+# Estimated embedding rate above which a channel is reported as suspicious
+SUSPICIOUS_RATE = 0.1
+# Chi-square prefixes evaluated for the sequential-embedding length estimate
+CHI_SQUARE_STEPS = 100
+# Larger images are cropped to this many samples per channel (rows kept whole);
+# the estimators converge long before that
+MAX_SAMPLES = 4 * 1024 * 1024
+# RS pixel group size and flipping mask
+RS_MASK = np.array([0, 1, 1, 0], dtype=bool)
+
+
+def _chi2_sf(x, dof):
+    """Chi-square survival function (Wilson–Hilferty), good enough for p-values at our dof."""
+    if dof <= 0:
+        return 1.0
+    if x <= 0:
+        return 1.0
+    z = ((x / dof) ** (1.0 / 3) - (1 - 2.0 / (9 * dof))) / math.sqrt(2.0 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _pair_chi_square(hist):
+    """Westfeld–Pfitzmann statistic over pairs of values (2k, 2k+1). Returns (chi2, dof)."""
+    even, odd = hist[0::2].astype(np.float64), hist[1::2].astype(np.float64)
+    expected = (even + odd) / 2.0
+    used = expected > 4  # standard chi-square validity rule
+    if not used.any():
+        return 0.0, 0
+    chi2 = float((((even - expected) ** 2)[used] / expected[used]).sum())
+    return chi2, int(used.sum()) - 1
+
+
+def chi_square_attack(samples, steps=CHI_SQUARE_STEPS):
+    """Chi-square attack on one channel.
+
+    LSB replacement evens out the counts of each value pair, so a high
+    p-value means the pairs look "too equal". The p-value is computed over
+    growing prefixes of the scan order; the prefix where it drops gives the
+    length of a sequential (zsteg/stegano-style) message.
+    """
+    samples = samples.reshape(-1)
+    n = samples.size
+    steps = max(1, min(steps, n))
+    bucket = (np.arange(n, dtype=np.int64) * steps) // n
+    hists = np.bincount(bucket * 256 + samples, minlength=steps * 256).reshape(steps, 256)
+    cumulative = np.cumsum(hists, axis=0)
+
+    p_values = []
+    for hist in cumulative:
+        chi2, dof = _pair_chi_square(hist)
+        p_values.append(_chi2_sf(chi2, dof) if dof > 0 else 0.0)
+    leading = 0
+    for p in p_values:
+        if p < 0.5:
+            break
+        leading += 1
+    return {"p_value": round(float(p_values[-1]), 4), "rate": round(leading / float(steps), 3)}
+
+
+def _flip(groups, direction):
+    """F1 swaps 2k<->2k+1, F-1 swaps 2k-1<->2k (values may leave 0..255, which is harmless here)."""
+    if direction > 0:
+        return groups ^ 1
+    return ((groups + 1) ^ 1) - 1
+
+
+def _smoothness(columns):
+    """Discrimination function f: sum of absolute differences between neighbours in a group."""
+    total = np.abs(columns[1] - columns[0])
+    for left, right in zip(columns[1:], columns[2:]):
+        total += np.abs(right - left)
+    return total
+
+
+def _rs_counts(columns, mask):
+    """Fractions of regular and singular groups under F1 and F-1 applied through mask.
+
+    Groups are held as one array per position so flipping only touches the
+    masked positions instead of copying every group.
+    """
+    base = _smoothness(columns)
+    counts = []
+    for direction in (1, -1):
+        flipped = [_flip(col, direction) if m else col for col, m in zip(columns, mask)]
+        after = _smoothness(flipped)
+        counts.append((np.count_nonzero(after > base) / base.size,
+                       np.count_nonzero(after < base) / base.size))
+    return counts  # [(R_M, S_M), (R_-M, S_-M)]
+
+
+def rs_analysis(channel, mask=RS_MASK):
+    """RS steganalysis (Fridrich et al.) on a 2-D channel; returns the estimated rate of LSB changes."""
+    size = mask.size
+    height, width = channel.shape
+    width -= width % size
+    if width == 0 or height == 0:
+        return None
+    groups = channel[:, :width].astype(np.int16).reshape(-1, size)
+    columns = [np.ascontiguousarray(groups[:, i]) for i in range(size)]
+    (r_m, s_m), (r_nm, s_nm) = _rs_counts(columns, mask)
+    (r_m1, s_m1), (r_nm1, s_nm1) = _rs_counts([col ^ 1 for col in columns], mask)
+
+    d0, d1 = r_m - s_m, r_m1 - s_m1
+    dn0, dn1 = r_nm - s_nm, r_nm1 - s_nm1
+    a = 2.0 * (d1 + d0)
+    b = dn0 - dn1 - d1 - 3.0 * d0
+    c = d0 - dn0
+    if abs(a) < 1e-12:
+        if abs(b) < 1e-12:
+            return None
+        x = -c / b
+    else:
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            return None
+        roots = [(-b + math.sqrt(disc)) / (2 * a), (-b - math.sqrt(disc)) / (2 * a)]
+        x = min(roots, key=abs)
+    if abs(x - 0.5) < 1e-12:
+        return None
+    return x / (x - 0.5)
+
+
+def sample_pair_analysis(channel):
+    """Sample pair analysis (Dumitrescu, Wu, Wang) on horizontal and vertical neighbours."""
+    channel = channel.astype(np.int16)
+    u = np.concatenate([channel[:, :-1].reshape(-1), channel[:-1, :].reshape(-1)])
+    v = np.concatenate([channel[:, 1:].reshape(-1), channel[1:, :].reshape(-1)])
+    pairs = u.size
+    if pairs == 0:
+        return None
+    v_even = (v & 1) == 0
+    x = int(np.count_nonzero((v_even & (u < v)) | (~v_even & (u > v))))
+    y = int(np.count_nonzero((v_even & (u > v)) | (~v_even & (u < v))))
+    k = int(np.count_nonzero((u >> 1) == (v >> 1)))
+    if k == 0:
+        return None
+    # Solve for beta, the fraction of samples whose LSB was flipped (half the embedding rate)
+    a, b, c = 2.0 * k, 2.0 * (2 * x - pairs), float(y - x)
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    beta = min((-b + math.sqrt(disc)) / (2 * a), (-b - math.sqrt(disc)) / (2 * a))
+    return 2.0 * beta
+
+
+def _clamp_rate(rate):
+    return None if rate is None else round(min(max(float(rate), 0.0), 1.0), 3)
+
+
+def analyse_pixels(pixels, channels, max_samples=MAX_SAMPLES):
+    """Run all three detectors per colour channel of an HxWxC uint8 array.
+
+    Alpha is skipped: it is usually constant and says nothing about LSB use.
+    The channel rate comes from RS and SPA, which are quantitative; smooth
+    covers often have naturally even value pairs, so the chi-square length is
+    reported alongside but only used when neither of the others converges.
+    """
+    height, width = pixels.shape[:2]
+    if height * width > max_samples:
+        pixels = pixels[:max(2, max_samples // width)]
+    report = {}
+    for c, name in enumerate(channels):
+        if name == "a":
+            continue
+        channel = pixels[:, :, c]
+        chi = chi_square_attack(channel)
+        report[name] = {
+            "chi_square": chi,
+            "rs": _clamp_rate(rs_analysis(channel)),
+            "spa": _clamp_rate(sample_pair_analysis(channel)),
+        }
+        rates = [report[name][k] for k in ("rs", "spa") if report[name][k] is not None]
+        report[name]["rate"] = max(rates) if rates else chi["rate"]
+    estimate = max((entry["rate"] for entry in report.values()), default=0.0)
+    return {
+        "channels": report,
+        "estimated_rate": estimate,
+        "suspicious": estimate >= SUSPICIOUS_RATE,
+    }
+
+
+def format_report(report):
+    """Text table for the UI, one line per channel."""
+    lines = ["channel  chi2-p   chi2-len  RS      SPA"]
+    for name, entry in report["channels"].items():
+        rs = "n/a" if entry["rs"] is None else f"{entry['rs']:.3f}"
+        spa = "n/a" if entry["spa"] is None else f"{entry['spa']:.3f}"
+        lines.append(f"{name:<8} {entry['chi_square']['p_value']:<8.4f} "
+                     f"{entry['chi_square']['rate']:<9.3f} {rs:<7} {spa}")
+    verdict = "SUSPICIOUS" if report["suspicious"] else "clean"
+    lines.append(f"Estimated embedding rate: {report['estimated_rate']:.3f} ({verdict})")
+    return "\n".join(lines)
@@ -0,0 +1,147 @@
+import os
+import math
+import time
+import shutil
+import threading
+import subprocess
+
+from stego.scheduler import _cpu_quota, cancel_event, report_progress
+from stego.workspace import scratch_path
+from stego.wordlists import candidates
+from stego.artifacts import save_artifact
+
+# steghide attempts are short CPU bursts, so run a couple per CPU
+STEGHIDE_CRACK_WORKERS = int(os.environ.get("STEGHIDE_CRACK_WORKERS", max(2, math.ceil(_cpu_quota()) * 2)))
+# Wall-clock budget for one whole dictionary run
+STEGHIDE_CRACK_TIMEOUT = int(os.environ.get("STEGHIDE_CRACK_TIMEOUT", 300))
+STEGHIDE_ATTEMPT_TIMEOUT = 10
+# Seconds between throughput progress events
+PROGRESS_INTERVAL = 1.0
+# Optional extra wordlist (name or path) tried after the built-in passwords
+STEGHIDE_WORDLIST = os.environ.get("STEGHIDE_WORDLIST")
+
+# Built-in list tried before any extra wordlists (see stego.wordlists)
+STEGHIDE_BASE_WORDLISTS = ["common"]
+
+
+def iter_candidates(wordlists=None):
+    """Built-in passwords first, then each extra wordlist (name or path), skipping repeats.
+
+    Yields raw bytes: they go to steghide's argv unchanged, so non-UTF-8
+    entries (rockyou has plenty) are tried exactly as written.
+    """
+    return candidates(STEGHIDE_BASE_WORDLISTS + list(wordlists or []), decode=None)
+
+
+def decode_extracted(raw_data):
+    """Show extracted bytes as text where possible, like the stegseek path."""
+    try:
+        return raw_data.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw_data.decode("latin-1")
+
+
+def try_password(image_path, password, out_path, timeout=STEGHIDE_ATTEMPT_TIMEOUT):
+    """One steghide extract attempt; returns the extracted bytes or None.
+
+    The password goes in as an argv entry (no shell), and every worker writes
+    to its own out_path, so concurrent attempts and requests never collide.
+    """
+    cmd = ["steghide", "extract", "-sf", image_path, "-p", password, "-xf", out_path, "-f", "-q"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode != 0 or not os.path.exists(out_path):
+        return None
+    try:
+        with open(out_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(out_path)
+
+
+def crack_parallel(image_path, candidates, workspace=None, workers=STEGHIDE_CRACK_WORKERS,
+                   timeout=STEGHIDE_CRACK_TIMEOUT):
+    """Try candidate passwords across `workers` concurrent steghide processes.
+
+    candidates may be any iterable (e.g. a wordlist streamed from disk); it is
+    consumed lazily under a lock, and all workers stop as soon as one finds
+    the password, the time budget runs out or the run is cancelled. Returns
+    the result dict used by crack_steghide_password, plus attempts and
+    passwords_per_second.
+    """
+    if not shutil.which("steghide"):
+        return "Steghide tool is not installed or not available in PATH"
+
+    candidates = iter(candidates)
+    feed_lock = threading.Lock()
+    found = threading.Event()
+    deadline = time.monotonic() + timeout
+    state = {"attempts": 0, "password": None, "data": None, "timed_out": False}
+    # Our worker threads are not scheduler threads, so capture the run's cancel flag here
+    cancel = cancel_event()
+
+    def worker(index):
+        out_path = scratch_path(workspace, f"steghide_out_{index}.bin")
+        while not found.is_set():
+            if cancel is not None and cancel.is_set():
+                return
+            if time.monotonic() > deadline:
+                state["timed_out"] = True
+                return
+            with feed_lock:
+                password = next(candidates, None)
+            if password is None:
+                return
+            data = try_password(image_path, password, out_path)
+            with feed_lock:
+                state["attempts"] += 1
+                if data is not None and not found.is_set():
+                    state["password"], state["data"] = password, data
+                    found.set()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    # Report throughput from the scheduler thread while the workers run
+    last_report = started
+    while any(thread.is_alive() for thread in threads):
+        found.wait(0.25)
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            report_progress(attempts=state["attempts"], elapsed=round(now - started, 1),
+                            candidates_per_second=int(state["attempts"] / (now - started)))
+    for thread in threads:
+        thread.join()
+    elapsed = max(time.monotonic() - started, 1e-6)
+    rate = round(state["attempts"] / elapsed, 1)
+    stats = {"attempts": state["attempts"], "passwords_per_second": rate, "workers": len(threads)}
+
+    if found.is_set():
+        password = state["password"]
+        if isinstance(password, bytes):
+            password = password.decode("utf-8", "replace")
+        extracted_data = decode_extracted(state["data"])
+        return {
+            "password_found": True,
+            "password": password,
+            "extracted_data": extracted_data[:500] + "..." if len(extracted_data) > 500 else extracted_data,
+            "artifact": save_artifact(state["data"], "steghide_extracted.bin"),
+            "message": f"Password cracked! Found password: '{password}'",
+            **stats,
+        }
+    message = "Password cracking completed. No password found in dictionary."
+    if cancel is not None and cancel.is_set():
+        message = f"Password cracking cancelled after {state['attempts']} candidates."
+    elif state["timed_out"]:
+        message = f"Password cracking stopped after {timeout}s. No password found in the first {state['attempts']} candidates."
+    return {
+        "password_found": False,
+        "password": None,
+        "extracted_data": None,
+        "message": message + f" ({state['attempts']} tried at {rate}/s)",
+        **stats,
+    }
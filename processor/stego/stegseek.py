@@ -0,0 +1,118 @@
+import os
+import re
+import time
+import queue
+import signal
+import threading
+import subprocess
+
+from stego.scheduler import report_progress, cancelled
+
+STEGSEEK_TIMEOUT = int(os.environ.get("STEGSEEK_TIMEOUT", 300))
+# Seconds between progress events
+PROGRESS_INTERVAL = 1.0
+# Lines in the rockyou.txt stegseek ships with, for the candidates/s estimate
+ROCKYOU_LINES = 14344392
+
+PROGRESS_RE = re.compile(r"Progress:\s*([\d.]+)%(?:\s*\(([\d.]+)\s*([KMG]?B)\))?")
+PASSPHRASE_RE = re.compile(r'Found passphrase:\s*"(.*)"')
+
+
+def _read_lines(stream, lines):
+    """Split the child's output on \\r as well as \\n, since progress redraws one line."""
+    pending = b""
+    while True:
+        chunk = os.read(stream.fileno(), 4096)
+        if not chunk:
+            break
+        pending += chunk
+        parts = re.split(rb"[\r\n]", pending)
+        pending = parts.pop()
+        for part in parts:
+            if part.strip():
+                lines.put(part.decode("utf-8", "replace"))
+    if pending.strip():
+        lines.put(pending.decode("utf-8", "replace"))
+    lines.put(None)
+
+
+def _kill(proc):
+    """Kill stegseek and all of its threads/children (it runs in its own session)."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.wait()
+
+
+def run_stegseek(image_path, out_path, wordlist=None, timeout=STEGSEEK_TIMEOUT, total_candidates=ROCKYOU_LINES):
+    """Run stegseek as a streamed subprocess.
+
+    Progress lines become report_progress() events (percent, candidates/s)
+    while the crack runs; the process group is killed when the run is
+    cancelled or the timeout expires. Returns {"status": "done" | "timeout" |
+    "cancelled", "returncode", "output" (non-progress lines), "password",
+    "progress", "elapsed"}.
+    """
+    cmd = ["stegseek", image_path] + ([wordlist] if wordlist else []) + [out_path]
+    if wordlist:
+        total_candidates = None
+    print(f"[DEBUG] Running StegSeek: {' '.join(cmd)}")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            stdin=subprocess.DEVNULL, start_new_session=True)
+    lines = queue.Queue()
+    reader = threading.Thread(target=_read_lines, args=(proc.stdout, lines), daemon=True)
+    reader.start()
+
+    started = time.monotonic()
+    last_report = 0.0
+    percent = 0.0
+    output = []
+    password = None
+    status = "done"
+    while True:
+        try:
+            line = lines.get(timeout=0.5)
+        except queue.Empty:
+            line = ""
+        elapsed = time.monotonic() - started
+        if cancelled():
+            status = "cancelled"
+        elif elapsed > timeout:
+            status = "timeout"
+        if status != "done":
+            _kill(proc)
+            break
+        if line is None:
+            break
+        if not line:
+            continue
+
+        match = PROGRESS_RE.search(line)
+        if match:
+            percent = float(match.group(1))
+            if elapsed - last_report >= PROGRESS_INTERVAL:
+                last_report = elapsed
+                info = {"percent": round(percent, 2), "elapsed": round(elapsed, 1)}
+                if total_candidates and elapsed > 0:
+                    info["candidates_per_second"] = int(percent / 100.0 * total_candidates / elapsed)
+                if match.group(2):
+                    info["scanned"] = f"{match.group(2)} {match.group(3)}"
+                report_progress(**info)
+            continue
+        found = PASSPHRASE_RE.search(line)
+        if found:
+            password = found.group(1)
+        output.append(line)
+
+    returncode = proc.wait()
+    reader.join(timeout=1)
+    proc.stdout.close()
+    return {
+        "status": status,
+        "returncode": returncode,
+        "output": "\n".join(output),
+        "password": password,
+        "progress": percent,
+        "elapsed": round(time.monotonic() - started, 1),
+    }
@@ -0,0 +1,187 @@
+import os
+import re
+
+import numpy as np
+
+from stego.patterns import FLAG_RE
+
+# Shortest run reported (same as the old `strings -n 8`)
+STRINGS_MIN_LENGTH = int(os.environ.get("STRINGS_MIN_LENGTH", 8))
+# Strings included in the /process result; the rest are paged through /strings
+STRINGS_TOP_N = int(os.environ.get("STRINGS_TOP_N", 200))
+# Longer strings are cut in results (the full text stays in the workspace list)
+STRINGS_MAX_TEXT = 500
+# Bytes handled per vectorised block, so big files never need full-size masks
+_BLOCK = 8 * 1024 * 1024
+
+ENCODINGS = ("ascii", "utf-16le", "utf-16be")
+
+URL_RE = re.compile(r"\b(?:https?|ftp)://[^\s\"'<>]{4,}", re.I)
+EMAIL_RE = re.compile(r"\b[\w.+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b")
+BASE64_RE = re.compile(r"(?<![A-Za-z0-9+/])(?=[A-Za-z0-9+/]*[0-9+/])[A-Za-z0-9+/]{20,}={0,2}(?![A-Za-z0-9+/=])")
+HEX_RE = re.compile(r"\b[0-9a-fA-F]{32,}\b")
+KEY_RE = re.compile(r"-----BEGIN [A-Z ]+-----|\b(?:password|passwd|secret|api[_-]?key|token|private[_ ]key|flag)\b", re.I)
+
+# (tag, pattern, score)
+INTEREST_RULES = [
+    ("flag", FLAG_RE, 100),
+    ("key", KEY_RE, 40),
+    ("url", URL_RE, 30),
+    ("base64", BASE64_RE, 20),
+    ("hex", HEX_RE, 15),
+    ("email", EMAIL_RE, 10),
+]
+
+
+def _runs(mask, carry, base, min_len, final):
+    """Runs of True in one block's mask as (start, end) in stream coordinates.
+
+    carry is the start of a run left open by the previous block (or None);
+    returns (runs of at least min_len, new carry).
+    """
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    runs = []
+    if carry is not None:
+        if len(starts) and starts[0] == 0:
+            # The open run continues into this block
+            first_end = ends[0]
+            starts, ends = starts[1:], ends[1:]
+            if first_end < len(mask) or final:
+                if base + first_end - carry >= min_len:
+                    runs.append((carry, int(base + first_end)))
+                carry = None
+        else:
+            if base - carry >= min_len:
+                runs.append((carry, base))
+            carry = None
+    if carry is None and len(starts) and ends[-1] == len(mask) and not final:
+        carry = int(base + starts[-1])
+        starts, ends = starts[:-1], ends[:-1]
+    keep = (ends - starts) >= min_len
+    runs.extend(zip((starts[keep] + base).tolist(), (ends[keep] + base).tolist()))
+    return runs, carry
+
+
+def _scan_runs(buf, min_len):
+    """Byte ranges of ASCII, UTF-16LE and UTF-16BE runs, as {encoding: [(start, end)]}.
+
+    One pass over the buffer in blocks: each block gets a printable mask
+    and a zero mask, from which the three encodings (two alignments for
+    UTF-16) are read off without another pass over the data.
+    """
+    size = len(buf)
+    found = {encoding: [] for encoding in ENCODINGS}
+    # stream name -> (encoding, byte step, alignment)
+    streams = {"ascii": ("ascii", 1, 0), "le0": ("utf-16le", 2, 0), "le1": ("utf-16le", 2, 1),
+               "be0": ("utf-16be", 2, 0), "be1": ("utf-16be", 2, 1)}
+    carries = {name: None for name in streams}
+    for offset in range(0, size, _BLOCK):
+        stop = min(offset + _BLOCK, size)
+        final = stop == size
+        # One byte of lookahead so a UTF-16 unit at the block end sees its second byte
+        block = np.frombuffer(buf, dtype=np.uint8, count=min(stop + 1, size) - offset, offset=offset)
+        printable = ((block >= 0x20) & (block <= 0x7E)) | (block == 0x09)
+        zero = block == 0
+        n = stop - offset
+        ascii_run, carries["ascii"] = _runs(printable[:n], carries["ascii"], offset, min_len, final)
+        found["ascii"].extend(ascii_run)
+        units = len(block) - 1
+        le_units = printable[:units] & zero[1:units + 1]
+        be_units = zero[:units] & printable[1:units + 1]
+        for name, units_mask in (("le", le_units), ("be", be_units)):
+            for align in (0, 1):
+                stream = f"{name}{align}"
+                mask = units_mask[align:n:2]
+                # Stream coordinates count UTF-16 units from the start of the file
+                runs, carries[stream] = _runs(mask, carries[stream], (offset + align) // 2, min_len, final)
+                encoding = streams[stream][0]
+                found[encoding].extend((2 * s + align, 2 * e + align) for s, e in runs)
+    return found
+
+
+def _drop_shadows(le_runs, be_runs):
+    """UTF-16 text next to a NUL also reads as the other byte order one byte over.
+
+    Of two runs one byte apart keep the longer; a tie goes to little-endian,
+    by far the more common.
+    """
+    le_by_start = {s: e - s for s, e in le_runs}
+    be_by_start = {s: e - s for s, e in be_runs}
+    le_keep = [(s, e) for s, e in le_runs
+               if not any(be_by_start.get(s + d, 0) > e - s for d in (-1, 1))]
+    be_keep = [(s, e) for s, e in be_runs
+               if not any(le_by_start.get(s + d, 0) >= e - s for d in (-1, 1))]
+    return le_keep, be_keep
+
+
+def score_string(text):
+    """Interest score and the tags that earned it."""
+    score = 0
+    tags = []
+    for tag, pattern, points in INTEREST_RULES:
+        if pattern.search(text):
+            score += points
+            tags.append(tag)
+    return score, tags
+
+
+def extract_strings(buf, min_len=STRINGS_MIN_LENGTH):
+    """Every string in buf as dicts {offset, encoding, text, score, tags}, in file order."""
+    found = _scan_runs(buf, max(1, min_len))
+    found["utf-16le"], found["utf-16be"] = _drop_shadows(found["utf-16le"], found["utf-16be"])
+    strings = []
+    for encoding, runs in found.items():
+        codec = "latin-1" if encoding == "ascii" else encoding
+        for start, end in runs:
+            text = bytes(buf[start:end]).decode(codec, "replace")
+            score, tags = score_string(text)
+            strings.append({"offset": start, "encoding": encoding, "text": text, "score": score, "tags": tags})
+    strings.sort(key=lambda s: s["offset"])
+    return strings
+
+
+def rank(strings):
+    """Most interesting first; file order breaks ties."""
+    return sorted(strings, key=lambda s: (-s["score"], s["offset"]))
+
+
+def page(strings, offset=0, limit=STRINGS_TOP_N, order="interest", encoding=None, query=None):
+    """One page of strings: optional encoding/substring filters, interest or file order."""
+    selected = [s for s in strings
+                if (not encoding or s["encoding"] == encoding)
+                and (not query or query.lower() in s["text"].lower())]
+    if order == "interest":
+        selected = rank(selected)
+    items = [dict(s, text=s["text"][:STRINGS_MAX_TEXT]) for s in selected[offset:offset + limit]]
+    return {"total": len(selected), "offset": offset, "limit": limit, "strings": items}
+
+
+def write_list(strings, path):
+    """Full list as offset<TAB>encoding<TAB>text lines (text escaped to one line)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for s in strings:
+            text = s["text"].encode("unicode_escape").decode("ascii")
+            f.write(f"{s['offset']:#010x}\t{s['encoding']}\t{text}\n")
+
+
+def read_list(path):
+    """Entries ({"offset", "encoding", "text"}) of a list written by write_list, in file order."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            offset, encoding, text = line.rstrip("\n").split("\t", 2)
+            yield {"offset": int(offset, 16), "encoding": encoding,
+                   "text": text.encode("ascii").decode("unicode_escape")}
+
+
+def load_list(path, min_len=STRINGS_MIN_LENGTH):
+    """The strings of a stored list at least min_len long, scored as extract_strings scores them."""
+    strings = []
+    for s in read_list(path):
+        if len(s["text"]) >= min_len:
+            s["score"], s["tags"] = score_string(s["text"])
+            strings.append(s)
+    return strings
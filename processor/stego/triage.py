@@ -0,0 +1,129 @@
+import os
+import re
+
+from stego.carving import host_size
+from stego.patterns import FLAG_RE
+
+# Slow tools that only run in triage mode when the cheap tools found something
+HEAVY_TOOLS = {
+    "steghide_crack": "wordlist attack, up to 300 s",
+    "stegoveritas": "full transform sweep, up to 180 s",
+}
+
+# Evidence score at which the heavy tools are scheduled
+TRIAGE_THRESHOLD = float(os.environ.get("TRIAGE_THRESHOLD", 2))
+
+ZSTEG_HIT_RE = re.compile(r"\.\.\s+(file|text):\s*(.*)")
+# zsteg's most common false positives on clean images
+ZSTEG_NOISE = ("file: data", "file: Matlab v4", "file: AIX core", "file: OpenPGP", "file: PGP")
+STEGDETECT_HIT_RE = re.compile(r"(jphide|outguess|jsteg|invisible|f5|appendix|camouflage)\(", re.I)
+EXIF_FIELDS_RE = re.compile(r"^(Comment|User Comment|XP Comment|Warning)\s*:\s*(.+)$", re.M)
+
+# End-of-image markers for spotting data appended after the image
+_TRAILER_MARKERS = {
+    ".png": b"IEND\xaeB`\x82",
+    ".jpg": b"\xff\xd9",
+    ".jpeg": b"\xff\xd9",
+    ".gif": b"\x00;",
+}
+
+
+def trailing_bytes(data, extension):
+    """Bytes after the format's end-of-image marker (0 if none or unknown format)."""
+    marker = _TRAILER_MARKERS.get((extension or "").lower())
+    if marker is None:
+        return 0
+    end = data.rfind(marker)
+    if end < 0:
+        return 0
+    return len(data) - (end + len(marker))
+
+
+def _text(result):
+    if isinstance(result, dict):
+        return "\n".join(str(result.get(key) or "") for key in ("message", "data", "summary"))
+    return result if isinstance(result, str) else ""
+
+
+def score_evidence(results, data=None, extension=""):
+    """Score what the cheap tools found. Returns (score, reasons).
+
+    Each reason is a short human-readable string; the weights favour signals
+    that rarely fire on clean images (flags, appended data, detector hits).
+    """
+    score = 0.0
+    reasons = []
+
+    def add(points, reason):
+        nonlocal score
+        score += points
+        reasons.append(reason)
+
+    analysis = results.get("steganalysis")
+    if isinstance(analysis, dict) and analysis.get("suspicious"):
+        add(3, f"steganalysis estimates {analysis['estimated_rate']:.0%} LSB embedding")
+
+    lsb = results.get("lsb_scan")
+    if isinstance(lsb, dict) and lsb.get("found"):
+        kinds = {hit["kind"] for hit in lsb.get("hits", [])}
+        if kinds & {"flag", "file"}:
+            add(3, "lsb_scan found " + " and ".join(sorted(kinds & {"flag", "file"})))
+        elif kinds:
+            add(1, "lsb_scan found readable text")
+
+    zsteg = _text(results.get("zsteg"))
+    zsteg_hits = [m.group(0) for m in ZSTEG_HIT_RE.finditer(zsteg)
+                  if not any(noise in m.group(0) for noise in ZSTEG_NOISE)
+                  and (m.group(1) == "file" or len(re.findall(r"\w", m.group(2))) >= 8)]
+    if zsteg_hits:
+        add(2, f"zsteg reported {len(zsteg_hits)} payload(s)")
+
+    for tool in ("strings", "exiftool", "zsteg"):
+        if FLAG_RE.search(_text(results.get(tool))):
+            add(3, f"flag-like string in {tool} output")
+
+    # Signatures inside the host's own extent (EXIF thumbnails, ICC profiles) are not embedded files
+    host_end = (host_size(data) if data is not None else None) or 1
+    carved = results.get("carve")
+    if isinstance(carved, dict):
+        embedded = [hit for hit in carved.get("signatures", []) if hit["offset"] >= host_end]
+        if embedded:
+            add(2, f"carve found {len(embedded)} embedded file(s)")
+    else:
+        binwalk = _text(results.get("binwalk"))
+        offsets = [int(m.group(1)) for m in re.finditer(r"^(\d+)\s+0x[0-9A-Fa-f]+\s", binwalk, re.M)]
+        embedded = [offset for offset in offsets if offset >= host_end]
+        if embedded:
+            add(2, f"binwalk found {len(embedded)} embedded signatures")
+
+    foremost = _text(results.get("foremost"))
+    carved = [line for line in foremost.splitlines()
+              if "foremost_out/" in line and not line.endswith("audit.txt") and "." in os.path.basename(line)]
+    if len(carved) > 1:
+        add(2, f"foremost carved {len(carved)} files")
+
+    exif = _text(results.get("exiftool"))
+    for field, value in EXIF_FIELDS_RE.findall(exif):
+        if field == "Warning" and "trailer" not in value.lower():
+            continue
+        add(1, f"exiftool {field}: {value.strip()[:60]}")
+
+    if STEGDETECT_HIT_RE.search(_text(results.get("stegdetect"))):
+        add(3, "stegdetect signature match")
+    jsteg = results.get("jsteg")
+    if isinstance(jsteg, dict) and jsteg.get("found"):
+        add(3, "jsteg found hidden data")
+
+    if data is not None:
+        extra = trailing_bytes(data, extension)
+        if extra > 16:
+            add(2, f"{extra} bytes appended after end of image")
+
+    return score, reasons
+
+
+def skip_message(tool, reasons):
+    """Result placed in the report for a heavy tool triage decided not to run."""
+    why = "; ".join(reasons) if reasons else "no cheap tool found any evidence"
+    return (f"Skipped in triage mode ({HEAVY_TOOLS.get(tool, 'slow tool')}): "
+            f"evidence below threshold - {why}. Re-run with mode \"full\" to force it.")
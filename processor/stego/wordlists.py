@@ -0,0 +1,220 @@
+import os
+import mmap
+import threading
+
+import numpy as np
+
+# Lists shipped with the processor, then system/user lists (rockyou usually lives in /usr/share/wordlists)
+BUILTIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wordlists")
+WORDLIST_DIRS = [BUILTIN_DIR] + [d for d in os.environ.get("WORDLIST_DIR", "/usr/share/wordlists").split(os.pathsep) if d]
+# Offset indexes are built once per file version and reused (memory-mapped) afterwards
+WORDLIST_INDEX_DIR = os.environ.get("WORDLIST_INDEX_DIR", "/tmp/cicaado_wordlists")
+# Lists up to this many lines are deduplicated while indexing; bigger ones are taken as-is
+WORDLIST_DEDUP_MAX = int(os.environ.get("WORDLIST_DEDUP_MAX", 2000000))
+
+# Lower runs first when several lists are combined; unknown lists sit in the middle
+PRIORITIES = {
+    "common": 10,
+    "jwt-secrets": 10,
+    "ctf": 20,
+    "rockyou": 90,
+}
+DEFAULT_PRIORITY = 50
+
+_SCAN_BLOCK = 16 * 1024 * 1024
+
+
+def _line_starts(buf, size):
+    """Offsets of every line start, scanning in blocks so a big list never needs a full-size temp array."""
+    starts = [np.zeros(1, dtype=np.int64)]
+    for offset in range(0, size, _SCAN_BLOCK):
+        block = np.frombuffer(buf, dtype=np.uint8, count=min(_SCAN_BLOCK, size - offset), offset=offset)
+        starts.append(np.flatnonzero(block == 0x0A).astype(np.int64) + offset + 1)
+    starts = np.concatenate(starts)
+    return starts[starts < size]
+
+
+class Wordlist:
+    """A newline-separated wordlist on disk, memory-mapped, with an offset index.
+
+    The index holds the start offset of every (deduplicated) entry as
+    uint32/uint64, so entry i is a slice of the mapping: nothing is copied
+    per request, and workers can take disjoint ranges with shards().
+    """
+
+    def __init__(self, name, path, priority=None):
+        self.name = name
+        self.path = path
+        self.priority = PRIORITIES.get(name, DEFAULT_PRIORITY) if priority is None else priority
+        st = os.stat(path)
+        self.size = st.st_size
+        self._mtime = int(st.st_mtime)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.index = self._load_index()
+
+    def _index_path(self):
+        stem = f"{self.name}-{self.size}-{self._mtime}.npy"
+        return os.path.join(WORDLIST_INDEX_DIR, stem)
+
+    def _load_index(self):
+        if not self.size:
+            return np.zeros(0, dtype=np.uint32)
+        index_path = self._index_path()
+        if os.path.exists(index_path):
+            try:
+                return np.load(index_path, mmap_mode="r")
+            except Exception as e:
+                print(f"[ERROR] Wordlist index {index_path} unreadable, rebuilding: {e}")
+        index = self._build_index()
+        try:
+            os.makedirs(WORDLIST_INDEX_DIR, exist_ok=True)
+            tmp_path = f"{index_path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, index)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"[ERROR] Could not persist wordlist index: {e}")
+        return index
+
+    def _build_index(self):
+        starts = _line_starts(self._map, self.size)
+        if len(starts) <= WORDLIST_DEDUP_MAX:
+            seen = set()
+            keep = []
+            for i, start in enumerate(starts.tolist()):
+                word = self._entry_at(start)
+                if word not in seen:
+                    seen.add(word)
+                    keep.append(i)
+            starts = starts[keep]
+        dtype = np.uint32 if self.size < 2 ** 32 else np.uint64
+        print(f"[DEBUG] Indexed wordlist {self.name}: {len(starts)} entries")
+        return starts.astype(dtype)
+
+    def _entry_at(self, start):
+        end = self._map.find(b"\n", start)
+        if end < 0:
+            end = self.size
+        if end > start and self._map[end - 1:end] == b"\r":
+            end -= 1
+        return self._map[start:end]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self._entry_at(int(self.index[i]))
+
+    def iter_range(self, start=0, stop=None):
+        """Entries start..stop as bytes, read straight from the mapping."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield self._entry_at(int(self.index[i]))
+
+    def __iter__(self):
+        return self.iter_range()
+
+    def entries(self, start, stop):
+        """Entries start..stop as a list of bytes.
+
+        When no duplicate was dropped inside the range the whole block is
+        sliced and split in one go, which is far cheaper than per-entry
+        lookups for the big lists the crackers shard.
+        """
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        end = int(self.index[stop]) if stop < len(self) else self.size
+        block = self._map[int(self.index[start]):end]
+        words = block.split(b"\n")
+        if block.endswith(b"\n"):
+            words.pop()
+        if len(words) != stop - start:
+            return list(self.iter_range(start, stop))
+        if b"\r" in block:
+            words = [w[:-1] if w.endswith(b"\r") else w for w in words]
+        return words
+
+    def shards(self, count):
+        """Split the list into `count` contiguous (start, stop) ranges of near-equal size."""
+        count = max(1, count)
+        bounds = np.linspace(0, len(self), count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def info(self):
+        return {"name": self.name, "entries": len(self),
+                "bytes": self.size, "priority": self.priority}
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _find(name):
+    for directory in WORDLIST_DIRS:
+        path = os.path.join(directory, f"{name}.txt")
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def available_wordlists():
+    """Names of every *.txt list in the search directories (first directory wins)."""
+    names = {}
+    for directory in WORDLIST_DIRS:
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.endswith(".txt"):
+                names.setdefault(entry[:-4], os.path.join(directory, entry))
+    return sorted(names, key=lambda n: (PRIORITIES.get(n, DEFAULT_PRIORITY), n))
+
+
+def get_wordlist(name_or_path, priority=None):
+    """Load (once per process) a list by name from the search directories, or by file path.
+
+    Returns None when it cannot be found. A list whose file changed on disk
+    is reopened and re-indexed, and the stale mapping closed.
+    """
+    path = name_or_path if os.sep in name_or_path else _find(name_or_path)
+    if not path or not os.path.isfile(path):
+        return None
+    name = os.path.splitext(os.path.basename(path))[0]
+    with _loaded_lock:
+        stale = _loaded.get(path)
+        if stale is not None:
+            st = os.stat(path)
+            if st.st_size == stale.size and int(st.st_mtime) == stale._mtime:
+                return stale
+        wordlist = Wordlist(name, path, priority)
+        _loaded[path] = wordlist
+        if stale is not None:
+            stale.close()
+        return wordlist
+
+
+def candidates(names, decode="latin-1"):
+    """Stream entries from several lists in priority order, skipping repeats.
+
+    Each list is already deduplicated by its index; across lists, entries of
+    the small lists are remembered so the big ones (rockyou) do not retry
+    them. Yields str (decoded with `decode`) or bytes when decode is None.
+    """
+    lists = [w for w in (get_wordlist(n) for n in names) if w is not None]
+    lists.sort(key=lambda w: w.priority)
+    seen = set()
+    for wordlist in lists:
+        remember = len(wordlist) <= WORDLIST_DEDUP_MAX
+        for word in wordlist:
+            if word in seen:
+                continue
+            if remember:
+                seen.add(word)
+            yield word.decode(decode) if decode else word
@@ -0,0 +1,189 @@
+import os
+import mmap
+import uuid
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# tmpfs keeps the upload and every derived artefact in RAM. Docker gives
+# /dev/shm only 64 MB by default, so big inputs fall back to the regular temp dir.
+WORKSPACE_ROOT = os.environ.get("WORKSPACE_ROOT", "/dev/shm")
+WORKSPACE_SHM_MAX_BYTES = int(os.environ.get("WORKSPACE_SHM_MAX_BYTES", 32 * 1024 * 1024))
+
+
+def _pick_root(size_hint):
+    """Use tmpfs when it exists, is writable and has room for ~4x the input.
+
+    size_hint None means the size is not known up front (a chunked upload),
+    which always goes to disk.
+    """
+    root = WORKSPACE_ROOT
+    if size_hint is None:
+        return tempfile.gettempdir()
+    try:
+        if not os.path.isdir(root) or not os.access(root, os.W_OK):
+            return tempfile.gettempdir()
+        if size_hint and size_hint > WORKSPACE_SHM_MAX_BYTES:
+            return tempfile.gettempdir()
+        st = os.statvfs(root)
+        if st.f_bavail * st.f_frsize < max(size_hint or 0, 1) * 4:
+            return tempfile.gettempdir()
+    except OSError:
+        return tempfile.gettempdir()
+    return root
+
+
+class UploadTooLarge(ValueError):
+    """An input stream went over the size limit it was copied with."""
+
+    def __init__(self, max_bytes):
+        super().__init__(f"File is too large (max {max_bytes} bytes)")
+        self.max_bytes = max_bytes
+
+
+class Workspace:
+    """Per-request directory holding the upload and every artefact derived from it.
+
+    Shared derived files (such as the decoded audio) are produced through
+    once(), so the first caller writes them and everyone else reuses them.
+    Large ones go to disk_dir(). Pure-Python analysers read the upload through
+    map_file(), a shared read-only mmap, instead of reopening the file.
+    """
+
+    def __init__(self, size_hint=0, root=None):
+        self.root = root or _pick_root(size_hint)
+        self.dir = tempfile.mkdtemp(prefix="cicaado_", dir=self.root)
+        self._disk_dir = None
+        self.input_path = None
+        self._mmaps = []
+        self._results = {}
+        self._lock = threading.Lock()
+        self._once_locks = {}
+
+    @classmethod
+    def attach(cls, file_path):
+        """Workspace around an existing file, for helpers called outside /process."""
+        ws = cls(size_hint=0)
+        ws.input_path = file_path
+        return ws
+
+    def add_input(self, data, extension=""):
+        """Write the upload once into the workspace."""
+        self.input_path = os.path.join(self.dir, "input" + (extension or ""))
+        with open(self.input_path, "wb") as f:
+            f.write(data)
+        return self.input_path
+
+    def add_input_stream(self, stream, extension="", hashers=(), chunk_size=1024 * 1024, max_bytes=None):
+        """Copy an upload stream to the input file chunk by chunk, feeding each chunk to hashers.
+
+        Returns the number of bytes written; the upload is never held in memory.
+        Raises UploadTooLarge as soon as more than max_bytes have arrived.
+        """
+        self.input_path = os.path.join(self.dir, "input" + (extension or ""))
+        size = 0
+        with open(self.input_path, "wb") as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                for h in hashers:
+                    h.update(chunk)
+                f.write(chunk)
+        return size
+
+    def map_file(self, path):
+        """Read-only mmap of a file (the upload or an artefact), closed on cleanup."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with self._lock:
+            self._mmaps.append(mapped)
+        return mapped
+
+    def path(self, name):
+        """Unique path inside the workspace for a tool's private output file."""
+        stem, ext = os.path.splitext(name)
+        return os.path.join(self.dir, f"{stem}_{uuid.uuid4().hex[:8]}{ext}")
+
+    def subdir(self, name):
+        """Unique directory inside the workspace for tools that write many files."""
+        path = self.path(name)
+        os.makedirs(path)
+        return path
+
+    def once(self, name, fn):
+        """Run fn() at most once per workspace and hand every caller the same result.
+
+        Concurrent callers block until the first one finishes, so a shared
+        stage (such as the audio decode) never runs twice for one request.
+        """
+        with self._lock:
+            lock = self._once_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._results:
+                self._results[name] = fn()
+            return self._results[name]
+
+    def disk_dir(self):
+        """Directory on disk for derived files too big for tmpfs, removed with the workspace.
+
+        The workspace itself when it is already on disk.
+        """
+        with self._lock:
+            if self._disk_dir is None:
+                disk = tempfile.gettempdir()
+                if os.path.realpath(self.root) == os.path.realpath(disk):
+                    self._disk_dir = self.dir
+                else:
+                    self._disk_dir = tempfile.mkdtemp(prefix="cicaado_", dir=disk)
+            return self._disk_dir
+
+    def directories(self):
+        """Every directory this workspace has created: its own and the disk one, if any."""
+        with self._lock:
+            return [self.dir] + ([self._disk_dir] if self._disk_dir not in (None, self.dir) else [])
+
+    def cleanup(self):
+        for mapped in self._mmaps:
+            try:
+                mapped.close()
+            except (BufferError, ValueError):
+                pass  # a view is still exported; the mapping dies with the process
+        # An attached input lives outside self.dir and is left alone
+        shutil.rmtree(self.dir, ignore_errors=True)
+        if self._disk_dir is not None and self._disk_dir != self.dir:
+            shutil.rmtree(self._disk_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+        return False
+
+
+@contextmanager
+def borrow_workspace(file_path, workspace=None):
+    """Yield the request's workspace, or a throwaway one when a helper runs standalone."""
+    if workspace is not None:
+        yield workspace
+        return
+    ws = Workspace.attach(file_path)
+    try:
+        yield ws
+    finally:
+        ws.cleanup()
+
+
+def scratch_path(workspace, name):
+    """Private output path in the request workspace, or a unique temp path when standalone."""
+    if workspace is not None:
+        return workspace.path(name)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(tempfile.gettempdir(), f"{stem}_{uuid.uuid4().hex[:8]}{ext}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for structured results and the artefact store
+"""
+
+import io
+import sys
+import time
+import base64
+import tempfile
+
+
+def test_compact_result():
+    """Long strings become artefact references; base64 payloads are stored decoded"""
+    from PIL import Image
+    from stego.artifacts import ArtifactStore, compact_result, RESULT_INLINE_MAX
+    buf = io.BytesIO()
+    Image.new("RGB", (400, 400)).save(buf, "PNG", compress_level=0)
+    png = buf.getvalue()
+    text = "line of tool output\n" * (RESULT_INLINE_MAX // 10)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(tmp)
+        image = compact_result("sox_spectrogram", {"image": base64.b64encode(png).decode(), "message": "done"}, store)
+        assert image["summary"] == "done" and image["output"] == "json"
+        ref = image["result"]["image"]["artifact"]
+        assert ref["mime"] == "image/png" and ref["size"] == len(png)
+        path, meta = store.get(ref["id"])
+        with open(path, "rb") as f:
+            assert f.read() == png
+
+        dump = compact_result("binwalk", text, store)
+        assert dump["output"] == "text" and dump["summary"] == "line of tool output"
+        assert dump["result"]["truncated"] and dump["result"]["artifact"]["size"] == len(text)
+        assert compact_result("xxd", "short", store)["result"] == "short"
+        assert store.get("../../etc/passwd") is None and store.get("0" * 64) is None
+    print("✓ Large payloads moved to the artefact store")
+
+
+def test_dedup_and_eviction():
+    """Identical payloads share one SHA256-named file; unread ones expire"""
+    import os
+    import hashlib
+    from stego.artifacts import ArtifactStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(os.path.join(tmp, "store"), ttl=60, max_bytes=30)
+        source = os.path.join(tmp, "payload.bin")
+        with open(source, "wb") as f:
+            f.write(b"hidden payload")
+        first = store.put(b"hidden payload", name="first.bin")
+        second = store.put_file(source)
+        assert first["id"] == second["id"] == hashlib.sha256(b"hidden payload").hexdigest()
+        assert second["name"] == "first.bin" and len(os.listdir(store.root)) == 2
+        old = store.put(b"x" * 8)
+        os.utime(os.path.join(store.root, old["id"]), (0, 0))
+        assert store.get(old["id"]) is None
+        store.put(b"y" * 8)
+        store.put(b"z" * 10)
+        store.evict()
+        # Over max_bytes: the least recently read go first
+        assert store.get(first["id"]) is None and len(os.listdir(store.root)) == 4
+    print("✓ Artefacts deduplicated and evicted")
+
+
+def test_range_download():
+    """GET /artifacts/<id> serves byte ranges of a stored payload"""
+    import app as processor
+    import stego.artifacts as art
+    saved = art._store
+    with tempfile.TemporaryDirectory() as tmp:
+        art._store = art.ArtifactStore(tmp)
+        try:
+            ref = processor.get_artifact_store().put(bytes(range(256)) * 4, name="range.bin")
+            client = processor.app.test_client()
+            response = client.get(f"/artifacts/{ref['id']}", headers={"Range": "bytes=256-511"})
+            assert response.status_code == 206 and response.data == bytes(range(256))
+            assert client.get(f"/artifacts/{ref['id']}").data == bytes(range(256)) * 4
+            assert client.get("/artifacts/" + "f" * 64).status_code == 404
+        finally:
+            art._store = saved
+    print("✓ Range requests served")
+
+
+def test_touch_references():
+    """Replaying a result refreshes the artefacts it links to and notices evicted ones"""
+    import os
+    from stego.artifacts import ArtifactStore, touch_references
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(tmp, ttl=60)
+        ref = store.put(b"carved payload", name="carved.bin")
+        result = {"carved": [{"name": "carved.bin", "artifact": ref}], "message": "Found 1 embedded file(s)"}
+        os.utime(os.path.join(tmp, ref["id"]), (time.time() - 50, time.time() - 50))
+        assert touch_references(result, store)
+        assert time.time() - os.path.getmtime(os.path.join(tmp, ref["id"])) < 5
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+        os.remove(os.path.join(tmp, ref["id"]))
+        assert not touch_references(result, store) and touch_references({"message": "no refs"}, store)
+    print("✓ Cached results keep their artefacts alive")
+
+
+if __name__ == "__main__":
+    print("Running artefact tests...\n")
+    test_compact_result()
+    test_dedup_and_eviction()
+    test_range_download()
+    test_touch_references()
+    print("\n✅ All artefact tests passed!")
+    sys.exit(0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorised LSB / bit-plane engine
+"""
+
+import io
+import sys
+
+import numpy as np
+
+
+def _stego_image(message, shape=(48, 64, 3)):
+    pixels = np.random.default_rng(7).integers(0, 256, shape, dtype=np.uint8)
+    bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+    flat = pixels.reshape(-1)
+    flat[:len(bits)] = (flat[:len(bits)] & 0xFE) | bits
+    return pixels
+
+
+def test_planes_match_bit_shifts():
+    """Packed planes unpack back to (pixel >> bit) & 1"""
+    from stego.bitplanes import packed_planes
+    pixels = np.random.default_rng(1).integers(0, 256, (5, 13, 3), dtype=np.uint8)
+    planes = packed_planes(pixels)
+    for c in range(3):
+        for bit in range(8):
+            unpacked = np.unpackbits(planes[c, bit], axis=1)[:, :13]
+            assert (unpacked == ((pixels[:, :, c] >> bit) & 1)).all()
+    print(f"✓ {planes.shape[0] * planes.shape[1]} planes round-trip")
+
+
+def test_extract_and_scan_find_payload():
+    """b1,rgb,lsb,xy recovers the embedded bytes and scan() ranks the flag first"""
+    from stego.bitplanes import extract_payload, scan
+    message = b"hello there flag{lsb_is_fast}"
+    pixels = _stego_image(message)
+    assert extract_payload(pixels, "rgb", "b1,rgb,lsb,xy", len(message)) == message
+    hits, scanned = scan(pixels, "rgb")
+    assert hits and hits[0]["spec"] == "b1,rgb,lsb,xy", hits[:1]
+    assert hits[0]["label"] == "flag{lsb_is_fast}"
+    print(f"✓ Found payload in {scanned} specs")
+
+
+def test_pixel_orders():
+    """yx walks columns; uppercase axes walk backwards"""
+    from stego.bitplanes import _ordered
+    pixels = np.arange(6, dtype=np.uint8).reshape(2, 3, 1)
+    assert _ordered(pixels, "xy").reshape(-1).tolist() == [0, 1, 2, 3, 4, 5]
+    assert _ordered(pixels, "yx").reshape(-1).tolist() == [0, 3, 1, 4, 2, 5]
+    assert _ordered(pixels, "Xy").reshape(-1).tolist() == [2, 1, 0, 5, 4, 3]
+    assert _ordered(pixels, "yx", limit=3).reshape(-1).tolist() == [0, 3, 1]
+    print("✓ Pixel orders")
+
+
+def test_plane_png_decodes():
+    """Single plane renders as a 1-bit PNG of the image size"""
+    from PIL import Image
+    from stego.bitplanes import plane_png
+    pixels = _stego_image(b"x")
+    img = Image.open(io.BytesIO(plane_png(pixels, "rgb", "g", 0)))
+    assert img.size == (64, 48) and img.mode == "1"
+    print("✓ Plane PNG")
+
+
+if __name__ == "__main__":
+    print("Running bit-plane tests...\n")
+    test_planes_match_bit_shifts()
+    test_extract_and_scan_find_payload()
+    test_pixel_orders()
+    test_plane_png_decodes()
+    print("\n✅ All bit-plane tests passed!")
+    sys.exit(0)
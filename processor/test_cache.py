@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the result and per-tool caches
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+
+class FakeCollection:
+    """The few pymongo Collection methods ResultCache uses, kept in a dict."""
+
+    def __init__(self):
+        self.docs = {}
+        self.indexes = []
+
+    def create_index(self, field, **options):
+        self.indexes.append((field, options))
+
+    def find_one_and_update(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is not None:
+            doc.update(update["$set"])
+        return doc
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+
+
+def test_keys():
+    """Keys depend on content, tool set, builds and extension, not on order"""
+    from stego.cache import cache_key, tool_cache_key, is_cacheable, PIPELINE_VERSION
+    sha = "ab" * 32
+    assert cache_key(sha, ["zsteg@1", "exiftool@2"], ".PNG") == cache_key(sha, ["exiftool@2", "zsteg@1"], ".png")
+    assert cache_key(sha, ["zsteg@1"], ".png") != cache_key(sha, ["zsteg@2"], ".png")
+    assert cache_key(sha, ["zsteg@1"], ".png") != cache_key(sha, ["zsteg@1"], ".bmp")
+    assert tool_cache_key(sha, "zsteg", "v1", ".PNG") == f"{sha}-zsteg-v1-png-{PIPELINE_VERSION}"
+    assert is_cacheable({"message": "done"}) and not is_cacheable("zsteg timed out after 60s")
+    assert not is_cacheable({"message": "Cancelled"})
+    print("✓ Cache keys and cacheability")
+
+
+def test_disk_backend():
+    """Disk entries round-trip, expire and are evicted least recently used first"""
+    from stego.cache import ResultCache
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(backend="disk", cache_dir=tmp, max_entries=2, ttl=60)
+        cache.put("a", {"results": {"file_type": "PNG image"}})
+        assert cache.get("a") == {"results": {"file_type": "PNG image"}}
+        assert cache.get("missing") is None
+        cache.put("b", {"n": 2})
+        os.utime(cache._path("b"), (time.time() - 10, time.time() - 10))
+        cache.put("c", {"n": 3})
+        # "b" was used longest ago
+        assert cache.get("b") is None and cache.get("a") and cache.get("c")
+        os.utime(cache._path("a"), (0, 0))
+        assert cache.get("a") is None and not os.path.exists(cache._path("a"))
+        off = ResultCache(backend="off", cache_dir=tmp)
+        off.put("x", {"n": 1})
+        assert off.get("x") is None
+    print("✓ Disk cache round-trips, expires and evicts")
+
+
+def test_mongo_backend():
+    """The Mongo backend stores values by key with a TTL index on last access"""
+    from stego.cache import ResultCache
+    collection = FakeCollection()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(db={"tool_cache": collection}, name="tool_cache", cache_dir=tmp, ttl=120)
+        assert cache.backend == "mongo"
+        assert collection.indexes == [("last_access", {"expireAfterSeconds": 120})]
+        cache.put("k", {"result": "output"})
+        assert cache.get("k") == {"result": "output"} and cache.get("other") is None
+        assert collection.docs["k"]["last_access"] >= collection.docs["k"]["created_at"]
+        assert not os.listdir(tmp)
+    print("✓ Mongo cache stores by key")
+
+
+def test_replay_uses_current_workspace():
+    """A cached report shows the replaying request's paths, not the first request's"""
+    import json
+    import base64
+    import app as processor
+    from stego.cache import ResultCache, WORKSPACE_TOKEN
+    caches = processor._result_cache, processor._tool_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        processor._result_cache = ResultCache(backend="disk", cache_dir=tmp)
+        processor._tool_cache = ResultCache(backend="disk", cache_dir=tmp, name="tool_cache")
+        try:
+            client = processor.app.test_client()
+            payload = {"fileData": base64.b64encode(b"cache me " * 50).decode(), "fileName": "c.txt"}
+            first = client.post("/process", json=payload).get_json()
+            second = client.post("/process", json=payload).get_json()
+            stored = json.dumps(processor._result_cache.get(next(
+                name[:-5] for name in os.listdir(os.path.join(tmp, "analysis_cache")))))
+        finally:
+            processor._result_cache, processor._tool_cache = caches
+    first_dir = first["hashes"].split("  ")[1].rsplit("/", 1)[0]
+    second_dir = second["hashes"].split("  ")[1].rsplit("/", 1)[0]
+    assert first_dir != second_dir and first["hashes"].replace(first_dir, second_dir) == second["hashes"]
+    assert first_dir not in stored and WORKSPACE_TOKEN in stored
+    print("✓ Cached reports replayed with the current workspace paths")
+
+
+def test_replay_with_evicted_artifact_reruns():
+    """A cached report whose artefacts were evicted is computed again instead of replayed"""
+    import io
+    import base64
+    import contextlib
+    import app as processor
+    import stego.artifacts as art
+    from stego.cache import ResultCache
+    caches, store = (processor._result_cache, processor._tool_cache), art._store
+    with tempfile.TemporaryDirectory() as tmp:
+        processor._result_cache = ResultCache(backend="disk", cache_dir=tmp)
+        processor._tool_cache = ResultCache(backend="disk", cache_dir=tmp, name="tool_cache")
+        art._store = art.ArtifactStore(os.path.join(tmp, "store"))
+        try:
+            client = processor.app.test_client()
+            payload = {"fileData": base64.b64encode(b"prefix " * 20 + b"%PDF-1.4\n%%EOF\n").decode(), "fileName": "c.bin"}
+            first = client.post("/process", json=payload).get_json()
+            ref = first["carve"]["carved"][0]["artifact"]
+            os.remove(os.path.join(art._store.root, ref["id"]))
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                second = client.post("/process", json=payload).get_json()
+            assert "references evicted artefacts" in log.getvalue()
+            assert art._store.get(second["carve"]["carved"][0]["artifact"]["id"])
+        finally:
+            processor._result_cache, processor._tool_cache = caches
+            art._store = store
+    print("✓ Cached reports with evicted artefacts re-run")
+
+
+if __name__ == "__main__":
+    print("Running cache tests...\n")
+    test_keys()
+    test_disk_backend()
+    test_mongo_backend()
+    test_replay_uses_current_workspace()
+    test_replay_with_evicted_artifact_reruns()
+    print("\n✅ All cache tests passed!")
+    sys.exit(0)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the flag / encoding auto-decoder
+"""
+
+import os
+import sys
+import time
+import base64
+import binascii
+
+
+def test_decoder_chains():
+    """Nested and single encodings in different tools' output all end up as flags"""
+    from stego.decoders import find_candidates
+    xored = bytes(b ^ 0x42 for b in b"CTF{xor_me}")
+    results = {
+        "strings": {"strings": [{"text": "junk " + base64.b64encode(binascii.hexlify(b"flag{b64_of_hex}")).decode()}]},
+        "exiftool": "Comment : synt{ebg13_vf_sha}",
+        "zsteg": "b1,rgb,lsb,xy .. text: " + binascii.hexlify(xored).decode(),
+        "tesseract_ocr": "flag%7Burl_encoded%7D",
+        "morse_detect": "..-. .-.. .- --. / .... . .-.. .-.. ---",
+        "hashes": "flag{not_a_source}",
+    }
+    report = find_candidates(results)
+    flags = {c["value"]: c["chain"] for c in report["candidates"] if c["score"] == 100}
+    assert flags == {
+        "flag{b64_of_hex}": ["base64", "hex"],
+        "flag{rot13_is_fun}": ["rot13"],
+        "CTF{xor_me}": ["hex", "xor:0x42"],
+        "flag{url_encoded}": ["url"],
+    }, flags
+    assert report["found"] and report["candidates"][0]["score"] == 100
+    assert any(c["value"] == "FLAG HELLO" for c in report["candidates"])
+    print(f"✓ {len(flags)} flags decoded through their chains")
+
+
+def test_memo_and_large_output():
+    """Repeated blobs are decoded once; megabytes of random base64 stay fast"""
+    from stego.decoders import find_candidates
+    blob = base64.b64encode(b"the same hidden sentence").decode()
+    report = find_candidates({"strings": "\n".join([blob] * 1000), "exiftool": blob})
+    assert len(report["candidates"]) == 1 and report["decoded_blobs"] <= 5
+    started = time.monotonic()
+    report = find_candidates({"strings": base64.b64encode(os.urandom(2 * 1024 * 1024)).decode()})
+    assert not report["candidates"]
+    print(f"✓ Random 2.7 MB output scanned in {time.monotonic() - started:.2f}s")
+
+
+def test_full_strings_list():
+    """Every string of the input is searched, not the result's top few, and summaries are skipped"""
+    import tempfile
+    import app as processor
+    import stego.strings as st
+    from stego.workspace import Workspace
+    from stego.decoders import find_candidates
+    assert not find_candidates({"strings": {"strings": [], "summary": "flag{only_in_summary}"}})["candidates"]
+    import stego.artifacts as art
+    blob = base64.b64encode(b"flag{only_in_the_full_list}")
+    top, store = st.STRINGS_TOP_N, art._store
+    st.STRINGS_TOP_N = 1
+    try:
+        with tempfile.TemporaryDirectory() as tmp, Workspace(root=tmp) as ws:
+            art._store = art.ArtifactStore(os.path.join(tmp, "store"))
+            ws.add_input(b"\0".join([b"flag{ranked_first}", b"\xff" * 8, blob, b"tail text here"]), ".bin")
+            result = processor.run_strings(ws.input_path, ws)
+            assert [s["text"] for s in result["strings"]] == ["flag{ranked_first}"]
+            text = processor.all_strings_text(ws, result)
+            assert text.split("\n") == ["flag{ranked_first}", blob.decode(), "tail text here"]
+            stored, _ = art._store.get(result["full_list"]["id"])
+            os.remove(stored)
+            # The stored list expired: the input is scanned again
+            assert processor.all_strings_text(ws, result) == text
+            report = find_candidates({"strings": result}, texts={"strings": text})
+    finally:
+        st.STRINGS_TOP_N, art._store = top, store
+    assert {"flag{ranked_first}", "flag{only_in_the_full_list}"} <= {c["value"] for c in report["candidates"]}
+    print("✓ Full strings list searched")
+
+
+def test_budget_per_source():
+    """A strings list full of encoded-looking junk leaves the other tools' blobs decodable"""
+    from stego.decoders import find_candidates, DECODE_MAX_TOKENS
+    junk = "\n".join(base64.b64encode(os.urandom(18)).decode() for _ in range(DECODE_MAX_TOKENS + 1000))
+    qr = "QR-Code:" + base64.b64encode(b"flag{hidden_in_qr}").decode()
+    report = find_candidates({"zbarimg": qr}, texts={"strings": junk})
+    assert any(c["value"] == "flag{hidden_in_qr}" for c in report["candidates"]), report["message"]
+    print("✓ Each source decoded within its own budget")
+
+
+if __name__ == "__main__":
+    print("Running decoder tests...\n")
+    test_decoder_chains()
+    test_memo_and_large_output()
+    test_full_strings_list()
+    test_budget_per_source()
+    print("\n✅ All decoder tests passed!")
+    sys.exit(0)
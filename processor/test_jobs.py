@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite job queue
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+
+def _store():
+    from stego.jobs import JobStore
+    return JobStore(os.path.join(tempfile.mkdtemp(), "jobs.sqlite"))
+
+
+def test_claim_order_and_exclusivity():
+    """Jobs are claimed oldest first and only once"""
+    store = _store()
+    first = store.submit({"fileName": "a.png"})
+    second = store.submit({"fileName": "b.png"})
+    assert store.get(second)["queue_position"] == 1
+    assert store.claim() == (first, {"fileName": "a.png"})
+    assert store.claim()[0] == second
+    assert store.claim() is None
+    print("✓ FIFO claim")
+
+
+def test_run_job_records_events_and_results():
+    """Partial results grow per tool; the complete event finishes the job"""
+    from stego.jobs import run_job
+    store = _store()
+    job_id = store.submit({})
+    store.claim()
+    events = [
+        {"status": "progress", "message": "Running strings...", "tool": "strings"},
+        {"status": "progress", "message": "Finished strings", "tool": "strings", "partial_result": "IHDR"},
+        {"status": "complete", "results": {"strings": "IHDR"}},
+    ]
+    run_job(store, job_id, iter(events))
+    job = store.get(job_id)
+    assert job["status"] == "complete" and job["results"] == {"strings": "IHDR"}
+    assert [seq for seq, _ in store.events(job_id)] == [1, 2, 3]
+    assert [e["status"] for _, e in store.events(job_id, after=2)] == ["complete"]
+    print("✓ Events and results stored")
+
+
+def test_workers_drain_queue():
+    """A worker thread picks up a submitted job without polling delay"""
+    from stego.jobs import JobWorkers
+    store = _store()
+    workers = JobWorkers(store, lambda req, cancel: iter([{"status": "complete", "results": req}]))
+    workers.ensure_started()
+    job_id = store.submit({"x": 1})
+    workers.notify()
+    for _ in range(50):
+        if store.get(job_id)["status"] == "complete":
+            break
+        time.sleep(0.1)
+    assert store.get(job_id)["results"] == {"x": 1}
+    print("✓ Worker drained the queue")
+
+
+def test_live_job_is_not_reclaimed():
+    """A long job keeps its heartbeat; only one without heartbeats is taken over"""
+    import threading
+    import stego.jobs as jobs
+    store = _store()
+    saved = jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_STALE_SECONDS
+    jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_STALE_SECONDS = 0.2, 1
+    release = threading.Event()
+
+    def slow(req, cancel):
+        release.wait(5)
+        return iter([{"status": "complete", "results": {}}])
+
+    try:
+        workers = jobs.JobWorkers(store, slow)
+        workers.ensure_started()
+        live = store.submit({"live": True})
+        workers.notify()
+        time.sleep(1.8)
+        assert store.get(live)["status"] == "running" and store.claim() is None
+        release.set()
+        for _ in range(50):
+            if store.get(live)["status"] == "complete":
+                break
+            time.sleep(0.1)
+        assert store.get(live)["status"] == "complete"
+        orphan = _store()
+        orphan_id = orphan.submit({})
+        orphan.claim()
+        time.sleep(1.2)
+        assert orphan.claim()[0] == orphan_id
+    finally:
+        jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_STALE_SECONDS = saved
+    print("✓ Running jobs heartbeat; dead ones are re-queued")
+
+
+def test_submit_stores_a_reference():
+    """POST /jobs keeps inline fileData in the artefact store, not in the queue"""
+    import json
+    import base64
+    import sqlite3
+    import app as processor
+    import stego.artifacts as art
+    from stego.jobs import JobWorkers
+    store = _store()
+    saved = processor._job_queue, art._store
+    artifacts = art.ArtifactStore(tempfile.mkdtemp())
+    processor._job_queue = (store, JobWorkers(store, None, count=0))
+    art._store = artifacts
+    try:
+        client = processor.app.test_client()
+        data = b"job payload " * 100
+        response = client.post("/jobs", json={"fileData": base64.b64encode(data).decode(), "fileName": "j.bin"})
+        job_id = response.get_json()["jobId"]
+        with sqlite3.connect(store.path) as conn:
+            request = json.loads(conn.execute("SELECT request FROM jobs WHERE id = ?", (job_id,)).fetchone()[0])
+        assert "fileData" not in request and request["fileName"] == "j.bin"
+        path, meta = artifacts.get(request["artifactId"])
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert client.post("/jobs", json={"artifactId": request["artifactId"]}).status_code == 202
+        assert client.post("/jobs", json={}).status_code == 400
+    finally:
+        processor._job_queue, art._store = saved
+    print("✓ Jobs queue an artefact reference")
+
+
+def test_blueprint_uses_the_app_queue():
+    """/api/webctf/jwt queues async cracks on the app's own job queue"""
+    import app as processor
+    from stego.jobs import JobWorkers
+    store = _store()
+    saved = processor._job_queue
+    processor._job_queue = (store, JobWorkers(store, None, count=0))
+    try:
+        token = "eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiIxIn0.c2ln"
+        response = processor.app.test_client().post("/api/webctf/jwt", json={"token": token, "crack": True,
+                                                                              "async": True})
+        assert response.status_code == 202
+        assert store.claim() == (response.get_json()["jobId"], {"kind": "jwt_crack", "token": token, "wordlists": []})
+    finally:
+        processor._job_queue = saved
+    print("✓ Blueprint queues on the app's job queue")
+
+
+if __name__ == "__main__":
+    print("Running job queue tests...\n")
+    test_claim_order_and_exclusivity()
+    test_run_job_records_events_and_results()
+    test_workers_drain_queue()
+    test_live_job_is_not_reclaimed()
+    test_submit_stores_a_reference()
+    test_blueprint_uses_the_app_queue()
+    print("\n✅ All job queue tests passed!")
+    sys.exit(0)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the tool registry
+"""
+
+import sys
+
+
+def test_formats_by_extension_or_magic():
+    from stego.registry import detect_formats
+    assert detect_formats(".JPG", b"") == {"jpeg"}
+    assert detect_formats(".bin", b"\x89PNG\r\n\x1a\n\x00\x00") == {"png"}
+    assert detect_formats(".bin", b"RIFF\x00\x00\x00\x00WAVEfmt ") == {"wav"}
+    assert detect_formats(".txt", b"hello") == set()
+    print("✓ Format detection")
+
+
+def test_select_and_skip():
+    """Tools outside their formats are left out, or report their skip message"""
+    from stego import registry
+    saved = dict(registry.TOOLS)
+    registry.TOOLS.clear()
+    try:
+        registry.register(registry.Tool("any", print))
+        registry.register(registry.Tool("images", print, formats=registry.IMAGE_FORMATS))
+        registry.register(registry.Tool("cracker", print, formats=("jpeg",), skip_message="not for this file"))
+        registry.register(registry.Tool("missing", print, available=lambda: False))
+        selected, skipped = registry.select_tools("/tmp/input.bmp", b"BM")
+        assert [t.name for t in selected] == ["any", "images"]
+        assert skipped == {"cracker": "not for this file"}
+    finally:
+        registry.TOOLS.clear()
+        registry.TOOLS.update(saved)
+    print("✓ Tool selection")
+
+
+def test_plan_orders_by_dependencies_then_cost():
+    from stego import registry
+    saved = dict(registry.TOOLS)
+    try:
+        tools = [registry.register(registry.Tool(name, print, cost=cost, after=after))
+                 for name, cost, after in [("cheap", 0.1, ()), ("slow", 30, ()),
+                                           ("decoder", 1, ("cheap", "slow")), ("extra", 5, ("ghost",))]]
+        phases = [[t.name for t in phase] for phase in registry.plan(tools)]
+        assert phases == [["slow", "extra", "cheap"], ["decoder"]], phases
+        job = registry.Tool("cmd", command="strings '{path}'", timeout=5).job({"path": "/x"}, print)
+        assert job == ("cmd", print, ("strings '/x'", 5))
+    finally:
+        registry.TOOLS.clear()
+        registry.TOOLS.update(saved)
+    print("✓ Phase planning")
+
+
+def test_tools_accept_what_the_registry_selects():
+    """Runners take every file the registry picks for them, matched by magic bytes alone"""
+    import os
+    import tempfile
+    import app as processor
+    from stego.registry import FORMATS, get_tool
+    installed, crack = processor.is_tool_installed, processor.crack_parallel
+    processor.is_tool_installed = lambda name: name != "stegseek"
+    processor.crack_parallel = lambda path, candidates, workspace: "cracked"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for tool in map(get_tool, ("zsteg", "steghide_crack", "stegdetect", "outguess", "tesseract_ocr")):
+                for name, spec in FORMATS.items():
+                    offset, magic = spec["magic"][0]
+                    path = os.path.join(tmp, f"upload-{name}")
+                    with open(path, "wb") as f:
+                        f.write(b"\0" * offset + magic + b"\0" * 64)
+                    _, run, args = tool.job({"path": path, "workspace": None}, print)
+                    result = run(*args)
+                    refused = isinstance(result, str) and any(
+                        text in result for text in ("Unsupported file format", "only works with", "only operates on"))
+                    assert refused == (name not in tool.formats), (tool.name, name, result)
+    finally:
+        processor.is_tool_installed, processor.crack_parallel = installed, crack
+    print("✓ Runners accept the registry's formats")
+
+
+def test_run_functions_get_the_registry_timeout():
+    import app as processor
+    from stego.registry import Tool
+    assert processor.get_tool("stegoveritas").job({"path": "/x", "workspace": None}, print)[2] == ("/x", None, 180)
+    job = Tool("t", print, args=("path", "timeout"), timeout=7).job({"path": "/x"}, print)
+    assert job == ("t", print, ("/x", 7))
+    print("✓ Registry timeout passed to run functions")
+
+if __name__ == "__main__":
+    print("Running registry tests...\n")
+    test_formats_by_extension_or_magic()
+    test_select_and_skip()
+    test_plan_orders_by_dependencies_then_cost()
+    test_tools_accept_what_the_registry_selects()
+    test_run_functions_get_the_registry_timeout()
+    print("\n✅ All registry tests passed!")
+    sys.exit(0)
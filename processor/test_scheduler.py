@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel tool scheduler
+"""
+
+import sys
+import time
+
+
+def test_tools_run_concurrently():
+    """Three 0.3s jobs should finish in roughly the time of one"""
+    from stego.scheduler import run_tools
+    jobs = [(f"sleep_{i}", time.sleep, (0.3,)) for i in range(3)]
+    started = time.time()
+    events = list(run_tools(jobs, max_concurrency=3))
+    elapsed = time.time() - started
+    done = [name for kind, name, _ in events if kind == "done"]
+    assert sorted(done) == ["sleep_0", "sleep_1", "sleep_2"]
+    assert elapsed < 0.8, f"jobs ran serially ({elapsed:.2f}s)"
+    print(f"✓ 3 jobs finished in {elapsed:.2f}s")
+
+
+def test_failures_become_results():
+    """A tool that raises reports its error as the result"""
+    from stego.scheduler import run_tools
+
+    def broken():
+        raise RuntimeError("boom")
+
+    events = list(run_tools([("broken", broken, ())]))
+    assert events[0] == ("start", "broken", None)
+    assert events[-1] == ("done", "broken", "broken failed: boom")
+    print("✓ Tool exceptions are reported as results")
+
+
+def test_slow_lane_does_not_block_fast_tools():
+    """With the slow lane saturated, fast tools still start and finish immediately"""
+    from stego.scheduler import run_tools, lane_metrics, LANE_CONCURRENCY
+    slow = [("steghide_crack", time.sleep, (0.5,)), ("stegoveritas", time.sleep, (0.5,))]
+    fast = [("file_type", time.sleep, (0.01,)), ("xxd", time.sleep, (0.01,))]
+    started = time.time()
+    finished = {}
+    for kind, name, _ in run_tools(slow + fast, max_concurrency=4):
+        if kind == "done":
+            finished[name] = time.time() - started
+    assert max(finished["file_type"], finished["xxd"]) < 0.3, finished
+    if LANE_CONCURRENCY["slow"] == 1:
+        assert max(finished["steghide_crack"], finished["stegoveritas"]) >= 0.95, finished
+    metrics = lane_metrics()
+    assert metrics["slow"]["running"] == 0 and metrics["slow"]["completed"] >= 2
+    print(f"✓ Fast tools done in {finished['xxd']:.2f}s while slow lane queued")
+
+
+def test_lanes_stay_within_request_and_global_limits():
+    """Tools of different lanes still share the per-request and process-wide caps"""
+    import threading
+    import stego.scheduler as sched
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def tool():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+
+    jobs = [("file_type", tool, ()), ("xxd", tool, ()), ("steghide_crack", tool, ()), ("sox_info", tool, ())]
+    list(sched.run_tools(jobs, max_concurrency=2))
+    assert running[1] == 2, running
+    saved, sched._global_slots = sched._global_slots, threading.BoundedSemaphore(1)
+    try:
+        running[1] = 0
+        list(sched.run_tools(jobs, max_concurrency=4))
+        assert running[1] == 1, running
+    finally:
+        sched._global_slots = saved
+    print("✓ Lanes apply on top of the request and global limits")
+
+
+if __name__ == "__main__":
+    print("Running scheduler tests...\n")
+    test_tools_run_concurrently()
+    test_failures_become_results()
+    test_slow_lane_does_not_block_fast_tools()
+    test_lanes_stay_within_request_and_global_limits()
+    print("\n✅ All scheduler tests passed!")
+    sys.exit(0)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the native NumPy spectrogram engine
+"""
+
+import io
+import sys
+import wave
+import tempfile
+
+import numpy as np
+
+
+def _write_tone(path, freq, sample_rate=8000, seconds=2):
+    t = np.arange(sample_rate * seconds) / sample_rate
+    samples = (0.5 * np.sin(2 * np.pi * freq * t) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.tobytes())
+
+
+def test_tone_peak_lands_in_right_bin():
+    """A 1 kHz tone should peak at ~1 kHz"""
+    from stego.spectrogram import iter_wav_chunks, compute_spectrogram
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        _write_tone(tmp.name, 1000)
+        chunks = iter_wav_chunks(tmp.name, chunk_frames=1000)  # force several chunks
+        sample_rate, total = next(chunks)
+        magnitude, freqs, _ = compute_spectrogram(chunks, sample_rate, total, {"max_columns": 10})
+    assert magnitude.shape[1] <= 10
+    peak = freqs[int(magnitude.mean(axis=1).argmax())]
+    assert abs(peak - 1000) < 20, peak
+    print(f"✓ Tone peak at {peak:.0f} Hz in {magnitude.shape[1]} columns")
+
+
+def test_frequency_band_and_png():
+    """fmin/fmax crop the rows and the PNG decodes"""
+    from PIL import Image
+    from stego.spectrogram import spectrogram_from_wav
+    import base64
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        _write_tone(tmp.name, 1000)
+        result = spectrogram_from_wav(tmp.name, {"fmin": 500, "fmax": 1500})
+    low, high = result["frequency_range"]
+    assert 500 <= low and high <= 1500
+    img = Image.open(io.BytesIO(base64.b64decode(result["image"])))
+    assert img.size == (result["width"], result["height"])
+    print(f"✓ Band {low}-{high} Hz rendered as {img.size[0]}x{img.size[1]} PNG")
+
+
+def test_24bit_wav():
+    """24-bit PCM decodes to the same signal as 16-bit"""
+    from stego.spectrogram import iter_wav_chunks
+    samples = np.array([0, 1 << 22, -(1 << 22), (1 << 23) - 1, -(1 << 23)], dtype="<i4")
+    raw = b"".join(int(v).to_bytes(3, "little", signed=True) for v in samples)
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        with wave.open(tmp.name, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(3)
+            w.setframerate(8000)
+            w.writeframes(raw)
+        chunks = iter_wav_chunks(tmp.name, chunk_frames=2)
+        assert next(chunks) == (8000, 5)
+        decoded = np.concatenate(list(chunks))
+    assert np.allclose(decoded, samples / float(1 << 23)), decoded
+    print("✓ 24-bit samples decoded")
+
+
+def test_small_hop_large_fft_stays_batched():
+    """A tiny hop is raised to n_fft // 8 and FFTs run in bounded batches"""
+    import stego.spectrogram as sp
+    opts = sp.normalize_options({"n_fft": 65536, "hop": 1})
+    assert opts["hop"] == 65536 // 8
+    batch = sp.STFT_BATCH_SAMPLES
+    sp.STFT_BATCH_SAMPLES = 4 * 256  # four frames per FFT batch
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+            _write_tone(tmp.name, 1000)
+            chunks = sp.iter_wav_chunks(tmp.name, chunk_frames=3000)
+            sample_rate, total = next(chunks)
+            magnitude, freqs, _ = sp.compute_spectrogram(chunks, sample_rate, total,
+                                                         {"n_fft": 256, "hop": 32, "max_columns": 50})
+    finally:
+        sp.STFT_BATCH_SAMPLES = batch
+    peak = freqs[int(magnitude.mean(axis=1).argmax())]
+    assert magnitude.shape[1] <= 50 and abs(peak - 1000) < 40, peak
+    print(f"✓ Batched STFT peak at {peak:.0f} Hz")
+
+
+if __name__ == "__main__":
+    print("Running spectrogram tests...\n")
+    test_tone_peak_lands_in_right_bin()
+    test_frequency_band_and_png()
+    test_24bit_wav()
+    test_small_hop_large_fft_stays_batched()
+    print("\n✅ All spectrogram tests passed!")
+    sys.exit(0)
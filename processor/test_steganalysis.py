@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the chi-square / RS / sample pair detectors
+"""
+
+import sys
+
+import numpy as np
+
+
+def _cover(height=256, width=384):
+    """Smooth synthetic photo-like image with sensor noise"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([128 + 60 * np.sin(x / 40.0) + 30 * np.cos(y / 30.0),
+                     100 + 50 * np.sin((x + y) / 60.0),
+                     90 + 70 * np.cos(x / 90.0) * np.sin(y / 70.0)], -1)
+    base += rng.normal(0, 3, base.shape)
+    return np.clip(base, 0, 255).astype(np.uint8)
+
+
+def _embed(pixels, rate, sequential=False):
+    rng = np.random.default_rng(1)
+    flat = pixels.copy().reshape(-1)
+    n = int(flat.size * rate)
+    idx = np.arange(n) if sequential else rng.choice(flat.size, n, replace=False)
+    flat[idx] = (flat[idx] & 0xFE) | rng.integers(0, 2, n, dtype=np.uint8)
+    return flat.reshape(pixels.shape)
+
+
+def test_clean_image_is_clean():
+    """A cover image estimates close to zero"""
+    from stego.steganalysis import analyse_pixels
+    report = analyse_pixels(_cover(), "rgb")
+    assert not report["suspicious"], report
+    print(f"✓ Clean estimate {report['estimated_rate']:.3f}")
+
+
+def test_rs_and_spa_estimate_rate():
+    """Random LSB replacement at 40% is estimated within a few percent"""
+    from stego.steganalysis import rs_analysis, sample_pair_analysis
+    stego = _embed(_cover(), 0.4)
+    for c in range(3):
+        rs = rs_analysis(stego[:, :, c])
+        spa = sample_pair_analysis(stego[:, :, c])
+        assert abs(rs - 0.4) < 0.05 and abs(spa - 0.4) < 0.05, (rs, spa)
+    print(f"✓ RS {rs:.3f}, SPA {spa:.3f} for 0.4 embedding")
+
+
+def test_chi_square_finds_sequential_message():
+    """Full sequential embedding in the top half of a 7-bit cover (LSBs all zero)"""
+    from stego.steganalysis import chi_square_attack
+    channel = _cover()[:, :, 0] & 0xFE
+    half = channel.shape[0] // 2
+    channel[:half] = _embed(channel[:half], 1.0)
+    result = chi_square_attack(channel)
+    assert 0.4 <= result["rate"] <= 0.55, result
+    print(f"✓ Chi-square message length {result['rate']:.2f}")
+
+
+if __name__ == "__main__":
+    print("Running steganalysis tests...\n")
+    test_clean_image_is_clean()
+    test_rs_and_spa_estimate_rate()
+    test_chi_square_finds_sequential_message()
+    print("\n✅ All steganalysis tests passed!")
+    sys.exit(0)
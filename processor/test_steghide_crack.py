@@ -55,6 +55,35 @@ def test_steghide_availability():
         print("⚠ steghide not found in PATH - testing will be limited")
         return False
 
+FAKE_STEGHIDE = """#!/bin/sh
+pw=""; out=""
+while [ $# -gt 0 ]; do case "$1" in -p) pw="$2"; shift;; -xf) out="$2"; shift;; esac; shift; done
+if [ "$pw" = "letmein2" ]; then printf 'flag{parallel}' > "$out"; exit 0; fi
+exit 1
+"""
+
+def test_parallel_cracker():
+    """The parallel cracker finds a wordlist password with a stand-in steghide binary"""
+    from stego.steghide import crack_parallel, iter_candidates
+    tmp = tempfile.mkdtemp()
+    binary = os.path.join(tmp, "steghide")
+    with open(binary, "w") as f:
+        f.write(FAKE_STEGHIDE)
+    os.chmod(binary, 0o755)
+    wordlist = os.path.join(tmp, "words.txt")
+    with open(wordlist, "w") as f:
+        f.write("\n".join(f"word{i}" for i in range(100)) + "\nletmein2\n")
+    old_path = os.environ["PATH"]
+    os.environ["PATH"] = tmp + os.pathsep + old_path
+    try:
+        result = crack_parallel(os.path.join(tmp, "cover.jpg"), iter_candidates([wordlist]), workers=4)
+    finally:
+        os.environ["PATH"] = old_path
+    assert result["password_found"] and result["password"] == "letmein2", result
+    assert result["extracted_data"] == "flag{parallel}"
+    assert not [name for name in os.listdir(tempfile.gettempdir()) if name.startswith("steghide_out_")]
+    print(f"✓ Parallel cracker: {result['attempts']} attempts at {result['passwords_per_second']}/s")
+
 if __name__ == "__main__":
     print("Running steghide password cracking implementation tests...\n")
     
@@ -70,6 +99,9 @@ if __name__ == "__main__":
     
     # Test steghide availability
     steghide_available = test_steghide_availability()
+
+    # Test the parallel cracker against a stand-in binary
+    test_parallel_cracker()
     
     print("\n✅ All basic tests passed!")
     if not steghide_available:
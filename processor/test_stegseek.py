@@ -68,6 +68,48 @@ def test_wordlist_availability():
         print("⚠ RockYou wordlist not found - testing will be limited")
         return False
 
+FAKE_STEGSEEK = """#!/bin/sh
+echo "StegSeek 0.6 - https://github.com/RickdeJager/StegSeek"
+i=0
+while [ $i -lt 50 ]; do
+  printf '[i] Progress: %d.00%% (%d.0 MB)           \\r' $i $i
+  sleep 0.1
+  i=$((i+1))
+done
+exit 1
+"""
+
+def test_streamed_progress_and_cancel():
+    """Progress lines become events and cancelling kills the crack"""
+    import time
+    import threading
+    from stego.scheduler import run_tools
+    from stego.stegseek import run_stegseek
+    tmp = tempfile.mkdtemp()
+    binary = os.path.join(tmp, "stegseek")
+    with open(binary, "w") as f:
+        f.write(FAKE_STEGSEEK)
+    os.chmod(binary, 0o755)
+    old_path = os.environ["PATH"]
+    os.environ["PATH"] = tmp + os.pathsep + old_path
+    cancel = threading.Event()
+    progress = []
+    try:
+        started = time.time()
+        for kind, name, info in run_tools([("stegseek", run_stegseek, ("x.jpg", os.path.join(tmp, "out")))], cancel=cancel):
+            if kind == "progress":
+                progress.append(info)
+                if len(progress) == 2:
+                    cancel.set()
+            elif kind == "done":
+                result = info
+    finally:
+        os.environ["PATH"] = old_path
+    assert result["status"] == "cancelled", result
+    assert time.time() - started < 4, "crack was not killed"
+    assert progress[1]["percent"] > progress[0]["percent"] and progress[0]["candidates_per_second"] > 0
+    print(f"✓ {len(progress)} progress events, cancelled at {result['progress']}%")
+
 if __name__ == "__main__":
     print("Running StegSeek password cracking implementation tests...\n")
     
@@ -83,6 +125,9 @@ if __name__ == "__main__":
     
     # Test StegSeek availability
     stegseek_available = test_stegseek_availability()
+
+    # Test streamed progress and cancellation against a stand-in binary
+    test_streamed_progress_and_cancel()
     
     # Test wordlist availability
     wordlist_available = test_wordlist_availability()
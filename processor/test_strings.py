@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the native strings extractor
+"""
+
+import os
+import sys
+import tempfile
+
+
+def test_encodings():
+    """ASCII, UTF-16LE and UTF-16BE runs are found once each, at their offsets"""
+    from stego.strings import extract_strings
+    data = (b"\x01\x02" + b"plain ascii text" + b"\xff" * 5
+            + "wide little endian".encode("utf-16le") + b"\xfe\xff\x80"
+            + "wide big endian".encode("utf-16be") + b"\x90short\x91")
+    strings = extract_strings(data)
+    found = [(s["encoding"], s["text"]) for s in strings]
+    assert found == [("ascii", "plain ascii text"), ("utf-16le", "wide little endian"),
+                     ("utf-16be", "wide big endian")], found
+    assert strings[0]["offset"] == 2
+    print(f"✓ Found {len(strings)} strings across encodings")
+
+
+def test_block_boundaries():
+    """Runs that cross a block edge come out whole"""
+    import stego.strings as st
+    block = st._BLOCK
+    st._BLOCK = 64
+    try:
+        data = b"\x00" * 30 + b"A" * 100 + b"\x80" * 31 + "B".encode("utf-16le") * 60 + b"\x81" * 3
+        strings = st.extract_strings(data)
+    finally:
+        st._BLOCK = block
+    assert [(s["encoding"], s["offset"], len(s["text"])) for s in strings] == [
+        ("ascii", 30, 100), ("utf-16le", 161, 60)], strings
+    assert all(type(s["offset"]) is int for s in strings)
+    print("✓ Runs across block boundaries are joined")
+
+
+def test_ranking_and_paging():
+    """Flags and URLs rank first; pages filter by encoding and query"""
+    from stego.strings import extract_strings, page, write_list
+    data = b"\x00".join([b"just some filler words", b"see https://example.com/hint",
+                         b"__cxa_finalize@GLIBC_2.2.5", b"CTF{strings_found_it}"])
+    strings = extract_strings(data)
+    top = page(strings)["strings"]
+    assert top[0]["text"] == "CTF{strings_found_it}" and "flag" in top[0]["tags"]
+    assert top[1]["tags"] == ["url"]
+    assert "email" not in next(s for s in strings if "GLIBC" in s["text"])["tags"]
+    second = page(strings, offset=1, limit=1, order="offset")
+    assert second["total"] == 4 and second["strings"][0]["text"].startswith("see")
+    assert page(strings, query="FINALIZE")["total"] == 1
+    assert page(strings, encoding="utf-16le")["total"] == 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "strings.tsv")
+        write_list(strings, path)
+        with open(path) as f:
+            assert len(f.read().splitlines()) == 4
+    print("✓ Strings ranked and paged")
+
+
+def test_strings_route():
+    """/strings loads fileData and stored artefacts through a workspace"""
+    import base64
+    import app as processor
+    data = b"\x00\x01" + b"CTF{paged_from_the_route}" + b"\xff" * 4 + b"second string here"
+    client = processor.app.test_client()
+    response = client.post("/strings", json={"fileData": base64.b64encode(data).decode(), "limit": 1})
+    body = response.get_json()
+    assert response.status_code == 200 and body["total"] == 2
+    assert body["strings"][0]["text"] == "CTF{paged_from_the_route}"
+    with tempfile.TemporaryDirectory() as tmp:
+        from stego.artifacts import ArtifactStore
+        store = processor.get_artifact_store
+        processor.get_artifact_store = lambda: ArtifactStore(tmp)
+        try:
+            ref = processor.get_artifact_store().put(data, name="payload.bin")
+            response = client.post("/strings", json={"artifactId": ref["id"], "order": "offset"})
+            assert response.get_json()["strings"][1]["text"] == "second string here"
+            assert client.post("/strings", json={"artifactId": "0" * 64}).status_code == 404
+        finally:
+            processor.get_artifact_store = store
+    print("✓ /strings pages fileData and artefacts")
+
+
+def test_strings_route_pages_stored_list():
+    """/strings pages the full list a strings result stored, without the upload"""
+    import base64
+    import app as processor
+    import stego.artifacts as art
+    data = b"\x00password=hunter2\x00" + "wide string".encode("utf-16le") + b"\xff" * 4 + b"CTF{from_the_list}"
+    saved = art._store
+    with tempfile.TemporaryDirectory() as tmp:
+        art._store = art.ArtifactStore(os.path.join(tmp, "store"))
+        try:
+            upload = os.path.join(tmp, "upload.bin")
+            with open(upload, "wb") as f:
+                f.write(data)
+            ref = processor.run_strings(upload)["full_list"]
+            assert ref["name"] == "strings.tsv"
+            client = processor.app.test_client()
+            for query in ({}, {"order": "offset"}, {"minLength": 12}, {"encoding": "utf-16le"}):
+                listed = client.post("/strings", json=dict(query, listId=ref["id"])).get_json()
+                extracted = client.post("/strings", json=dict(query, fileData=base64.b64encode(data).decode())).get_json()
+                assert listed == extracted, (query, listed, extracted)
+            assert listed["total"] == 1
+            assert client.post("/strings", json={"listId": "0" * 64}).status_code == 400
+        finally:
+            art._store = saved
+    print("✓ /strings pages a stored list")
+
+
+if __name__ == "__main__":
+    print("Running strings tests...\n")
+    test_encodings()
+    test_block_boundaries()
+    test_ranking_and_paging()
+    test_strings_route()
+    test_strings_route_pages_stored_list()
+    print("\n✅ All strings tests passed!")
+    sys.exit(0)
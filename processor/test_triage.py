@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the triage evidence scoring
+"""
+
+import sys
+
+
+def test_clean_report_scores_zero():
+    """Typical clean-image tool output stays below the threshold"""
+    from stego.triage import score_evidence, TRIAGE_THRESHOLD
+    results = {
+        "binwalk": "DECIMAL       HEXADECIMAL     DESCRIPTION\n"
+                   "--------------------------------------------------------------------------------\n"
+                   "0             0x0             PNG image, 640 x 480, 8-bit/color RGB, non-interlaced\n",
+        "zsteg": "b1,rgb,lsb,xy       .. file: data\nimagedata           .. text: \"\\n\\n\\n\"",
+        "steganalysis": {"suspicious": False, "estimated_rate": 0.01},
+        "lsb_scan": {"found": False, "hits": []},
+        "strings": "IHDR\nsRGB\nIDATx^",
+    }
+    score, reasons = score_evidence(results, b"\x89PNG....IEND\xaeB`\x82", ".png")
+    assert score < TRIAGE_THRESHOLD, reasons
+    print(f"✓ Clean score {score}")
+
+
+def test_signals_add_up():
+    """Appended data, embedded signatures and LSB payloads all count"""
+    from stego.triage import score_evidence, TRIAGE_THRESHOLD
+    results = {
+        "binwalk": "0             0x0             PNG image\n51234         0xC822          Zip archive data\n",
+        "lsb_scan": {"found": True, "hits": [{"kind": "flag", "spec": "b1,rgb,lsb,xy"}]},
+        "steganalysis": {"suspicious": True, "estimated_rate": 0.42},
+    }
+    score, reasons = score_evidence(results, b"\x89PNG..IEND\xaeB`\x82" + b"PK" * 20, ".png")
+    assert score >= TRIAGE_THRESHOLD
+    assert len(reasons) == 4, reasons
+    print(f"✓ Suspicious score {score}: {'; '.join(reasons)}")
+
+
+def test_trailing_bytes():
+    from stego.triage import trailing_bytes
+    assert trailing_bytes(b"\xff\xd8....\xff\xd9", ".jpg") == 0
+    assert trailing_bytes(b"\xff\xd8....\xff\xd9secret", ".JPG") == 6
+    assert trailing_bytes(b"RIFF....", ".wav") == 0
+    print("✓ Trailing bytes")
+
+
+if __name__ == "__main__":
+    print("Running triage tests...\n")
+    test_clean_report_scores_zero()
+    test_signals_add_up()
+    test_trailing_bytes()
+    print("\n✅ All triage tests passed!")
+    sys.exit(0)
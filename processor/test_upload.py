@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed /process uploads
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+
+def _receive(body, headers=None, environ=None, query="", content_type="application/octet-stream", parsed=None):
+    import app as processor
+    from flask import request
+    with processor.app.test_request_context("/process" + query, method="POST", input_stream=io.BytesIO(body),
+                                            headers=headers or {}, environ_base=environ or {},
+                                            content_type=content_type):
+        received = processor.receive_upload()
+        if parsed is not None:
+            parsed.append("form" in request.__dict__)
+        return received
+
+
+def test_size_limit():
+    """Bodies over UPLOAD_MAX_BYTES are refused, with or without a Content-Length"""
+    import app as processor
+    limit = processor.UPLOAD_MAX_BYTES
+    processor.UPLOAD_MAX_BYTES = 1000
+    try:
+        _, _, error = _receive(b"x" * 2000, headers={"Content-Length": "2000"})
+        assert error[1] == 413
+        # Chunked: no Content-Length, so the limit is enforced while streaming
+        _, _, error = _receive(b"x" * 2000, environ={"wsgi.input_terminated": True},
+                               headers={"Transfer-Encoding": "chunked"})
+        assert error[1] == 413
+        options, (workspace, digests), error = _receive(b"x" * 1000, headers={"Content-Length": "1000"})
+        try:
+            assert error is None and os.path.getsize(workspace.input_path) == 1000
+        finally:
+            workspace.cleanup()
+    finally:
+        processor.UPLOAD_MAX_BYTES = limit
+    print("✓ Oversized uploads refused with 413")
+
+
+def test_unknown_length_goes_to_disk():
+    """A chunked upload is not streamed into tmpfs"""
+    import stego.workspace as wsmod
+    root = wsmod.WORKSPACE_ROOT
+    with tempfile.TemporaryDirectory() as tmp:
+        wsmod.WORKSPACE_ROOT = tmp
+        try:
+            options, (workspace, _), error = _receive(b"chunked body", environ={"wsgi.input_terminated": True},
+                                                      headers={"Transfer-Encoding": "chunked"},
+                                                      query="?fileName=a.bin&fileSize=12")
+            try:
+                assert error is None and options["fileSize"] == "12"
+                assert os.path.dirname(workspace.dir) == tempfile.gettempdir()
+            finally:
+                workspace.cleanup()
+            _, (workspace, _), _ = _receive(b"sized body", headers={"Content-Length": "10"})
+            try:
+                assert os.path.dirname(workspace.dir) == tmp
+            finally:
+                workspace.cleanup()
+        finally:
+            wsmod.WORKSPACE_ROOT = root
+    print("✓ Uploads of unknown length written to disk")
+
+
+def test_file_size_from_query_string():
+    """fileSize arrives as text from the query string and is compared as a number"""
+    import contextlib
+    import app as processor
+    client = processor.app.test_client()
+    for size, mismatch in (("3", False), ("5", True), ("abc", False)):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            response = client.post(f"/process?fileName=a.txt&fileSize={size}&noCache=1", data=b"abc",
+                                   content_type="application/octet-stream")
+        assert response.status_code == 200
+        assert ("File size mismatch" in log.getvalue()) == mismatch, size
+    print("✓ fileSize query parameter compared as a number")
+
+
+def test_multipart_limit_before_parsing():
+    """An oversized multipart body is refused before Werkzeug parses it; chunked ones stop at MAX_CONTENT_LENGTH"""
+    import app as processor
+    boundary = "limitboundary"
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.bin\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n").encode() + b"x" * 4000 + f"\r\n--{boundary}--\r\n".encode()
+    content_type = f"multipart/form-data; boundary={boundary}"
+    limits = processor.UPLOAD_MAX_BYTES, processor.app.config["MAX_CONTENT_LENGTH"]
+    processor.UPLOAD_MAX_BYTES = 1000
+    try:
+        parsed = []
+        _, _, error = _receive(body, headers={"Content-Length": str(len(body))}, content_type=content_type, parsed=parsed)
+        assert error[1] == 413 and parsed == [False]
+        processor.app.config["MAX_CONTENT_LENGTH"] = 2000
+        _, _, error = _receive(body, environ={"wsgi.input_terminated": True}, content_type=content_type,
+                               headers={"Transfer-Encoding": "chunked"})
+        assert error[1] == 413 and error[0].get_json()["error"].startswith("File is too large")
+    finally:
+        processor.UPLOAD_MAX_BYTES, processor.app.config["MAX_CONTENT_LENGTH"] = limits
+    print("✓ Multipart bodies limited before parsing")
+
+
+if __name__ == "__main__":
+    print("Running upload tests...\n")
+    test_size_limit()
+    test_unknown_length_goes_to_disk()
+    test_file_size_from_query_string()
+    test_multipart_limit_before_parsing()
+    print("\n✅ All upload tests passed!")
+    sys.exit(0)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped wordlist manager
+"""
+
+import os
+import sys
+import tempfile
+
+
+def _write_list(directory, name, lines):
+    path = os.path.join(directory, f"{name}.txt")
+    with open(path, "wb") as f:
+        f.write(b"\n".join(lines) + b"\n")
+    return path
+
+
+def test_index_dedup_and_shards():
+    """Entries are indexed once, repeats dropped, CRLF stripped and shards cover the list"""
+    import stego.wordlists as wl
+    index_dir = wl.WORDLIST_INDEX_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        wl.WORDLIST_INDEX_DIR = os.path.join(tmp, "index")
+        try:
+            path = _write_list(tmp, "sample", [b"alpha", b"beta\r", b"alpha", b"\xffraw", b"gamma"])
+            words = wl.get_wordlist(path)
+            assert list(words) == [b"alpha", b"beta", b"\xffraw", b"gamma"], list(words)
+            assert words[2] == b"\xffraw"
+            shards = words.shards(3)
+            assert shards[0][0] == 0 and shards[-1][1] == len(words)
+            assert sum(b - a for a, b in shards) == len(words)
+            assert os.listdir(wl.WORDLIST_INDEX_DIR), "index should be persisted"
+            # A fresh load reuses the persisted index
+            wl._loaded.clear()
+            words = wl.get_wordlist(path)
+            assert list(words.iter_range(1, 3)) == [b"beta", b"\xffraw"]
+            # A changed file is reopened and the old mapping released
+            _write_list(tmp, "sample", [b"delta", b"epsilon"])
+            assert list(wl.get_wordlist(path)) == [b"delta", b"epsilon"]
+            assert words._file.closed and words._map.closed
+        finally:
+            wl.WORDLIST_INDEX_DIR = index_dir
+            wl._loaded.clear()
+    print("✓ Index, dedup and shards")
+
+
+def test_candidates_priority_order():
+    """Lists are combined cheapest-first and words are not repeated across lists"""
+    import stego.wordlists as wl
+    index_dir = wl.WORDLIST_INDEX_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        wl.WORDLIST_INDEX_DIR = os.path.join(tmp, "index")
+        try:
+            big = _write_list(tmp, "rockyou", [b"123456", b"secret", b"dragon"])
+            small = _write_list(tmp, "common", [b"secret", b"password"])
+            words = list(wl.candidates([big, small]))
+            assert words == ["secret", "password", "123456", "dragon"], words
+            assert list(wl.candidates([small], decode=None))[0] == b"secret"
+            assert list(wl.candidates([os.path.join(tmp, "missing.txt")])) == []
+        finally:
+            wl.WORDLIST_INDEX_DIR = index_dir
+            wl._loaded.clear()
+    print("✓ Priority order and cross-list dedup")
+
+
+if __name__ == "__main__":
+    print("Running wordlist tests...\n")
+    test_index_dedup_and_shards()
+    test_candidates_priority_order()
+    print("\n✅ All wordlist tests passed!")
+    sys.exit(0)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-request workspace and the shared audio decode
+"""
+
+import os
+import sys
+import stat
+import tempfile
+import threading
+
+# Stands in for ffmpeg: writes every output path it is given and logs the call
+FAKE_FFMPEG = """#!/bin/sh
+echo "$@" >> "$FFMPEG_LOG"
+skip=1
+for arg in "$@"; do
+    if [ "$skip" = 1 ]; then
+        [ "$arg" = "-i" ] && skip=2
+        continue
+    fi
+    if [ "$skip" = 2 ]; then skip=0; continue; fi
+    case "$arg" in
+        */audio_*) echo decoded > "$arg" ;;
+    esac
+done
+"""
+
+
+def _with_fake_ffmpeg(tmp):
+    """PATH with the fake ffmpeg (and an empty multimon-ng) first; returns the call log path."""
+    bin_dir = os.path.join(tmp, "bin")
+    os.makedirs(bin_dir)
+    for name, script in (("ffmpeg", FAKE_FFMPEG), ("multimon-ng", "#!/bin/sh\n")):
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    log = os.path.join(tmp, "ffmpeg.log")
+    os.environ["FFMPEG_LOG"] = log
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+    return log
+
+
+def _calls(log):
+    if not os.path.exists(log):
+        return []
+    with open(log) as f:
+        return f.read().splitlines()
+
+
+def test_root_fallback():
+    """tmpfs is used only when it exists, is writable and the input is small"""
+    import stego.workspace as wsmod
+    root, limit = wsmod.WORKSPACE_ROOT, wsmod.WORKSPACE_SHM_MAX_BYTES
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            wsmod.WORKSPACE_ROOT, wsmod.WORKSPACE_SHM_MAX_BYTES = tmp, 1024
+            assert wsmod._pick_root(100) == tmp
+            assert wsmod._pick_root(2048) == tempfile.gettempdir()
+            wsmod.WORKSPACE_ROOT = os.path.join(tmp, "missing")
+            assert wsmod._pick_root(100) == tempfile.gettempdir()
+            with wsmod.Workspace(size_hint=100) as ws:
+                assert os.path.dirname(ws.dir) == tempfile.gettempdir()
+                assert ws.disk_dir() == ws.dir
+        finally:
+            wsmod.WORKSPACE_ROOT, wsmod.WORKSPACE_SHM_MAX_BYTES = root, limit
+    print("✓ Workspace falls back to the disk temp dir")
+
+
+def test_paths_and_once():
+    """Scratch paths never collide; once() runs a stage a single time"""
+    from stego.workspace import Workspace, borrow_workspace, scratch_path
+    with tempfile.TemporaryDirectory() as tmp:
+        with Workspace(root=tmp) as ws:
+            ws.add_input(b"upload bytes", ".bin")
+            first, second = scratch_path(ws, "out.txt"), scratch_path(ws, "out.txt")
+            assert first != second and first.endswith(".txt") and first.startswith(ws.dir)
+            assert bytes(ws.map_file(ws.input_path)) == b"upload bytes"
+            calls = []
+            threads = [threading.Thread(target=lambda: ws.once("stage", lambda: calls.append(1) or len(calls)))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert calls == [1] and ws.once("stage", lambda: 99) == 1
+            directory = ws.dir
+        assert not os.path.exists(directory)
+        standalone = scratch_path(None, "out.txt")
+        assert os.path.dirname(standalone) == tempfile.gettempdir() and standalone != scratch_path(None, "out.txt")
+        upload = os.path.join(tmp, "upload.png")
+        with open(upload, "wb") as f:
+            f.write(b"x")
+        with borrow_workspace(upload) as ws:
+            assert ws.input_path == upload
+        assert os.path.exists(upload) and not os.path.exists(ws.dir)
+    print("✓ Scratch paths unique, stages run once")
+
+
+def test_decode_once_on_disk():
+    """Concurrent audio tools share one ffmpeg run, written outside tmpfs"""
+    from stego.workspace import Workspace
+    from stego.audio import decoded_audio_path, PCM_TARGET, WAV_TARGET
+    path = os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as tmp:
+        log = _with_fake_ffmpeg(tmp)
+        try:
+            shm = os.path.join(tmp, "shm")
+            os.makedirs(shm)
+            with Workspace(root=shm) as ws:
+                ws.add_input(b"ID3 not really an mp3", ".mp3")
+                found = []
+                threads = [threading.Thread(target=lambda t=t: found.append(decoded_audio_path(ws.input_path, ws, t)))
+                           for t in (PCM_TARGET, WAV_TARGET) * 4]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                assert len(_calls(log)) == 1 and all(p for p, _ in found)
+                assert all(not p.startswith(shm) for p, _ in found)
+                disk_dir = ws.disk_dir()
+            assert not os.path.exists(disk_dir)
+        finally:
+            os.environ["PATH"] = path
+            os.environ.pop("FFMPEG_LOG", None)
+    print("✓ One ffmpeg run for every audio tool, outside tmpfs")
+
+
+def test_wav_input_skips_wav_decode():
+    """A PCM WAV is read as is: only the multimon-ng raw target is decoded"""
+    import wave
+    from stego.workspace import Workspace
+    from stego.audio import decoded_audio_path, PCM_TARGET, WAV_TARGET
+    path = os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as tmp:
+        log = _with_fake_ffmpeg(tmp)
+        try:
+            with Workspace(root=tempfile.gettempdir()) as ws:
+                ws.add_input(b"", ".wav")
+                with wave.open(ws.input_path, "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(2)
+                    w.setframerate(8000)
+                    w.writeframes(b"\x00\x00" * 100)
+                raw_path, _ = decoded_audio_path(ws.input_path, ws, PCM_TARGET)
+                assert raw_path and ws.disk_dir() == ws.dir
+                calls = _calls(log)
+                assert len(calls) == 1 and WAV_TARGET not in calls[0], calls
+                # Asked for anyway, it gets a run of its own
+                assert decoded_audio_path(ws.input_path, ws, WAV_TARGET)[0]
+                assert len(_calls(log)) == 2
+        finally:
+            os.environ["PATH"] = path
+            os.environ.pop("FFMPEG_LOG", None)
+    print("✓ WAV uploads decode only the raw PCM target")
+
+
+if __name__ == "__main__":
+    print("Running workspace tests...\n")
+    test_root_fallback()
+    test_paths_and_once()
+    test_decode_once_on_disk()
+    test_wav_input_skips_wav_decode()
+    print("\n✅ All workspace tests passed!")
+    sys.exit(0)
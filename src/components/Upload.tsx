@@ -15,6 +15,25 @@ interface SteghideCrackResult {
 
 interface ZbarimgResult { found: boolean; data: string | null; message: string; }
 interface JstegResult { found: boolean; data: string | null; message: string; }
+interface ArtifactRef { id: string; size: number; mime: string; name: string; }
+interface StringsResult {
+  total: number;
+  message: string;
+  strings: { text: string; offset: number; encoding: string; tags?: string[] }[];
+  full_list?: ArtifactRef | null;
+}
+interface CarvedFilesResult { message: string; artifacts: ArtifactRef[]; }
+
+const PROCESSOR_URL = process.env.NEXT_PUBLIC_PROCESSOR_URL;
+
+// Structured results carry their human-readable text in "message"
+function resultText(result: unknown): string | null {
+  if (typeof result === "string") return result;
+  if (result && typeof result === "object" && typeof (result as { message?: unknown }).message === "string") {
+    return (result as { message: string }).message;
+  }
+  return null;
+}
 
 const TOOL_LABELS: Record<string, string> = {
   file_type:       "File Type Detection",
@@ -64,8 +83,9 @@ const TOOL_ACCEPTED_TYPES: Record<string, string> = {
 };
 
 function isFileTypeUnsupported(result: unknown): boolean {
-  if (typeof result !== "string") return false;
-  const r = result.toLowerCase();
+  const text = resultText(result);
+  if (text === null) return false;
+  const r = text.toLowerCase();
   return (
     r.includes("only works with") ||
     r.includes("only operates on") ||
@@ -76,8 +96,9 @@ function isFileTypeUnsupported(result: unknown): boolean {
 }
 
 function isToolNotInstalled(result: unknown): boolean {
-  if (typeof result !== "string") return false;
-  const r = result.toLowerCase();
+  const text = resultText(result);
+  if (text === null) return false;
+  const r = text.toLowerCase();
   return r.includes("not installed") || r.includes("not available in path");
 }
 
@@ -196,6 +217,59 @@ function ToolResultCard({ tool, result }: ToolResultCardProps) {
     );
   }
 
+  // Strings: the most interesting runs, every string pages through /strings
+  if (tool === 'strings' && result && typeof result === 'object') {
+    const r = result as StringsResult;
+    return (
+      <div className="bg-zinc-900 border border-zinc-700 rounded-xl p-6 shadow-lg">
+        <h3 className="text-lime-400 text-xl font-bold mb-3 uppercase tracking-wider flex items-center gap-2">
+          <span className="inline-block w-2 h-2 rounded-full bg-lime-400 animate-pulse"></span>
+          {label}
+        </h3>
+        <p className="text-zinc-400 text-sm mb-3">{r.message}</p>
+        <pre className="text-green-300 whitespace-pre-wrap max-h-60 overflow-y-auto text-sm bg-black/80 rounded p-4">
+          {(r.strings || []).map((s) => (s.tags && s.tags.length ? `[${s.tags.join(', ')}] ` : '') + s.text).join('\n') || 'No strings found'}
+        </pre>
+        {PROCESSOR_URL && r.full_list && (
+          <a href={`${PROCESSOR_URL}/artifacts/${r.full_list.id}`} className="inline-block mt-3 text-lime-300 text-sm hover:underline" target="_blank" rel="noopener noreferrer">
+            All {r.total.toLocaleString()} strings ({r.full_list.size.toLocaleString()} bytes)
+          </a>
+        )}
+      </div>
+    );
+  }
+
+  // Carvers: their output plus the files kept in the artefact store
+  if ((tool === 'foremost' || tool === 'stegoveritas') && result && typeof result === 'object') {
+    const r = result as CarvedFilesResult;
+    return (
+      <div className="bg-zinc-900 border border-zinc-700 rounded-xl p-6 shadow-lg">
+        <h3 className="text-lime-400 text-xl font-bold mb-3 uppercase tracking-wider flex items-center gap-2">
+          <span className="inline-block w-2 h-2 rounded-full bg-lime-400 animate-pulse"></span>
+          {label}
+        </h3>
+        <pre className="text-green-300 whitespace-pre-wrap max-h-60 overflow-y-auto text-sm bg-black/80 rounded p-4">
+          {r.message || 'No output'}
+        </pre>
+        {r.artifacts && r.artifacts.length > 0 && (
+          <div className="mt-3">
+            <h4 className="text-lime-400 font-bold mb-2">Extracted files ({r.artifacts.length}):</h4>
+            <ul className="max-h-40 overflow-y-auto text-sm font-mono space-y-1">
+              {r.artifacts.map((a) => (
+                <li key={a.id} className="text-zinc-300">
+                  {PROCESSOR_URL
+                    ? <a href={`${PROCESSOR_URL}/artifacts/${a.id}`} className="text-lime-300 hover:underline" target="_blank" rel="noopener noreferrer">{a.name}</a>
+                    : a.name}
+                  <span className="text-zinc-500"> ({a.size.toLocaleString()} bytes)</span>
+                </li>
+              ))}
+            </ul>
+          </div>
+        )}
+      </div>
+    );
+  }
+
   // Handle stegdetect results
   if (tool === 'stegdetect' && typeof result === 'string') {
     const isClean = result.toLowerCase().includes('no anomalies') || result.toLowerCase().includes('negative') || result.trim() === '';